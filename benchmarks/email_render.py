@@ -0,0 +1,83 @@
+"""
+Micro-benchmark da montagem do e-mail de orçamento: f-string + árvore MIME
+completa a cada chamada (implementação antiga) contra o template
+pré-compilado com a parte de texto em cache.
+
+Uso: python -m benchmarks.email_render [--iterations 20000]
+"""
+import argparse
+import os
+import timeit
+from email.message import EmailMessage
+
+os.environ.setdefault("EMAIL_PORT", "587")
+os.environ.setdefault("MERCADO_PAGO_ACCESS_TOKEN", "benchmark")
+os.environ.setdefault("WHATSAPP_CONTATO", "+55 35 99999-0000")
+os.environ.setdefault("EMAIL_CONTATO", "contato@elodrinks.com")
+
+from src.models.MailModels import EmailDetails
+from src.services.email import sendMail
+
+
+def legacy_build_message(email_details: EmailDetails) -> EmailMessage:
+    msg = EmailMessage()
+    msg["Subject"] = "Orçamento EloDrinks para sua festa 🥳"
+    msg["From"] = sendMail.EMAIL_USER
+    msg["To"] = email_details.email
+
+    corpo_html = f"""
+    <html>
+        <body>
+            <p>Olá {email_details.name},<br><br>
+            Nós da <strong>EloDrinks</strong> olhamos com cuidado e fizemos com carinho o orçamento para sua festa de <strong>{email_details.type}</strong> na data <strong>{email_details.date}</strong>.<br><br>
+            O valor final para seu pedido é <strong>R${email_details.value}</strong>.<br><br>
+            <a href="{email_details.payment_link}" style="padding:10px 15px; background-color:#28a745; color:white; text-decoration:none; border-radius:5px;">Confirmar pedido e realizar pagamento</a><br><br>
+            Caso tenha alguma ressalva, entre em contato conosco:<br>
+            📞 WhatsApp: {sendMail.WHATSAPP_CONTATO}<br>
+            📧 Email: {sendMail.EMAIL_CONTATO}<br><br>
+            Atenciosamente,<br>
+            Equipe <strong>EloDrinks</strong></p>
+        </body>
+    </html>
+    """
+
+    msg.set_content("Seu cliente precisa de um e-mail com HTML para visualizar este conteúdo.")
+    msg.add_alternative(corpo_html, subtype='html')
+    return msg
+
+
+def _report(label, seconds, iterations):
+    print(f"{label:<28} {seconds / iterations * 1e6:>8.2f} µs/msg")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    details = EmailDetails(
+        email="cliente@example.com",
+        name="Cliente Benchmark",
+        type="Aniversário",
+        date="2025-06-10",
+        value="150.00",
+        payment_link="https://example.com/pagar?pref_id=123",
+    )
+    fields = {
+        "name": details.name,
+        "type": details.type,
+        "date": details.date,
+        "value": details.value,
+        "payment_link": details.payment_link,
+    }
+    n = args.iterations
+
+    _report("render (template)", timeit.timeit(lambda: sendMail.budget_template.render(**fields), number=n), n)
+    _report("mensagem (implementação antiga)", timeit.timeit(lambda: legacy_build_message(details), number=n), n)
+    _report("mensagem (template + cache)", timeit.timeit(lambda: sendMail.build_message(details), number=n), n)
+    _report("as_bytes (antiga)", timeit.timeit(lambda: legacy_build_message(details).as_bytes(), number=n // 4), n // 4)
+    _report("as_bytes (template + cache)", timeit.timeit(lambda: sendMail.build_message(details).as_bytes(), number=n // 4), n // 4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Vazão e latência (p50/p99) do envio de e-mails contra um servidor SMTP
+local (aiosmtpd) com latência e falhas injetadas.
+
+Cenários:
+- send_email: envio síncrono pelo pool de conexões, em threads;
+- send_email_async: envio assíncrono pelo pool aiosmtplib;
+- POST /budget/email/send: latência da rota (até o 202) e latência de
+  entrega (enfileiramento até o e-mail aceito pelo SMTP) através do outbox
+  e dos workers. O Mongo é substituído por uma coleção em memória e a
+  preferência do Mercado Pago por um link fixo, isolando o custo do SMTP.
+
+Uso: python -m benchmarks.email_throughput [--messages 200]
+     [--concurrency 1,4,16] [--data-latency 0.005] [--failure-rate 0.0]
+"""
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mongo_stand_in import InMemoryDatabase
+from benchmarks.smtp_stand_in import smtp_stand_in
+from benchmarks.stats import print_header, print_row, summarize
+
+BUDGET = {
+    "_id": "665f1c2e8f1b2a0012345678",
+    "name": "Cliente Benchmark",
+    "email": "cliente@example.com",
+    "budget": {"type": "Aniversário", "date": "2025-06-10"},
+    "value": 150.0,
+}
+
+
+def _details():
+    from src.models.MailModels import EmailDetails
+
+    return EmailDetails(
+        email=BUDGET["email"],
+        name=BUDGET["name"],
+        type=BUDGET["budget"]["type"],
+        date=BUDGET["budget"]["date"],
+        value=str(BUDGET["value"]),
+        payment_link="https://example.com/pagar",
+    )
+
+
+def bench_send_email(messages: int, concurrency: int):
+    from src.services.email import sendMail
+
+    details = _details()
+    latencies, errors = [], 0
+
+    def send(_):
+        start = time.perf_counter()
+        try:
+            sendMail.send_email(details)
+        except Exception:
+            return None
+        return time.perf_counter() - start
+
+    sendMail.smtp_pool = sendMail.SMTPPool(sendMail._open_connection, max_size=concurrency)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for latency in executor.map(send, range(messages)):
+            if latency is None:
+                errors += 1
+            else:
+                latencies.append(latency)
+    elapsed = time.perf_counter() - start
+    sendMail.smtp_pool.close()
+    return summarize(latencies, elapsed, errors)
+
+
+async def bench_send_email_async(messages: int, concurrency: int):
+    from src.services.email import sendMail
+
+    details = _details()
+    latencies, errors = [], 0
+    slots = asyncio.Semaphore(concurrency)
+    sendMail.async_smtp_pool = sendMail.AsyncSMTPPool(sendMail._open_async_connection, max_size=concurrency)
+
+    async def send():
+        nonlocal errors
+        async with slots:
+            start = time.perf_counter()
+            try:
+                await sendMail.send_email_async(details)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(send() for _ in range(messages)))
+    elapsed = time.perf_counter() - start
+    await sendMail.async_smtp_pool.close()
+    return summarize(latencies, elapsed, errors)
+
+
+async def bench_route(messages: int, concurrency: int):
+    import httpx
+    from bson import ObjectId
+    from fastapi import FastAPI
+
+    from src.routes import budget as budget_routes
+    from src.services.email import idempotency, outbox, sendMail
+    from src.services.queue import queue as queue_mod
+    from src.services.queue import QueueWorkerPool
+
+    database = InMemoryDatabase()
+    queue_mod.connect = database.connect
+    idempotency.connect = database.connect
+
+    async def get_budget_by_id(budget_id: str):
+        return {**BUDGET, "_id": budget_id}
+
+    async def get_or_create_preference_async(data):
+        return {"initPoint": "https://example.com/pagar", "preferenceId": "bench"}
+
+    budget_routes.get_budget_by_id = get_budget_by_id
+    outbox.get_or_create_preference_async = get_or_create_preference_async
+
+    sendMail.async_smtp_pool = sendMail.AsyncSMTPPool(sendMail._open_async_connection, max_size=concurrency)
+    workers = QueueWorkerPool(
+        outbox.OUTBOX_COLLECTION,
+        outbox.deliver_email,
+        concurrency=concurrency,
+        poll_interval=0.01,
+        max_attempts=1,
+    )
+    outbox.outbox_workers = workers
+
+    app = FastAPI()
+    app.include_router(budget_routes.router)
+    transport = httpx.ASGITransport(app=app)
+
+    route_latencies = []
+    slots = asyncio.Semaphore(concurrency)
+
+    async def post(client):
+        async with slots:
+            start = time.perf_counter()
+            # Ids distintos: a chave de idempotência não deve descartar envios
+            response = await client.post("/budget/email/send", json={"_id": str(ObjectId())})
+            route_latencies.append(time.perf_counter() - start)
+            assert response.status_code == 202, response.text
+
+    workers.start()
+    start = time.perf_counter()
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await asyncio.gather(*(post(client) for _ in range(messages)))
+
+    collection, _ = database.connect(outbox.OUTBOX_COLLECTION)
+    while any(doc["status"] in (queue_mod.PENDING, queue_mod.PROCESSING) for doc in list(collection.docs.values())):
+        await asyncio.sleep(0.005)
+    elapsed = time.perf_counter() - start
+    await workers.stop()
+    await sendMail.async_smtp_pool.close()
+
+    docs = list(collection.docs.values())
+    delivered = [
+        (doc["completed_at"] - doc["created_at"]).total_seconds()
+        for doc in docs
+        if doc["status"] == queue_mod.DONE
+    ]
+    failed = sum(1 for doc in docs if doc["status"] == queue_mod.FAILED)
+    return summarize(route_latencies, elapsed), summarize(delivered, elapsed, failed)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--session-latency", type=float, default=0.02)
+    parser.add_argument("--data-latency", type=float, default=0.005)
+    parser.add_argument("--jitter", type=float, default=0.005)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    with smtp_stand_in(
+        session_latency=args.session_latency,
+        data_latency=args.data_latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        seed=42,
+    ) as (handler, host, port):
+        os.environ.update({
+            "EMAIL_HOST": host,
+            "EMAIL_PORT": str(port),
+            "EMAIL_USER": "bench@elodrinks.com",
+            "EMAIL_PASS": "bench",
+            "EMAIL_STARTTLS": "false",
+            "EMAIL_OUTBOX_WORKERS": "0",
+        })
+        os.environ.setdefault("MERCADO_PAGO_ACCESS_TOKEN", "benchmark")
+
+        print_header()
+        for level in levels:
+            print_row("send_email", level, bench_send_email(args.messages, level))
+        for level in levels:
+            print_row("send_email_async", level, asyncio.run(bench_send_email_async(args.messages, level)))
+        for level in levels:
+            route, delivery = asyncio.run(bench_route(args.messages, level))
+            print_row("POST /email/send (rota)", level, route)
+            print_row("POST /email/send (entrega)", level, delivery)
+
+        print(f"\nsessões SMTP: {handler.sessions}  aceitas: {handler.received}  recusadas: {handler.rejected}")
+
+
+if __name__ == "__main__":
+    main()
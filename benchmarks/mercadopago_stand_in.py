@@ -0,0 +1,277 @@
+"""
+Fake local da API do Mercado Pago para benchmarks e testes de integração.
+
+Atende criação de preferência, consulta e busca de pagamentos, com latência,
+jitter e taxa de erro (503) configuráveis. Pagamentos são simulados com
+StandInState.pay(), que dispara a notificação assinada para o webhook da API.
+
+Para apontar a API para o fake basta definir MERCADO_PAGO_BASE_URL.
+
+Uso: python -m benchmarks.mercadopago_stand_in [--port 8001]
+     [--latency 0.05] [--error-rate 0.1]
+     [--webhook-url http://localhost:8000/budget/webhook] [--webhook-secret ...]
+"""
+import argparse
+import hashlib
+import hmac
+import itertools
+import json
+import random
+import re
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional, Union
+from urllib.parse import parse_qs, urlsplit
+
+from src.services.payment.signature import build_manifest
+
+# Destino das notificações: URL do webhook ou função (path_com_query, headers, corpo) -> status
+WebhookTarget = Union[str, Callable[[str, dict, bytes], int]]
+
+
+class StandInState:
+    """
+    Estado compartilhado do fake do Mercado Pago.
+
+    connection_latency: atraso aplicado a cada conexão TCP nova, simulando o
+    custo de handshake TLS com a API real.
+    latency / jitter: atraso fixo e aleatório aplicado a cada requisição.
+    error_rate: fração das requisições respondidas com 503.
+    """
+
+    def __init__(
+        self,
+        connection_latency: float = 0.0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+        webhook: Optional[WebhookTarget] = None,
+        webhook_secret: Optional[str] = None,
+    ):
+        self.connection_latency = connection_latency
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.webhook = webhook
+        self.webhook_secret = webhook_secret
+        self.random = random.Random(seed)
+        self.connections = 0
+        self.requests = 0
+        self.errors = 0
+        self.preferences = {}
+        self.payments = {}
+        self.webhook_deliveries = []
+        self.lock = threading.Lock()
+        self._payment_ids = itertools.count(1000)
+        self._notification_ids = itertools.count(1)
+        self._webhook_threads = []
+
+    def pay(self, preference_id: str, status: str = "approved") -> dict:
+        """Registra um pagamento para a preferência e notifica o webhook."""
+        preference = self.preferences[preference_id]
+        with self.lock:
+            payment_id = str(next(self._payment_ids))
+            payment = {
+                "id": int(payment_id),
+                "status": status,
+                "external_reference": preference.get("external_reference"),
+                "transaction_amount": sum(item["unit_price"] * item["quantity"] for item in preference["items"]),
+                "date_created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            self.payments[payment_id] = payment
+
+        if self.webhook is not None:
+            thread = threading.Thread(target=self._notify, args=(payment_id,), daemon=True)
+            thread.start()
+            self._webhook_threads.append(thread)
+        return payment
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Espera as notificações em andamento terminarem."""
+        threads, self._webhook_threads = self._webhook_threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+    def _notify(self, payment_id: str) -> None:
+        request_id = str(uuid.uuid4())
+        body = json.dumps({
+            "id": next(self._notification_ids),
+            "type": "payment",
+            "action": "payment.created",
+            "data": {"id": payment_id},
+        }).encode("utf-8")
+        headers = {"Content-Type": "application/json", "x-request-id": request_id}
+        if self.webhook_secret:
+            ts = str(int(time.time()))
+            manifest = build_manifest(payment_id, request_id, ts)
+            v1 = hmac.new(self.webhook_secret.encode("utf-8"), manifest.encode("utf-8"), hashlib.sha256).hexdigest()
+            headers["x-signature"] = f"ts={ts},v1={v1}"
+
+        query = f"?data.id={payment_id}&type=payment"
+        try:
+            if callable(self.webhook):
+                status = self.webhook(query, headers, body)
+            else:
+                request = urllib.request.Request(self.webhook + query, data=body, headers=headers, method="POST")
+                with urllib.request.urlopen(request, timeout=10) as response:
+                    status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except Exception as e:
+            status = f"erro: {e}"
+
+        with self.lock:
+            self.webhook_deliveries.append({"payment_id": payment_id, "status": status})
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state: StandInState = None
+    base_url: str = ""
+
+    def setup(self):
+        super().setup()
+        # Cabeçalho e corpo saem em writes separados: sem NODELAY o keep-alive
+        # esbarra no atraso de ACK do TCP e mede 40ms que não existem na API real
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.state.lock:
+            self.state.connections += 1
+        if self.state.connection_latency:
+            time.sleep(self.state.connection_latency)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _begin(self) -> bool:
+        """Aplica latência e erro injetados; devolve False se já respondeu 503."""
+        state = self.state
+        with state.lock:
+            state.requests += 1
+            delay = state.latency + (state.random.uniform(0, state.jitter) if state.jitter else 0.0)
+            failed = state.error_rate > 0 and state.random.random() < state.error_rate
+            if failed:
+                state.errors += 1
+        if delay:
+            time.sleep(delay)
+        if failed:
+            # O corpo da requisição precisa ser consumido para manter a conexão utilizável
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            self._reply(503, {"message": "service_unavailable", "status": 503})
+            return False
+        return True
+
+    def do_POST(self):
+        if not self._begin():
+            return
+        path = urlsplit(self.path).path
+        if path == "/checkout/preferences":
+            data = self._read_json()
+            preference_id = str(uuid.uuid4())
+            with self.state.lock:
+                self.state.preferences[preference_id] = data
+            return self._reply(201, {
+                "id": preference_id,
+                "init_point": f"{self.base_url}/checkout/v1/redirect?pref_id={preference_id}",
+                "external_reference": data.get("external_reference"),
+            })
+        if path == "/stand-in/pay":
+            # Atalho do fake para simular o pagamento de uma preferência via HTTP
+            data = self._read_json()
+            if data.get("preference_id") not in self.state.preferences:
+                return self._reply(404, {"message": "preference not found"})
+            return self._reply(201, self.state.pay(data["preference_id"], data.get("status", "approved")))
+        self._reply(404, {"message": "not_found"})
+
+    def do_GET(self):
+        if not self._begin():
+            return
+        url = urlsplit(self.path)
+        if url.path == "/v1/payments/search":
+            filters = {key: values[0] for key, values in parse_qs(url.query).items()}
+            reference = filters.get("external_reference")
+            with self.state.lock:
+                results = [
+                    payment for payment in self.state.payments.values()
+                    if reference is None or payment["external_reference"] == reference
+                ]
+            results.sort(key=lambda payment: payment["id"], reverse=filters.get("criteria") == "desc")
+            return self._reply(200, {
+                "results": results,
+                "paging": {"total": len(results), "limit": len(results), "offset": 0},
+            })
+
+        match = re.fullmatch(r"/v1/payments/([^/]+)", url.path)
+        if match:
+            payment = self.state.payments.get(match.group(1))
+            if payment is None:
+                return self._reply(404, {"message": "Payment not found", "status": 404})
+            return self._reply(200, payment)
+        self._reply(404, {"message": "not_found"})
+
+
+@contextmanager
+def mercadopago_stand_in(host: str = "127.0.0.1", port: int = 0, **options):
+    """Sobe o fake do Mercado Pago em uma thread e devolve (state, base_url)."""
+    state = StandInState(**options)
+    handler = type("StandInHandler", (_Handler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    handler.base_url = f"http://{host}:{server.server_address[1]}"
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield state, handler.base_url
+    finally:
+        state.flush()
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--webhook-url")
+    parser.add_argument("--webhook-secret")
+    args = parser.parse_args()
+
+    with mercadopago_stand_in(
+        args.host,
+        args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        webhook=args.webhook_url,
+        webhook_secret=args.webhook_secret,
+    ) as (state, base_url):
+        print(f"Mercado Pago local em {base_url} (MERCADO_PAGO_BASE_URL={base_url})")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
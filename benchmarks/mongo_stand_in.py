@@ -0,0 +1,135 @@
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+
+def _get(doc: dict, dotted: str) -> Any:
+    value = doc
+    for key in dotted.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _set(doc: dict, dotted: str, value: Any) -> None:
+    keys = dotted.split(".")
+    for key in keys[:-1]:
+        doc = doc.setdefault(key, {})
+    doc[keys[-1]] = value
+
+
+def _matches_value(actual: Any, condition: Any) -> bool:
+    if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+        for op, expected in condition.items():
+            if op == "$lte" and not (actual is not None and actual <= expected):
+                return False
+            if op == "$lt" and not (actual is not None and actual < expected):
+                return False
+            if op == "$gte" and not (actual is not None and actual >= expected):
+                return False
+            if op == "$gt" and not (actual is not None and actual > expected):
+                return False
+            if op == "$in" and actual not in expected:
+                return False
+            if op == "$nin" and actual in expected:
+                return False
+            if op == "$ne" and actual == expected:
+                return False
+            if op == "$exists" and (actual is not None) != expected:
+                return False
+        return True
+    return actual == condition
+
+
+def matches(doc: dict, query: Dict[str, Any]) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+        elif not _matches_value(_get(doc, key), condition):
+            return False
+    return True
+
+
+class InMemoryCollection:
+    """
+    Subconjunto do pymongo.Collection usado pelos serviços, em memória.
+    Serve apenas para benchmarks, isolando a latência do Mongo do resto.
+    """
+
+    def __init__(self):
+        self.docs: Dict[Any, dict] = {}
+        self._lock = threading.Lock()
+
+    def create_index(self, *args, **kwargs):
+        return "stand_in_index"
+
+    def insert_one(self, data: dict):
+        with self._lock:
+            data.setdefault("_id", ObjectId())
+            if data["_id"] in self.docs:
+                raise DuplicateKeyError(f"E11000 duplicate key: {data['_id']}")
+            self.docs[data["_id"]] = data
+        return SimpleNamespace(inserted_id=data["_id"])
+
+    def find(self, query=None, projection=None, sort=None):
+        with self._lock:
+            found = [dict(doc) for doc in self.docs.values() if matches(doc, query or {})]
+        for key, direction in reversed(sort or []):
+            found.sort(key=lambda d: _get(d, key), reverse=direction < 0)
+        return found
+
+    def find_one(self, query=None, projection=None, sort=None):
+        found = self.find(query, projection, sort)
+        return found[0] if found else None
+
+    def _apply(self, doc: dict, update: dict) -> None:
+        for key, value in update.get("$set", {}).items():
+            _set(doc, key, value)
+        for key, value in update.get("$inc", {}).items():
+            _set(doc, key, (_get(doc, key) or 0) + value)
+
+    def find_one_and_update(self, query, update, sort=None, return_document=None, **kwargs):
+        with self._lock:
+            candidates = [doc for doc in self.docs.values() if matches(doc, query)]
+            for key, direction in reversed(sort or []):
+                candidates.sort(key=lambda d: _get(d, key), reverse=direction < 0)
+            if not candidates:
+                return None
+            doc = candidates[0]
+            before = dict(doc)
+            self._apply(doc, update)
+            return dict(doc) if return_document else before
+
+    def update_one(self, query, update, upsert=False):
+        with self._lock:
+            for doc in self.docs.values():
+                if matches(doc, query):
+                    self._apply(doc, update)
+                    return SimpleNamespace(matched_count=1, modified_count=1)
+        return SimpleNamespace(matched_count=0, modified_count=0)
+
+
+    def delete_one(self, query):
+        with self._lock:
+            for key, doc in list(self.docs.items()):
+                if matches(doc, query):
+                    del self.docs[key]
+                    return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+
+class InMemoryDatabase:
+    def __init__(self):
+        self.collections: Dict[str, InMemoryCollection] = {}
+
+    def connect(self, collection_name: str):
+        collection = self.collections.setdefault(collection_name, InMemoryCollection())
+        return collection, None
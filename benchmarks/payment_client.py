@@ -0,0 +1,142 @@
+"""
+Latência das chamadas ao Mercado Pago (criação de preferência e consulta
+de pagamento) com o cliente HTTP padrão do SDK, que abre uma sessão nova
+por requisição, contra o cliente compartilhado com keep-alive e contra o
+cliente assíncrono (httpx) usado pelas rotas e pelos workers.
+
+O fake local aplica um atraso em cada conexão nova para representar o
+handshake TLS da API real.
+
+Uso: python -m benchmarks.payment_client [--calls 200] [--connection-latency 0.03]
+     [--jitter 0.005] [--error-rate 0.0]
+"""
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("MERCADO_PAGO_ACCESS_TOKEN", "benchmark")
+
+import mercadopago
+from mercadopago.http import HttpClient
+
+from benchmarks.mercadopago_stand_in import mercadopago_stand_in
+from benchmarks.stats import print_header, print_row, summarize
+from src.services.payment import mercadopago as payment_mod
+from src.services.payment.async_client import AsyncMercadoPagoClient
+from src.services.payment.client import MERCADO_PAGO_API_URL, PooledHttpClient
+
+PREFERENCE = {
+    "title": "Orçamento EloDrinks - Benchmark",
+    "unit_price": 150.0,
+    "quantity": 1,
+    "email": "cliente@example.com",
+    "id": "665f1c2e8f1b2a0012345678",
+}
+
+
+class PerRequestHttpClient(HttpClient):
+    """Cliente padrão do SDK apontado para o fake local."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+
+    def request(self, method, url, **kwargs):
+        return super().request(method, url.replace(MERCADO_PAGO_API_URL, self.base_url), **kwargs)
+
+
+def _bench(sdk, calls: int, concurrency: int):
+    payment_mod.sdk = sdk
+    latencies, errors = [], 0
+
+    def call(i):
+        start = time.perf_counter()
+        try:
+            if i % 2 == 0:
+                payment_mod.create_preference(PREFERENCE)
+            else:
+                sdk.payment().get("1")
+        except Exception:
+            return None
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for latency in executor.map(call, range(calls)):
+            if latency is None:
+                errors += 1
+            else:
+                latencies.append(latency)
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+async def _bench_async(client, calls: int, concurrency: int):
+    payment_mod.mp_client = client
+    latencies, errors = [], 0
+    slots = asyncio.Semaphore(concurrency)
+
+    async def call(i):
+        nonlocal errors
+        async with slots:
+            start = time.perf_counter()
+            try:
+                if i % 2 == 0:
+                    await payment_mod.create_preference_async(PREFERENCE)
+                else:
+                    await payment_mod.get_payment_async("1")
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call(i) for i in range(calls)))
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    return summarize(latencies, elapsed, errors)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", default="1,8")
+    parser.add_argument("--connection-latency", type=float, default=0.03)
+    parser.add_argument("--latency", type=float, default=0.002)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    token = os.environ["MERCADO_PAGO_ACCESS_TOKEN"]
+    with mercadopago_stand_in(
+        connection_latency=args.connection_latency,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        seed=42,
+    ) as (state, base_url):
+        state.payments["1"] = {"id": 1, "status": "approved", "external_reference": PREFERENCE["id"]}
+
+        print_header()
+        for level in levels:
+            before = state.connections
+            sdk = mercadopago.SDK(token, http_client=PerRequestHttpClient(base_url))
+            print_row("SDK padrão", level, _bench(sdk, args.calls, level))
+            print(f"{'':<28}conexões abertas: {state.connections - before}")
+
+            before = state.connections
+            pooled = PooledHttpClient(base_url=base_url, pool_size=level)
+            sdk = mercadopago.SDK(token, http_client=pooled)
+            print_row("cliente compartilhado", level, _bench(sdk, args.calls, level))
+            print(f"{'':<28}conexões abertas: {state.connections - before}")
+            pooled.close()
+
+            before = state.connections
+            client = AsyncMercadoPagoClient(access_token=token, base_url=base_url, pool_size=level)
+            print_row("cliente assíncrono", level, asyncio.run(_bench_async(client, args.calls, level)))
+            print(f"{'':<28}conexões abertas: {state.connections - before}")
+
+
+if __name__ == "__main__":
+    main()
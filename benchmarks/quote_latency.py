@@ -0,0 +1,43 @@
+"""
+Latência de uma cotação pelo catálogo em memória (quote_budget), a mesma
+conta feita em POST /budget e GET /budget/{id}/quote. A meta é ficar bem
+abaixo de 1 ms por cotação.
+
+Uso: python -m benchmarks.quote_latency [--iterations 20000]
+"""
+import argparse
+import os
+import timeit
+
+os.environ.setdefault("MERCADO_PAGO_ACCESS_TOKEN", "benchmark")
+
+from src.models.BudgetModels import BudgetDetails
+from src.services.pricing import quote_budget
+
+QUOTE_TARGET_SECONDS = 0.001
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    details = BudgetDetails(
+        description="Festa",
+        type="Aniversário",
+        date="2025-10-10",
+        num_barmans=2,
+        num_guests=50,
+        time=4.0,
+        package="Básico",
+        extras=["DJ", "Decoracao"],
+    )
+    quote_budget(details)
+
+    per_quote = timeit.timeit(lambda: quote_budget(details), number=args.iterations) / args.iterations
+    print(f"{'quote_budget':<28} {per_quote * 1e6:>8.2f} µs/cotação")
+    print(f"meta de {QUOTE_TARGET_SECONDS * 1e3:g} ms: {'ok' if per_quote < QUOTE_TARGET_SECONDS else 'acima'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Grade de preços pacote × convidados × horas: um validate_selection + compute_quote por célula
+contra a avaliação vetorizada de quote_matrix (NumPy) sobre a grade inteira.
+
+Uso: python -m benchmarks.quote_matrix [--guests 200] [--hours 24] [--repeat 5]
+"""
+import argparse
+import os
+import timeit
+
+os.environ.setdefault("MERCADO_PAGO_ACCESS_TOKEN", "benchmark")
+
+import numpy as np
+
+from src.services.pricing import PricingError, compute_quote, get_catalog, quote_matrix, validate_selection
+
+EXTRAS = ["DJ", "Drinks sem álcool", "Barman extra"]
+
+
+def loop_quote(package, num_guests, num_barmans, time, catalog):
+    try:
+        validate_selection(package, num_guests, time, EXTRAS, catalog=catalog)
+    except PricingError:
+        return np.nan
+    return compute_quote(package, num_guests, num_barmans, time, EXTRAS, catalog=catalog)["total"]
+
+
+def loop_matrix(packages, guests, hours, num_barmans, catalog):
+    return [
+        [[loop_quote(package, g, num_barmans, h, catalog) for h in hours] for g in guests]
+        for package in packages
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--guests", type=int, default=200)
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    packages = [rate.name for rate in catalog.packages.values()]
+    guests = list(range(10, 10 + args.guests * 5, 5))
+    hours = [1 + 0.5 * i for i in range(args.hours)]
+    cells = len(packages) * len(guests) * len(hours)
+
+    vectorized = quote_matrix(packages, guests, hours, num_barmans=2, extras=EXTRAS, catalog=catalog)
+    looped = np.array(loop_matrix(packages, guests, hours, 2, catalog))
+    assert np.allclose(vectorized, looped, atol=0.005, equal_nan=True), "resultados divergentes"
+
+    loop_time = min(timeit.repeat(
+        lambda: loop_matrix(packages, guests, hours, 2, catalog), number=1, repeat=args.repeat
+    ))
+    numpy_time = min(timeit.repeat(
+        lambda: quote_matrix(packages, guests, hours, num_barmans=2, extras=EXTRAS, catalog=catalog),
+        number=1,
+        repeat=args.repeat,
+    ))
+
+    print(f"células: {cells}")
+    print(f"{'loop (compute_quote)':<28} {loop_time * 1e3:>9.2f} ms  {loop_time / cells * 1e6:>7.3f} µs/célula")
+    print(f"{'vetorizado (NumPy)':<28} {numpy_time * 1e3:>9.2f} ms  {numpy_time / cells * 1e6:>7.3f} µs/célula")
+    print(f"aceleração: {loop_time / numpy_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
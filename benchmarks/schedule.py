@@ -0,0 +1,55 @@
+"""
+Escala de uma temporada inteira: eventos pagos espalhados por seis meses
+distribuídos entre a equipe por allocate_staff (varredura com heaps).
+A meta é ficar bem abaixo de meio segundo.
+
+Uso: python -m benchmarks.schedule [--events 3000] [--staff 120] [--repeat 5]
+"""
+import argparse
+import random
+import timeit
+from datetime import date, timedelta
+
+from src.services.schedule import allocate_staff, build_event
+
+SCHEDULE_TARGET_SECONDS = 0.5
+
+
+def season(events: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    first_day = date(2025, 10, 1)
+    return [
+        {
+            "_id": f"b{index}",
+            "budget": {
+                "date": f"{first_day + timedelta(days=rng.randrange(180))}T{rng.randrange(10, 22):02d}:00",
+                "time": rng.choice([3.0, 4.0, 5.0, 6.0]),
+                "num_barmans": rng.randint(1, 6),
+            },
+        }
+        for index in range(events)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=3000)
+    parser.add_argument("--staff", type=int, default=120)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    budgets = season(args.events)
+    staff = [f"Barman {index}" for index in range(args.staff)]
+
+    elapsed = min(timeit.repeat(
+        lambda: allocate_staff([build_event(budget) for budget in budgets], staff),
+        number=1,
+        repeat=args.repeat,
+    ))
+    print(f"eventos: {args.events}  equipe: {args.staff}")
+    print(f"{'allocate_staff':<28} {elapsed * 1e3:>9.2f} ms")
+    print(f"meta de {SCHEDULE_TARGET_SECONDS:g} s: {'ok' if elapsed < SCHEDULE_TARGET_SECONDS else 'acima'}")
+
+
+if __name__ == "__main__":
+    main()
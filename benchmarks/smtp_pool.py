@@ -0,0 +1,68 @@
+"""
+Compara o envio com uma conexão SMTP nova por mensagem (comportamento
+antigo) com o envio através do pool de conexões persistentes.
+
+Uso: python -m benchmarks.smtp_pool [--messages 200] [--concurrency 4]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.smtp_stand_in import smtp_stand_in
+
+
+def _run(label, send, messages, concurrency):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda _: send(), range(messages)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {messages / elapsed:>9.1f} emails/s  ({elapsed:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--session-latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    with smtp_stand_in(session_latency=args.session_latency) as (handler, host, port):
+        os.environ.update({
+            "EMAIL_HOST": host,
+            "EMAIL_PORT": str(port),
+            "EMAIL_USER": "bench@elodrinks.com",
+            "EMAIL_PASS": "bench",
+            "EMAIL_STARTTLS": "false",
+            "EMAIL_POOL_SIZE": str(args.concurrency),
+        })
+        os.environ.setdefault("MERCADO_PAGO_ACCESS_TOKEN", "benchmark")
+        from src.models.MailModels import EmailDetails
+        from src.services.email import sendMail
+
+        details = EmailDetails(
+            email="cliente@example.com",
+            name="Cliente Benchmark",
+            type="Aniversário",
+            date="2025-06-10",
+            value="150.00",
+            payment_link="https://example.com/pagar",
+        )
+
+        def send_without_pool():
+            msg = sendMail.build_message(details)
+            with sendMail._open_connection() as smtp:
+                smtp.send_message(msg)
+
+        def send_with_pool():
+            sendMail.send_email(details)
+
+        _run("conexão por mensagem", send_without_pool, args.messages, args.concurrency)
+        sessions_before = handler.sessions
+        _run("pool persistente", send_with_pool, args.messages, args.concurrency)
+        print(f"sessões SMTP abertas pelo pool: {handler.sessions - sessions_before}")
+        sendMail.smtp_pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import random
+import socket
+from contextlib import contextmanager
+from typing import Optional
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+logging.getLogger("mail.log").setLevel(logging.ERROR)
+
+
+class StandInHandler:
+    """
+    Handler do aiosmtpd que aceita qualquer mensagem.
+
+    session_latency: atraso aplicado no EHLO, simulando o custo de abrir
+    uma sessão (handshake TLS, autenticação) em um servidor real.
+    data_latency: atraso aplicado a cada mensagem recebida.
+    jitter: variação aleatória (0..jitter segundos) somada ao data_latency.
+    failure_rate: fração das mensagens recusadas com erro temporário 451.
+    """
+
+    def __init__(
+        self,
+        session_latency: float = 0.0,
+        data_latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.session_latency = session_latency
+        self.data_latency = data_latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self.sessions = 0
+        self.received = 0
+        self.rejected = 0
+        self.messages = []
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        if self.session_latency:
+            await asyncio.sleep(self.session_latency)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        delay = self.data_latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            self.rejected += 1
+            return "451 4.3.0 Falha simulada pelo stand-in"
+
+        self.received += 1
+        self.messages.append(envelope)
+        return "250 Message accepted for delivery"
+
+
+def _accept_any(server, session, envelope, mechanism, auth_data):
+    return AuthResult(success=True)
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def smtp_stand_in(
+    session_latency: float = 0.0,
+    data_latency: float = 0.0,
+    jitter: float = 0.0,
+    failure_rate: float = 0.0,
+    seed: Optional[int] = None,
+):
+    """Sobe um servidor SMTP local em uma thread e devolve (handler, host, port)."""
+    handler = StandInHandler(
+        session_latency=session_latency,
+        data_latency=data_latency,
+        jitter=jitter,
+        failure_rate=failure_rate,
+        seed=seed,
+    )
+    port = _free_port()
+    controller = Controller(
+        handler,
+        hostname="127.0.0.1",
+        port=port,
+        authenticator=_accept_any,
+        auth_require_tls=False,
+    )
+    controller.start()
+    try:
+        yield handler, "127.0.0.1", port
+    finally:
+        controller.stop()
@@ -0,0 +1,32 @@
+import math
+from typing import Dict, List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> Dict[str, float]:
+    total = len(latencies) + errors
+    return {
+        "ok": len(latencies),
+        "errors": errors,
+        "throughput": total / elapsed if elapsed else float("nan"),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def print_header() -> None:
+    print(f"{'cenário':<28}{'conc.':>6}{'ok':>7}{'erros':>7}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+
+
+def print_row(label: str, concurrency: int, stats: Dict[str, float]) -> None:
+    print(
+        f"{label:<28}{concurrency:>6}{stats['ok']:>7}{stats['errors']:>7}"
+        f"{stats['throughput']:>10.1f}{stats['p50_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+    )
@@ -1,13 +1,40 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Security
 from fastapi.middleware.cors import CORSMiddleware
 
 # from src.routers.userRouter import router as userRouter  
 # from src.routes.payment.create import router as payment_router
 from src.routes.budget import router as budget_router
+from src.routes.availability import router as availability_router
+from src.routes.schedule import router as schedule_router
+from src.services.email import outbox_workers
+from src.services.mongo import ensure_all_indexes
+from src.services.payment import webhook_workers
+from src.services.payment.async_client import mp_client
+from src.services.pricing import catalog_refresher
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    indexes = asyncio.create_task(ensure_all_indexes())
+    outbox_workers.start()
+    webhook_workers.start()
+    catalog_refresher.start()
+    yield
+    await catalog_refresher.stop()
+    await webhook_workers.stop()
+    await outbox_workers.stop()
+    await mp_client.aclose()
+    indexes.cancel()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(budget_router)  
+app.include_router(availability_router)
+app.include_router(schedule_router)
 # app.include_router(payment_router)
 
 app.add_middleware(
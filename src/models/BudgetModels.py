@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Annotated, Optional, List
 from pydantic import BaseModel, Field, EmailStr
 
 class BudgetDetails(BaseModel):
@@ -41,4 +41,15 @@ class Budget(BaseModel):
     phone: str
     budget: BudgetDetails
     status: str
-    value: Optional[float] = None
\ No newline at end of file
+    value: Optional[float] = None
+
+class QuoteMatrixIn(BaseModel):
+    type: str
+    packages: List[str] = Field(min_length=1)
+    num_guests: List[Annotated[int, Field(ge=0)]] = Field(min_length=1)
+    time: List[Annotated[float, Field(ge=0)]] = Field(min_length=1)
+    num_barmans: int = Field(default=1, ge=1)
+    extras: Optional[List[str]] = None
+
+class BudgetClaimIn(BaseModel):
+    operator: str = Field(min_length=1)
@@ -10,4 +10,7 @@ class EmailDetails(BaseModel):
     payment_link: str
     
 class EmailIn(BaseModel):
-    id: str = Field(alias="_id")
\ No newline at end of file
+    id: str = Field(alias="_id")
+    
+class BulkEmailIn(BaseModel):
+    ids: List[str] = Field(min_length=1)
\ No newline at end of file
@@ -0,0 +1,7 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+class ScheduleIn(BaseModel):
+    from_date: str = Field(alias="from")
+    to_date: str = Field(alias="to")
+    staff: List[str] = Field(min_length=1)
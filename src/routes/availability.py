@@ -0,0 +1,17 @@
+from fastapi import APIRouter, HTTPException, Query
+from src.services.availability import get_availability
+
+router = APIRouter(prefix="/availability", tags=["availability"])
+
+@router.get("", status_code=200, response_model=dict)
+async def get_availability_route(
+    from_date: str = Query(..., alias="from"),
+    to_date: str = Query(..., alias="to"),
+):
+    try:
+        availability = await get_availability(from_date, to_date)
+        return {"availability": availability}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
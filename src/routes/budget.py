@@ -1,17 +1,14 @@
 from fastapi import APIRouter, HTTPException, Request
-import mercadopago
-from src.models.BudgetModels import BudgetIn, BudgetUpdate
-from src.models.MailModels import EmailIn, EmailDetails
+from src.models.BudgetModels import BudgetClaimIn, BudgetDetails, BudgetIn, BudgetUpdate, QuoteMatrixIn
+from src.models.MailModels import EmailIn, BulkEmailIn
+from src.services.budget.claim import claim_pending_budget
 from src.services.budget.create import create_budget, update_budget_status_and_value
-from src.services.budget.read import get_all_budgets, get_pending_budgets, get_budget_by_id
-from src.services.payment import create_preference
-from src.services.email import send_email
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
-
-sdk = mercadopago.SDK(os.getenv("MERCADO_PAGO_ACCESS_TOKEN"))
+from src.services.budget.read import get_all_budgets, get_pending_budgets, get_budget_by_id, get_budgets_by_ids
+from src.services.budget.quote import get_budget_quote
+from src.services.budget.status_cache import get_payment_status
+from src.services.email import enqueue_email, get_email_status, send_bulk_emails
+from src.services.payment import enqueue_notification, verify_signature
+from src.services.pricing import PricingError, matrix_to_list, preview_quote, quote_cache_stats, quote_matrix
 
 router = APIRouter(prefix="/budget", tags=["budget"])
 
@@ -55,6 +52,56 @@ async def get_pending_budgets_route():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
+@router.post("/pending/claim", status_code=200, response_model=dict)
+async def claim_pending_budget_route(claimIn: BudgetClaimIn):
+    try:
+        budget = await claim_pending_budget(claimIn.operator)
+        return {"budget": budget}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+@router.post("/quote", status_code=200, response_model=dict)
+async def preview_quote_route(details: BudgetDetails):
+    try:
+        quote = preview_quote(details)
+        return {"quote": quote}
+    except PricingError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+@router.get("/quote/cache", status_code=200, response_model=dict)
+async def quote_cache_stats_route():
+    return {"cache": quote_cache_stats()}
+    
+@router.post("/quote/matrix", status_code=200, response_model=dict)
+async def quote_matrix_route(matrixIn: QuoteMatrixIn):
+    try:
+        prices = quote_matrix(
+            matrixIn.packages,
+            matrixIn.num_guests,
+            matrixIn.time,
+            num_barmans=matrixIn.num_barmans,
+            extras=matrixIn.extras,
+        )
+        return {
+            "type": matrixIn.type,
+            "packages": matrixIn.packages,
+            "num_guests": matrixIn.num_guests,
+            "time": matrixIn.time,
+            "prices": matrix_to_list(prices),
+        }
+    except PricingError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
 @router.get("/{budget_id}", status_code=200, response_model=dict)
 async def get_budget_by_id_route(budget_id: str):
     try:
@@ -65,38 +112,58 @@ async def get_budget_by_id_route(budget_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
-@router.post("/email/send", status_code=200, response_model=dict)
+@router.get("/{budget_id}/quote", status_code=200, response_model=dict)
+async def get_budget_quote_route(budget_id: str):
+    try:
+        quote = await get_budget_quote(budget_id)
+        return {"quote": quote}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+@router.get("/{budget_id}/payment-status", status_code=200, response_model=dict)
+async def get_budget_payment_status_route(budget_id: str):
+    try:
+        status = await get_payment_status(budget_id)
+        return {"payment": status}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+@router.post("/email/send", status_code=202, response_model=dict)
 async def send_budget_email_route(emailIn: EmailIn):
     try:
         budget = await get_budget_by_id(emailIn.id)
         if not budget:
             raise HTTPException(status_code=404, detail="Orçamento não encontrado")
-            
-        preference = {
-            "title": f"Orçamento EloDrinks - {budget['name']}",
-            "description": f"Orçamento para {budget['budget']['type']} na data {budget['budget']['date']}",
-            "unit_price": budget["value"],
-            "quantity": 1,
-            "email": budget["email"],
-            "id": str(budget["_id"]),
-            "auto_return": "approved"
-        }
-        
-        #TODO: Implementar logica de pegar o external reference como id do orçamento
-        link = create_preference(preference).get("initPoint")
-        
-        email_details = EmailDetails(
-            email=budget["email"],
-            name=budget["name"],
-            type=budget["budget"]["type"],
-            date=budget["budget"]["date"],
-            value=str(budget["value"]),
-            payment_link=link
-        )
-                
-        send_email(email_details)
-        
-        return {"message": "Email enviado com sucesso"}
+
+        result = await enqueue_email(budget)
+        message = "Email já enfileirado para envio" if result["duplicate"] else "Email enfileirado para envio"
+
+        return {"message": message, **result}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+@router.post("/email/send/bulk", status_code=200, response_model=dict)
+async def send_bulk_budget_emails_route(bulkIn: BulkEmailIn):
+    try:
+        budgets = await get_budgets_by_ids(bulkIn.ids)
+        results = await send_bulk_emails(bulkIn.ids, budgets)
+        return {"results": results}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+@router.get("/{budget_id}/email/status", status_code=200, response_model=dict)
+async def get_budget_email_status_route(budget_id: str):
+    try:
+        status = await get_email_status(budget_id)
+        return {"email": status}
     except HTTPException:
         raise
     except Exception as e:
@@ -105,29 +172,37 @@ async def send_budget_email_route(emailIn: EmailIn):
 
 @router.post("/webhook")
 async def webhook(request: Request):
-    body = await request.json()
-    
-    if "type" in body and body["type"] == "payment":
-        payment_id = body["data"]["id"]
+    # A assinatura cobre só cabeçalhos e query string: é conferida antes de
+    # ler o corpo, e requisições falsas não geram nenhuma chamada externa
+    query_data_id = request.query_params.get("data.id")
+    if not verify_signature(
+        request.headers.get("x-signature"),
+        request.headers.get("x-request-id"),
+        query_data_id,
+    ):
+        raise HTTPException(status_code=401, detail="Assinatura inválida")
 
-        try:
-            payment_info = sdk.payment().get(payment_id)
-            status = payment_info["response"]["status"]
-            external_reference = payment_info["response"]["external_reference"]
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Notificação inválida")
 
-            print(f"Pagamento recebido: ID={payment_id}, status={status}, ref={external_reference}")
+    if isinstance(body, dict) and body.get("type") == "payment":
+        payment_id = (body.get("data") or {}).get("id")
+        if not payment_id:
+            raise HTTPException(status_code=400, detail="Notificação sem id de pagamento")
+        if query_data_id is not None and str(payment_id).lower() != query_data_id.lower():
+            raise HTTPException(status_code=400, detail="Id de pagamento diverge do assinado")
 
-            #TODO: Implementar logica de pegar o external reference como id do orçamento
-            update_data = BudgetUpdate(
-                _id=external_reference,
-                new_status="paid" if status == "approved" else "failed"
-            )
-            
-            await update_budget_status_and_value(update_data)
-            
-            return {"message": "Notificação processada com sucesso"}
-        
+        # Só persiste e confirma: a consulta ao Mercado Pago e a atualização
+        # do orçamento ficam com os workers, dentro do prazo de resposta do MP
+        try:
+            result = await enqueue_notification(str(payment_id), body)
         except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Erro ao processar pagamento: {str(e)}")
-    
+            raise HTTPException(status_code=500, detail=f"Erro ao registrar notificação: {str(e)}")
+
+        if result["duplicate"]:
+            return {"message": "Notificação já recebida"}
+        return {"message": "Notificação recebida"}
+
     return {"message": "Tipo de notificação não tratada"}
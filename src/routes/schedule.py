@@ -0,0 +1,15 @@
+from fastapi import APIRouter, HTTPException
+from src.models.ScheduleModels import ScheduleIn
+from src.services.schedule import schedule_staff
+
+router = APIRouter(prefix="/schedule", tags=["schedule"])
+
+@router.post("", status_code=200, response_model=dict)
+async def schedule_staff_route(scheduleIn: ScheduleIn):
+    try:
+        schedule = await schedule_staff(scheduleIn.from_date, scheduleIn.to_date, scheduleIn.staff)
+        return {"schedule": schedule}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1 @@
+from .booking import CONFIRMED_STATUSES, get_availability, sync_booking
@@ -0,0 +1,23 @@
+"""
+Registra no índice de disponibilidade os orçamentos confirmados que ainda não
+foram contados, como os anteriores à criação do índice. Pode ser repetido.
+
+Uso:
+    python -m src.services.availability.backfill
+"""
+from src.services.mongo import connect
+from .booking import CONFIRMED_STATUSES, sync_booking
+
+
+def backfill_bookings() -> int:
+    collection, client = connect("budgets")
+    pending = collection.find({"status": {"$in": CONFIRMED_STATUSES}, "booked": {"$ne": True}}, {"_id": 1})
+    return sum(sync_booking(collection, budget["_id"]) for budget in pending)
+
+
+def main():
+    print(f"Orçamentos registrados na disponibilidade: {backfill_bookings()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import os
+from datetime import date, timedelta
+from typing import Optional
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+from pymongo.collection import Collection
+
+from src.services.mongo import connect
+
+load_dotenv()
+
+AVAILABILITY_COLLECTION = "availability"
+BARMEN_CAPACITY = int(os.getenv("BARMEN_CAPACITY", "10"))
+AVAILABILITY_MAX_DAYS = int(os.getenv("AVAILABILITY_MAX_DAYS", "366"))
+
+# Status em que o orçamento ocupa barmen na data do evento
+CONFIRMED_STATUSES = ["paid"]
+
+_BOOKING_PROJECTION = {"budget.date": 1, "budget.num_barmans": 1}
+
+
+def event_day(value: str) -> Optional[str]:
+    """Data do evento no formato AAAA-MM-DD, usada como _id do documento do dia."""
+    try:
+        return date.fromisoformat(value[:10]).isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
+def _apply(budget: dict, sign: int) -> None:
+    details = budget.get("budget") or {}
+    day = event_day(details.get("date"))
+    if day is None:
+        print(f"Orçamento {budget['_id']} sem data válida; disponibilidade não atualizada")
+        return
+    collection, client = connect(AVAILABILITY_COLLECTION)
+    collection.update_one(
+        {"_id": day},
+        {"$inc": {"booked_barmans": sign * details.get("num_barmans", 0), "events": sign}},
+        upsert=True,
+    )
+
+
+def sync_booking(budgets: Collection, budget_id) -> int:
+    """
+    Alinha o índice de disponibilidade ao status atual do orçamento.
+
+    A marca `booked` do orçamento é trocada atomicamente antes do `$inc`, então
+    só quem efetivamente a trocou altera os contadores do dia: chamadas
+    repetidas ou concorrentes não contam o mesmo orçamento duas vezes.
+    Devolve +1 ao reservar, -1 ao liberar e 0 quando nada mudou.
+    """
+    budget = budgets.find_one_and_update(
+        {"_id": budget_id, "status": {"$in": CONFIRMED_STATUSES}, "booked": {"$ne": True}},
+        {"$set": {"booked": True}},
+        projection=_BOOKING_PROJECTION,
+        return_document=ReturnDocument.BEFORE,
+    )
+    if budget is not None:
+        _apply(budget, 1)
+        return 1
+
+    budget = budgets.find_one_and_update(
+        {"_id": budget_id, "status": {"$nin": CONFIRMED_STATUSES}, "booked": True},
+        {"$set": {"booked": False}},
+        projection=_BOOKING_PROJECTION,
+        return_document=ReturnDocument.BEFORE,
+    )
+    if budget is not None:
+        _apply(budget, -1)
+        return -1
+    return 0
+
+
+def _parse_day(value: str, name: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Data inválida em '{name}': use AAAA-MM-DD")
+
+
+async def get_availability(from_date: str, to_date: str) -> dict:
+    start = _parse_day(from_date, "from")
+    end = _parse_day(to_date, "to")
+    if end < start:
+        raise HTTPException(status_code=400, detail="'to' deve ser igual ou posterior a 'from'")
+    total_days = (end - start).days + 1
+    if total_days > AVAILABILITY_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Intervalo máximo de {AVAILABILITY_MAX_DAYS} dias")
+
+    collection, client = connect(AVAILABILITY_COLLECTION)
+    try:
+        # Uma leitura pelo índice de _id cobre o intervalo inteiro
+        booked = {
+            doc["_id"]: doc
+            for doc in collection.find({"_id": {"$gte": start.isoformat(), "$lte": end.isoformat()}})
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar disponibilidade: {e}")
+
+    days = []
+    for offset in range(total_days):
+        day = (start + timedelta(days=offset)).isoformat()
+        doc = booked.get(day, {})
+        capacity = doc.get("capacity", BARMEN_CAPACITY)
+        booked_barmans = doc.get("booked_barmans", 0)
+        days.append({
+            "date": day,
+            "capacity": capacity,
+            "booked": booked_barmans,
+            "available": max(capacity - booked_barmans, 0),
+            "events": doc.get("events", 0),
+        })
+    return {"from": start.isoformat(), "to": end.isoformat(), "days": days}
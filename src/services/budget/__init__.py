@@ -1,2 +1,5 @@
 from .create import create_budget, update_budget_status_and_value
-from .read import get_all_budgets, get_pending_budgets, get_budget_by_id
\ No newline at end of file
+from .read import get_all_budgets, get_pending_budgets, get_budget_by_id, get_budgets_by_ids
+from .status_cache import get_payment_status, payment_status_cache
+from .quote import get_budget_quote
+from .claim import claim_pending_budget
@@ -0,0 +1,42 @@
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from pymongo import ASCENDING, ReturnDocument
+
+from src.services.mongo import connect
+
+load_dotenv()
+
+BUDGET_CLAIM_LEASE = float(os.getenv("BUDGET_CLAIM_LEASE", "900"))
+
+
+async def claim_pending_budget(operator: str, lease_seconds: float = BUDGET_CLAIM_LEASE) -> Optional[dict]:
+    """
+    Reserva atomicamente o próximo orçamento pendente ainda sem valor, pela data
+    do evento mais próxima, pelo índice (status, value, budget.date). A reserva
+    expira após `lease_seconds`; definir o valor do orçamento o tira da fila.
+    Devolve None quando não há orçamento livre.
+    """
+    collection, client = connect("budgets")
+    now = datetime.now(timezone.utc)
+    try:
+        budget = collection.find_one_and_update(
+            {
+                "status": "Pendente",
+                "value": None,
+                "$or": [{"claimed_until": None}, {"claimed_until": {"$lte": now}}],
+            },
+            {"$set": {"claimed_by": operator, "claimed_until": now + timedelta(seconds=lease_seconds)}},
+            sort=[("budget.date", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao reservar orçamento pendente: {e}")
+
+    if budget is None:
+        return None
+    budget["_id"] = str(budget["_id"])
+    return budget
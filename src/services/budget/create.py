@@ -2,30 +2,74 @@ from fastapi import HTTPException
 from src.services.mongo import connect
 from src.models.BudgetModels import BudgetIn, BudgetUpdate
 from bson import ObjectId
+from src.services.availability import sync_booking
+from src.services.pricing import PricingError, get_catalog, quote_budget, validate_details
+from .status_cache import payment_status_cache
 
 async def create_budget(budget: BudgetIn) -> str:
+    # Mesmo snapshot do catálogo para validar e cotar, mesmo que ele seja recarregado no meio
+    catalog = get_catalog()
+    try:
+        validate_details(budget.budget, catalog=catalog)
+    except PricingError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
     collection, client = connect("budgets")
     try:
         budget_data = budget.dict(by_alias=True, exclude_unset=True)
 
+        # Cotação sugerida pelo catálogo; o valor final continua sendo o do admin
+        budget_data["quote"] = quote_budget(budget.budget, catalog=catalog)
+
         result = collection.insert_one(budget_data)
 
         return str(result.inserted_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao inserir orçamento: {e}")
 
-async def update_budget_status_and_value(budget_update: BudgetUpdate) -> None:
+# Ordem dos status de pagamento: um orçamento nunca volta para um status
+# anterior (um "failed" atrasado não sobrescreve um "paid"). Status fora
+# desta lista, como os definidos manualmente, não são restringidos.
+STATUS_ORDER = ["Pendente", "failed", "paid"]
+
+
+def _later_statuses(status: str) -> list:
+    if status not in STATUS_ORDER:
+        return []
+    return STATUS_ORDER[STATUS_ORDER.index(status) + 1:]
+
+
+async def update_budget_status_and_value(budget_update: BudgetUpdate, monotonic: bool = False) -> bool:
+    """
+    Com `monotonic`, usado pelo webhook e pela conciliação, transições que
+    regridem o status são ignoradas e a função devolve False. Sem ele (ajuste
+    manual do admin) qualquer transição é aplicada.
+    """
     collection, client = connect("budgets")
     try:
         update_fields = {"status": budget_update.new_status}
         if budget_update.value is not None:
             update_fields["value"] = budget_update.value
 
-        result = collection.update_one(
-            {"_id": ObjectId(budget_update.id)},
-            {"$set": update_fields}
-        )
+        filter_query = {"_id": ObjectId(budget_update.id)}
+        later = _later_statuses(budget_update.new_status) if monotonic else []
+        if later:
+            filter_query["status"] = {"$nin": later}
+
+        result = collection.update_one(filter_query, {"$set": update_fields})
         if result.matched_count == 0:
+            if later and collection.find_one({"_id": filter_query["_id"]}, {"_id": 1}):
+                print(f"Transição para {budget_update.new_status} ignorada no orçamento {budget_update.id}")
+                payment_status_cache.invalidate(budget_update.id)
+                return False
             raise HTTPException(status_code=404, detail="Orçamento não encontrado")
+
+        # Mantém o polling de status do front em memória após o webhook
+        payment_status_cache.set(budget_update.id, budget_update.new_status)
+        try:
+            sync_booking(collection, filter_query["_id"])
+        except Exception as e:
+            print(f"Erro ao atualizar disponibilidade do orçamento {budget_update.id}: {e}")
+        return True
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao atualizar orçamento: {e}")
@@ -0,0 +1,13 @@
+from fastapi import HTTPException
+
+from src.models.BudgetModels import BudgetDetails
+from src.services.pricing import PricingError, quote_budget
+from .read import get_budget_by_id
+
+
+async def get_budget_quote(budget_id: str) -> dict:
+    budget = await get_budget_by_id(budget_id)
+    try:
+        return quote_budget(BudgetDetails(**budget["budget"]))
+    except PricingError as e:
+        raise HTTPException(status_code=422, detail=str(e))
@@ -1,7 +1,17 @@
 from fastapi import HTTPException
-from src.services.mongo import connect
+from src.services.mongo import connect, register_indexes
 from typing import List
 from bson import ObjectId
+from pymongo import ASCENDING
+
+
+@register_indexes
+def ensure_budget_indexes() -> None:
+    collection, client = connect("budgets")
+    # Listagem de pendentes, conciliação de pagamentos e fila de precificação
+    # (pendentes sem valor pela data do evento mais próxima)
+    collection.create_index([("status", ASCENDING), ("value", ASCENDING), ("budget.date", ASCENDING)])
+
 
 async def get_all_budgets() -> List[dict]:
     collection, client = connect("budgets")
@@ -37,3 +47,16 @@ async def get_budget_by_id(budget_id: str) -> dict:
         return budget
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar orçamento: {e}")
+
+async def get_budgets_by_ids(budget_ids: List[str]) -> List[dict]:
+    collection, client = connect("budgets")
+    try:
+        object_ids = [ObjectId(budget_id) for budget_id in budget_ids if ObjectId.is_valid(budget_id)]
+        budgets = list(collection.find({"_id": {"$in": object_ids}}))
+
+        for budget in budgets:
+            budget["_id"] = str(budget["_id"])
+
+        return budgets
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar orçamentos: {e}")
@@ -0,0 +1,83 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from bson import ObjectId
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+from src.services.mongo import connect
+
+load_dotenv()
+
+PAYMENT_STATUS_CACHE_TTL = float(os.getenv("PAYMENT_STATUS_CACHE_TTL", "30"))
+PAYMENT_STATUS_CACHE_SIZE = int(os.getenv("PAYMENT_STATUS_CACHE_SIZE", "10000"))
+
+
+class PaymentStatusCache:
+    """
+    Último status de pagamento conhecido por orçamento, com validade curta
+    para que atualizações feitas por outras instâncias apareçam logo.
+    """
+
+    def __init__(self, ttl: float = PAYMENT_STATUS_CACHE_TTL, max_size: int = PAYMENT_STATUS_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, budget_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(budget_id)
+            if entry is None:
+                return None
+            expires_at, status = entry
+            if expires_at <= time.monotonic():
+                del self._entries[budget_id]
+                return None
+            self._entries.move_to_end(budget_id)
+            return status
+
+    def set(self, budget_id: str, status: str) -> None:
+        with self._lock:
+            self._entries[budget_id] = (time.monotonic() + self.ttl, status)
+            self._entries.move_to_end(budget_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, budget_id: str) -> None:
+        with self._lock:
+            self._entries.pop(budget_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+payment_status_cache = PaymentStatusCache()
+
+
+def _read_status(budget_id: str) -> Optional[str]:
+    collection, client = connect("budgets")
+    # Só o status: o documento completo não é necessário para o polling
+    budget = collection.find_one({"_id": ObjectId(budget_id)}, {"_id": 0, "status": 1})
+    return budget.get("status") if budget else None
+
+
+async def get_payment_status(budget_id: str) -> dict:
+    status = payment_status_cache.get(budget_id)
+    if status is None:
+        if not ObjectId.is_valid(budget_id):
+            raise HTTPException(status_code=404, detail="Orçamento não encontrado")
+        try:
+            status = await asyncio.to_thread(_read_status, budget_id)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Erro ao buscar status do pagamento: {e}")
+        if status is None:
+            raise HTTPException(status_code=404, detail="Orçamento não encontrado")
+        payment_status_cache.set(budget_id, status)
+
+    return {"id": budget_id, "status": status, "paid": status == "paid"}
@@ -0,0 +1 @@
+from .breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
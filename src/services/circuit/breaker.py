@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Disjuntor para uma dependência externa.
+
+    closed: as chamadas passam; `failure_threshold` falhas seguidas abrem o circuito.
+    open: as chamadas falham na hora com CircuitOpenError até passar `recovery_timeout`.
+    half_open: até `half_open_max_calls` chamadas de teste; um sucesso fecha o
+    circuito, uma falha o abre de novo.
+
+    Nas chamadas assíncronas `timeout` impõe um prazo por chamada, e estourar o
+    prazo conta como falha. Nas síncronas o prazo fica com os timeouts do cliente.
+
+    `is_failure` decide quais exceções indicam a dependência fora do ar; as
+    demais (um destinatário recusado, por exemplo) são repassadas sem contar
+    como falha. Por padrão toda exceção conta.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        timeout: Optional[float] = None,
+        is_failure: Optional[Callable[[Exception], bool]] = None,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.timeout = timeout
+        self.is_failure = is_failure
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    raise CircuitOpenError(f"Circuito {self.name} aberto")
+                self._state = HALF_OPEN
+                self._trials = 0
+            if self._state == HALF_OPEN:
+                if self._trials >= self.half_open_max_calls:
+                    raise CircuitOpenError(f"Circuito {self.name} em teste")
+                self._trials += 1
+
+    def _on_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trials = 0
+
+    def _on_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._trials = 0
+
+    def _on_error(self, error: Exception) -> None:
+        if self.is_failure is None or self.is_failure(error):
+            self._on_failure()
+        else:
+            # A dependência respondeu: o erro é da chamada, não do serviço
+            self._on_success()
+
+    def _on_abort(self) -> None:
+        # Chamada cancelada por quem chamou: não diz nada sobre a dependência
+        with self._lock:
+            if self._state == HALF_OPEN and self._trials > 0:
+                self._trials -= 1
+
+    async def call(self, func: Callable[..., Awaitable[T]], *args, timeout: Optional[float] = None, **kwargs) -> T:
+        self._acquire()
+        deadline = timeout if timeout is not None else self.timeout
+        try:
+            try:
+                result = await asyncio.wait_for(func(*args, **kwargs), timeout=deadline)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Prazo de {deadline}s excedido em {self.name}") from None
+        except Exception as e:
+            self._on_error(e)
+            raise
+        except BaseException:
+            self._on_abort()
+            raise
+        self._on_success()
+        return result
+
+    def call_sync(self, func: Callable[..., T], *args, **kwargs) -> T:
+        self._acquire()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._on_error(e)
+            raise
+        except BaseException:
+            self._on_abort()
+            raise
+        self._on_success()
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trials = 0
@@ -1 +1,3 @@
-from .sendMail import send_email
\ No newline at end of file
+from .sendMail import send_email, send_email_async
+from .outbox import enqueue_email, get_email_status, outbox_workers
+from .bulk import send_bulk_emails
\ No newline at end of file
@@ -0,0 +1,88 @@
+import asyncio
+import os
+from typing import Dict, List
+
+from dotenv import load_dotenv
+
+from src.models.MailModels import EmailDetails
+from src.services.payment import get_or_create_preference_async
+from src.services import queue
+from . import idempotency
+from .outbox import OUTBOX_COLLECTION, build_email_job, email_idempotency_key
+from .sendMail import EMAIL_POOL_SIZE, send_email_async
+
+load_dotenv()
+
+BULK_PAYMENT_CONCURRENCY = int(os.getenv("BULK_PAYMENT_CONCURRENCY", "8"))
+BULK_EMAIL_CONCURRENCY = int(os.getenv("BULK_EMAIL_CONCURRENCY", str(EMAIL_POOL_SIZE)))
+BULK_MONGO_CONCURRENCY = int(os.getenv("BULK_MONGO_CONCURRENCY", "8"))
+
+
+async def _mongo(slots: asyncio.Semaphore, func, *args, **kwargs):
+    # pymongo é síncrono: roda em thread para não travar o event loop
+    async with slots:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+
+async def _send_one(
+    budget: dict,
+    payment_slots: asyncio.Semaphore,
+    email_slots: asyncio.Semaphore,
+    mongo_slots: asyncio.Semaphore,
+) -> dict:
+    if budget.get("value") is None:
+        return {"status": "error", "detail": "Orçamento sem valor definido"}
+
+    key = email_idempotency_key(budget)
+    try:
+        previous = await _mongo(mongo_slots, idempotency.reserve, key, budget["_id"])
+    except Exception as e:
+        return {"status": "error", "detail": str(e)}
+    if previous is not None:
+        return {"status": "duplicate", "detail": "Envio repetido dentro da janela de idempotência"}
+
+    job = build_email_job(budget)
+    try:
+        async with payment_slots:
+            preference = await get_or_create_preference_async(job["preference"])
+        link = preference.get("initPoint")
+
+        async with email_slots:
+            await send_email_async(EmailDetails(**job["email"], payment_link=link))
+    except Exception as e:
+        try:
+            await _mongo(mongo_slots, idempotency.release, key)
+        except Exception:
+            pass
+        return {"status": "error", "detail": str(e)}
+
+    try:
+        # Registra o envio na outbox para que o status e repetições apontem para ele
+        job["payment_link"] = link
+        job_id = await _mongo(
+            mongo_slots, queue.enqueue, OUTBOX_COLLECTION, job, budget_id=str(budget["_id"]), completed=True
+        )
+        await _mongo(mongo_slots, idempotency.record_result, key, {"id": job_id})
+    except Exception as e:
+        print(f"Erro ao registrar envio do orçamento {budget['_id']}: {e}")
+    return {"status": "sent"}
+
+
+async def send_bulk_emails(budget_ids: List[str], budgets: List[dict]) -> List[dict]:
+    payment_slots = asyncio.Semaphore(BULK_PAYMENT_CONCURRENCY)
+    email_slots = asyncio.Semaphore(BULK_EMAIL_CONCURRENCY)
+    mongo_slots = asyncio.Semaphore(BULK_MONGO_CONCURRENCY)
+
+    by_id: Dict[str, dict] = {budget["_id"]: budget for budget in budgets}
+    unique_ids = list(dict.fromkeys(budget_ids))
+    found = [budget_id for budget_id in unique_ids if budget_id in by_id]
+
+    outcomes = await asyncio.gather(
+        *(_send_one(by_id[budget_id], payment_slots, email_slots, mongo_slots) for budget_id in found)
+    )
+    results = dict(zip(found, outcomes))
+
+    return [
+        {"id": budget_id, **results.get(budget_id, {"status": "not_found", "detail": "Orçamento não encontrado"})}
+        for budget_id in unique_ids
+    ]
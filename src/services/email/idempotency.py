@@ -0,0 +1,66 @@
+import hashlib
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from dotenv import load_dotenv
+from pymongo.errors import DuplicateKeyError
+
+from src.services.mongo import connect, register_indexes
+
+load_dotenv()
+
+IDEMPOTENCY_COLLECTION = "email_idempotency"
+EMAIL_IDEMPOTENCY_WINDOW = int(os.getenv("EMAIL_IDEMPOTENCY_WINDOW", "600"))
+
+
+@register_indexes
+def ensure_idempotency_indexes() -> None:
+    collection, client = connect(IDEMPOTENCY_COLLECTION)
+    collection.create_index("created_at", expireAfterSeconds=EMAIL_IDEMPOTENCY_WINDOW)
+
+
+def idempotency_key(budget_id: str, value, template_version: str) -> str:
+    raw = f"{budget_id}:{value}:{template_version}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def reserve(key: str, budget_id: str) -> Optional[dict]:
+    """
+    Tenta reservar a chave. Devolve None quando o envio é novo, ou o
+    registro anterior quando é uma repetição dentro da janela.
+    """
+    collection, client = connect(IDEMPOTENCY_COLLECTION)
+    now = datetime.now(timezone.utc)
+    try:
+        collection.insert_one({"_id": key, "budget_id": budget_id, "created_at": now, "result": None})
+        return None
+    except DuplicateKeyError:
+        pass
+
+    # O monitor de TTL do Mongo roda a cada ~60s: um registro vencido ainda
+    # pode existir, e nesse caso a chave é renovada para este envio
+    renewed = collection.find_one_and_update(
+        {"_id": key, "created_at": {"$lt": now - timedelta(seconds=EMAIL_IDEMPOTENCY_WINDOW)}},
+        {"$set": {"created_at": now, "result": None}},
+    )
+    if renewed is not None:
+        return None
+
+    return collection.find_one({"_id": key}) or {"_id": key, "result": None}
+
+
+def record_result(key: str, result: dict) -> None:
+    collection, client = connect(IDEMPOTENCY_COLLECTION)
+    collection.update_one({"_id": key}, {"$set": {"result": result}})
+
+
+def release(key: str) -> None:
+    collection, client = connect(IDEMPOTENCY_COLLECTION)
+    collection.delete_one({"_id": key})
+
+
+def release_for_job(key: str, job_id: str) -> None:
+    """Libera a chave só se ela ainda apontar para o job, sem apagar uma reserva mais nova."""
+    collection, client = connect(IDEMPOTENCY_COLLECTION)
+    collection.delete_one({"_id": key, "result.id": job_id})
@@ -0,0 +1,126 @@
+import asyncio
+import os
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+from src.models.MailModels import EmailDetails
+from src.services.payment import get_or_create_preference_async
+from src.services import queue
+from . import idempotency, sendMail
+from .sendMail import send_email_async
+
+load_dotenv()
+
+OUTBOX_COLLECTION = "email_outbox"
+
+EMAIL_OUTBOX_WORKERS = int(os.getenv("EMAIL_OUTBOX_WORKERS", "2"))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "5"))
+EMAIL_OUTBOX_BASE_DELAY = float(os.getenv("EMAIL_OUTBOX_BASE_DELAY", "5"))
+
+
+def build_email_job(budget: dict) -> dict:
+    return {
+        "preference": {
+            "title": f"Orçamento EloDrinks - {budget['name']}",
+            "description": f"Orçamento para {budget['budget']['type']} na data {budget['budget']['date']}",
+            "unit_price": budget["value"],
+            "quantity": 1,
+            "email": budget["email"],
+            "id": str(budget["_id"]),
+            "auto_return": "approved",
+        },
+        "email": {
+            "email": budget["email"],
+            "name": budget["name"],
+            "type": budget["budget"]["type"],
+            "date": budget["budget"]["date"],
+            "value": str(budget["value"]),
+        },
+        "payment_link": None,
+    }
+
+
+def email_idempotency_key(budget: dict) -> str:
+    return idempotency.idempotency_key(str(budget["_id"]), budget.get("value"), sendMail.budget_template.version)
+
+
+async def enqueue_email(budget: dict) -> dict:
+    # Sem valor não há como criar a preferência: o job falharia em todas as tentativas
+    if budget.get("value") is None:
+        raise HTTPException(status_code=422, detail="Orçamento sem valor definido")
+
+    budget_id = str(budget["_id"])
+    key = email_idempotency_key(budget)
+    try:
+        previous = await asyncio.to_thread(idempotency.reserve, key, budget_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao enfileirar e-mail: {e}")
+
+    if previous is not None:
+        return {"id": (previous.get("result") or {}).get("id"), "duplicate": True}
+
+    try:
+        job = build_email_job(budget)
+        job["idempotency_key"] = key
+        job_id = await asyncio.to_thread(queue.enqueue, OUTBOX_COLLECTION, job, budget_id=budget_id)
+        await asyncio.to_thread(idempotency.record_result, key, {"id": job_id})
+    except Exception as e:
+        # Libera a chave para que uma nova tentativa não seja tratada como repetição
+        try:
+            await asyncio.to_thread(idempotency.release, key)
+        except Exception:
+            pass
+        raise HTTPException(status_code=500, detail=f"Erro ao enfileirar e-mail: {e}")
+
+    outbox_workers.notify()
+    return {"id": job_id, "duplicate": False}
+
+
+async def deliver_email(job: dict) -> None:
+    payload = job["payload"]
+
+    # O link é persistido no job para que novas tentativas não criem outra preferência
+    link = payload.get("payment_link")
+    if not link:
+        preference = await get_or_create_preference_async(payload["preference"])
+        link = preference.get("initPoint")
+        await asyncio.to_thread(queue.update_payload, OUTBOX_COLLECTION, job["_id"], {"payment_link": link})
+
+    await send_email_async(EmailDetails(**payload["email"], payment_link=link))
+
+
+async def release_failed_email(job: dict) -> None:
+    # Um e-mail que falhou de vez pode ser reenviado sem esperar a janela de idempotência
+    key = job["payload"].get("idempotency_key")
+    if key:
+        await asyncio.to_thread(idempotency.release_for_job, key, str(job["_id"]))
+
+
+async def get_email_status(budget_id: str) -> dict:
+    try:
+        job = await asyncio.to_thread(queue.latest_for_budget, OUTBOX_COLLECTION, budget_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar status do e-mail: {e}")
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Nenhum e-mail encontrado para este orçamento")
+
+    return {
+        "id": str(job["_id"]),
+        "status": job["status"],
+        "attempts": job.get("attempts", 0),
+        "last_error": job.get("last_error"),
+        "created_at": job.get("created_at"),
+        "completed_at": job.get("completed_at"),
+    }
+
+
+outbox_workers = queue.QueueWorkerPool(
+    OUTBOX_COLLECTION,
+    deliver_email,
+    concurrency=EMAIL_OUTBOX_WORKERS,
+    max_attempts=EMAIL_OUTBOX_MAX_ATTEMPTS,
+    base_delay=EMAIL_OUTBOX_BASE_DELAY,
+    on_failed=release_failed_email,
+)
@@ -0,0 +1,196 @@
+import asyncio
+import smtplib
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+import aiosmtplib
+
+
+class SMTPPool:
+    def __init__(
+        self,
+        factory: Callable[[], smtplib.SMTP],
+        max_size: int = 4,
+        idle_timeout: float = 60.0,
+        check_after: float = 5.0,
+    ):
+        self._factory = factory
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._check_after = check_after
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            smtp = self._checkout()
+            try:
+                yield smtp
+            except Exception:
+                self._discard(smtp)
+                raise
+            self._checkin(smtp)
+
+    def send(self, msg) -> None:
+        try:
+            with self.connection() as smtp:
+                smtp.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # A conexão caiu entre o NOOP e o envio: tenta uma única vez com uma nova
+            with self.connection() as smtp:
+                smtp.send_message(msg)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for smtp, _ in idle:
+            self._discard(smtp)
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                smtp, last_used = self._idle.pop()
+
+            idle_for = time.monotonic() - last_used
+            if idle_for > self._idle_timeout:
+                self._discard(smtp)
+                continue
+            if idle_for > self._check_after and not self._is_alive(smtp):
+                self._discard(smtp)
+                continue
+            return smtp
+
+        return self._factory()
+
+    def _checkin(self, smtp: smtplib.SMTP) -> None:
+        with self._lock:
+            if len(self._idle) < self._max_size:
+                self._idle.append((smtp, time.monotonic()))
+                return
+        self._discard(smtp)
+
+    @staticmethod
+    def _is_alive(smtp: smtplib.SMTP) -> bool:
+        try:
+            code, _ = smtp.noop()
+            return code == 250
+        except Exception:
+            return False
+
+    @staticmethod
+    def _discard(smtp: smtplib.SMTP) -> None:
+        try:
+            smtp.quit()
+        except Exception:
+            try:
+                smtp.close()
+            except Exception:
+                pass
+
+
+class AsyncSMTPPool:
+    def __init__(
+        self,
+        factory: Callable[[], Awaitable[Any]],
+        max_size: int = 4,
+        idle_timeout: float = 60.0,
+        check_after: float = 5.0,
+    ):
+        self._factory = factory
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._check_after = check_after
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._idle: List[Tuple[Any, float]] = []
+
+    def _bind_loop(self) -> None:
+        # Conexões asyncio pertencem ao loop que as criou; se o loop mudar
+        # (ex.: reinício do servidor, TestClient) o pool recomeça do zero
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            idle, old_loop = self._idle, self._loop
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self._max_size)
+            self._idle = []
+            for smtp, _ in idle:
+                self._drop(smtp, old_loop)
+
+    def _drop(self, smtp, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        # Encerra a sessão no loop dono da conexão se ele ainda roda em outra
+        # thread; senão só fecha o transporte para não vazar o socket
+        if loop is not None and loop.is_running() and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._discard(smtp), loop)
+            return
+        try:
+            smtp.close()
+        except Exception:
+            pass
+
+    @asynccontextmanager
+    async def connection(self):
+        self._bind_loop()
+        async with self._slots:
+            smtp = await self._checkout()
+            try:
+                yield smtp
+            except BaseException:
+                # Estado da sessão é desconhecido (erro ou cancelamento): fecha sem conversar
+                smtp.close()
+                raise
+            self._checkin(smtp)
+
+    async def send(self, msg) -> None:
+        try:
+            async with self.connection() as smtp:
+                await smtp.send_message(msg)
+        except aiosmtplib.SMTPServerDisconnected:
+            async with self.connection() as smtp:
+                await smtp.send_message(msg)
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for smtp, _ in idle:
+            await self._discard(smtp)
+
+    async def _checkout(self):
+        while self._idle:
+            smtp, last_used = self._idle.pop()
+            idle_for = time.monotonic() - last_used
+            if idle_for > self._idle_timeout:
+                await self._discard(smtp)
+                continue
+            if idle_for > self._check_after and not await self._is_alive(smtp):
+                await self._discard(smtp)
+                continue
+            return smtp
+
+        return await self._factory()
+
+    def _checkin(self, smtp) -> None:
+        if len(self._idle) < self._max_size:
+            self._idle.append((smtp, time.monotonic()))
+
+    @staticmethod
+    async def _is_alive(smtp) -> bool:
+        try:
+            response = await smtp.noop()
+            return response.code == 250
+        except Exception:
+            return False
+
+    @staticmethod
+    async def _discard(smtp) -> None:
+        try:
+            await smtp.quit()
+        except Exception:
+            try:
+                smtp.close()
+            except Exception:
+                pass
@@ -1,8 +1,12 @@
 import smtplib
-from email.message import EmailMessage
+import aiosmtplib
+from email.message import EmailMessage, MIMEPart
 from dotenv import load_dotenv
 import os
 from src.models.MailModels import EmailDetails
+from src.services.circuit import CircuitBreaker
+from .pool import AsyncSMTPPool, SMTPPool
+from .template import CompiledTemplate
 
 load_dotenv()
 
@@ -10,40 +14,118 @@ EMAIL_HOST = os.getenv("EMAIL_HOST")
 EMAIL_PORT = int(os.getenv("EMAIL_PORT"))
 EMAIL_USER = os.getenv("EMAIL_USER")
 EMAIL_PASS = os.getenv("EMAIL_PASS")
+EMAIL_STARTTLS = os.getenv("EMAIL_STARTTLS", "true").lower() != "false"
+EMAIL_TIMEOUT = float(os.getenv("EMAIL_TIMEOUT", "10"))
+EMAIL_POOL_SIZE = int(os.getenv("EMAIL_POOL_SIZE", "4"))
+EMAIL_DEADLINE = float(os.getenv("EMAIL_DEADLINE", "20"))
+EMAIL_BREAKER_THRESHOLD = int(os.getenv("EMAIL_BREAKER_THRESHOLD", "5"))
+EMAIL_BREAKER_RECOVERY = float(os.getenv("EMAIL_BREAKER_RECOVERY", "30"))
 
 WHATSAPP_CONTATO = os.getenv("WHATSAPP_CONTATO")
 EMAIL_CONTATO = os.getenv("EMAIL_CONTATO")
 
+EMAIL_TEMPLATE_RELOAD = os.getenv("EMAIL_TEMPLATE_RELOAD", "false").lower() == "true"
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
 
-def send_email(email_details: EmailDetails):
+EMAIL_SUBJECT = "Orçamento EloDrinks para sua festa 🥳"
+EMAIL_PLAIN_TEXT = "Seu cliente precisa de um e-mail com HTML para visualizar este conteúdo."
+
+budget_template = CompiledTemplate(
+    os.path.join(TEMPLATES_DIR, "budget_email.html"),
+    static_fields={"whatsapp_contato": WHATSAPP_CONTATO, "email_contato": EMAIL_CONTATO},
+    reload=EMAIL_TEMPLATE_RELOAD,
+)
+
+_plain_part = MIMEPart()
+_plain_part.set_content(EMAIL_PLAIN_TEXT)
+
+
+def _open_connection() -> smtplib.SMTP:
+    smtp = smtplib.SMTP(EMAIL_HOST, EMAIL_PORT, timeout=EMAIL_TIMEOUT)
+    try:
+        if EMAIL_STARTTLS:
+            smtp.starttls()
+        if EMAIL_USER:
+            smtp.login(EMAIL_USER, EMAIL_PASS)
+    except Exception:
+        smtp.close()
+        raise
+    return smtp
+
+
+async def _open_async_connection() -> aiosmtplib.SMTP:
+    smtp = aiosmtplib.SMTP(
+        hostname=EMAIL_HOST,
+        port=EMAIL_PORT,
+        username=EMAIL_USER or None,
+        password=EMAIL_PASS if EMAIL_USER else None,
+        start_tls=EMAIL_STARTTLS,
+        timeout=EMAIL_TIMEOUT,
+    )
+    await smtp.connect()
+    return smtp
+
+
+def is_smtp_unavailable(error: Exception) -> bool:
+    """
+    Só erros de conexão, desconexão e prazo indicam o servidor fora do ar.
+    Recusas de uma mensagem (destinatário inválido, 5xx no DATA) não abrem o circuito.
+    """
+    if isinstance(error, (ConnectionError, TimeoutError, smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if isinstance(error, (smtplib.SMTPException, aiosmtplib.SMTPException)):
+        return False
+    # Falhas de socket (DNS, rede) chegam como OSError
+    return isinstance(error, OSError)
+
+
+smtp_pool = SMTPPool(_open_connection, max_size=EMAIL_POOL_SIZE)
+async_smtp_pool = AsyncSMTPPool(_open_async_connection, max_size=EMAIL_POOL_SIZE)
+
+# O prazo cobre a espera por uma conexão do pool além do envio em si
+smtp_breaker = CircuitBreaker(
+    "smtp",
+    failure_threshold=EMAIL_BREAKER_THRESHOLD,
+    recovery_timeout=EMAIL_BREAKER_RECOVERY,
+    timeout=EMAIL_DEADLINE,
+    is_failure=is_smtp_unavailable,
+)
+
+
+def build_message(email_details: EmailDetails) -> EmailMessage:
     msg = EmailMessage()
-    msg["Subject"] = "Orçamento EloDrinks para sua festa 🥳"
+    msg["Subject"] = EMAIL_SUBJECT
     msg["From"] = EMAIL_USER
     msg["To"] = email_details.email
 
-    corpo_html = f"""
-    <html>
-        <body>
-            <p>Olá {email_details.name},<br><br>
-            Nós da <strong>EloDrinks</strong> olhamos com cuidado e fizemos com carinho o orçamento para sua festa de <strong>{email_details.type}</strong> na data <strong>{email_details.date}</strong>.<br><br>
-            O valor final para seu pedido é <strong>R${email_details.value}</strong>.<br><br>
-            <a href="{email_details.payment_link}" style="padding:10px 15px; background-color:#28a745; color:white; text-decoration:none; border-radius:5px;">Confirmar pedido e realizar pagamento</a><br><br>
-            Caso tenha alguma ressalva, entre em contato conosco:<br>
-            📞 WhatsApp: {WHATSAPP_CONTATO}<br>
-            📧 Email: {EMAIL_CONTATO}<br><br>
-            Atenciosamente,<br>
-            Equipe <strong>EloDrinks</strong></p>
-        </body>
-    </html>
-    """
+    corpo_html = budget_template.render(
+        name=email_details.name,
+        type=email_details.type,
+        date=email_details.date,
+        value=email_details.value,
+        payment_link=email_details.payment_link,
+    )
+    html_part = MIMEPart()
+    html_part.set_content(corpo_html, subtype="html")
+
+    # A parte de texto é sempre a mesma e é compartilhada entre as mensagens
+    msg.make_alternative()
+    msg.attach(_plain_part)
+    msg.attach(html_part)
+    return msg
+
 
-    msg.set_content("Seu cliente precisa de um e-mail com HTML para visualizar este conteúdo.")
-    msg.add_alternative(corpo_html, subtype='html')
+def send_email(email_details: EmailDetails):
+    msg = build_message(email_details)
+    try:
+        smtp_breaker.call_sync(smtp_pool.send, msg)
+    except Exception as e:
+        raise Exception(f"Erro ao enviar e-mail: {e}")
 
+
+async def send_email_async(email_details: EmailDetails):
+    msg = build_message(email_details)
     try:
-        with smtplib.SMTP(EMAIL_HOST, EMAIL_PORT) as smtp:
-            smtp.starttls()
-            smtp.login(EMAIL_USER, EMAIL_PASS)
-            smtp.send_message(msg)
+        await smtp_breaker.call(async_smtp_pool.send, msg)
     except Exception as e:
         raise Exception(f"Erro ao enviar e-mail: {e}")
@@ -0,0 +1,89 @@
+import hashlib
+import html
+import os
+import threading
+from string import Template
+from typing import Dict, Optional, Tuple
+
+Compiled = Tuple[Tuple[Tuple[str, str], ...], str]
+
+
+def compile_template(text: str, static_fields: Optional[Dict[str, object]] = None) -> Compiled:
+    """
+    Quebra o template em pares (texto literal, campo) uma única vez.
+    Campos estáticos (contatos, por exemplo) já são embutidos no texto
+    literal, então a renderização só concatena os campos do orçamento.
+    """
+    static_fields = static_fields or {}
+    parts = []
+    literal = []
+    pos = 0
+
+    for match in Template.pattern.finditer(text):
+        literal.append(text[pos:match.start()])
+        pos = match.end()
+
+        if match.group("escaped") is not None:
+            literal.append(Template.delimiter)
+            continue
+
+        name = match.group("named") or match.group("braced")
+        if name is None:
+            raise ValueError(f"Placeholder inválido no template na posição {match.start()}")
+
+        if name in static_fields:
+            literal.append(html.escape(str(static_fields[name])))
+        else:
+            parts.append(("".join(literal), name))
+            literal = []
+
+    literal.append(text[pos:])
+    return tuple(parts), "".join(literal)
+
+
+class CompiledTemplate:
+    def __init__(self, path: str, static_fields: Optional[Dict[str, object]] = None, reload: bool = False):
+        self.path = path
+        self.static_fields = dict(static_fields or {})
+        self.reload = reload
+        self.version: str = ""
+        self._lock = threading.Lock()
+        self._mtime: Optional[int] = None
+        self._compiled: Compiled = ((), "")
+        self._load()
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        return tuple(name for _, name in self._compiled[0])
+
+    def _load(self) -> None:
+        with open(self.path, encoding="utf-8") as f:
+            text = f.read()
+        mtime = os.stat(self.path).st_mtime_ns
+
+        # Troca atômica: quem já está renderizando continua com a versão anterior
+        self._compiled = compile_template(text, self.static_fields)
+        self.version = hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+        self._mtime = mtime
+
+    def _reload_if_changed(self) -> None:
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    self._load()
+
+    def render(self, **fields) -> str:
+        if self.reload:
+            self._reload_if_changed()
+
+        parts, tail = self._compiled
+        out = []
+        for literal, name in parts:
+            out.append(literal)
+            out.append(html.escape(str(fields[name])))
+        out.append(tail)
+        return "".join(out)
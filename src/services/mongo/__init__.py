@@ -1 +1,2 @@
-from .mongo import connect
\ No newline at end of file
+from .mongo import connect
+from .indexes import register_indexes, ensure_all_indexes
\ No newline at end of file
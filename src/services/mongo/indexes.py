@@ -0,0 +1,26 @@
+import asyncio
+import os
+from typing import Callable, List
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MONGO_ENSURE_INDEXES = os.getenv("MONGO_ENSURE_INDEXES", "true").lower() != "false"
+
+_index_builders: List[Callable[[], None]] = []
+
+
+def register_indexes(builder: Callable[[], None]) -> Callable[[], None]:
+    _index_builders.append(builder)
+    return builder
+
+
+async def ensure_all_indexes() -> None:
+    if not MONGO_ENSURE_INDEXES:
+        return
+    for builder in _index_builders:
+        try:
+            await asyncio.to_thread(builder)
+        except Exception as e:
+            print(f"Erro ao criar índices ({builder.__name__}): {e}")
@@ -1 +1,4 @@
-from .mercadopago import create_preference
\ No newline at end of file
+from .mercadopago import create_preference, create_preference_async, get_payment, get_payment_async, mercadopago_breaker
+from .preference_cache import get_or_create_preference_async
+from .webhook import enqueue_notification, webhook_workers
+from .signature import verify_signature
@@ -0,0 +1,102 @@
+import asyncio
+import uuid
+from typing import Optional, Set
+
+import httpx
+
+from .client import (
+    MERCADO_PAGO_ACCESS_TOKEN,
+    MERCADO_PAGO_BASE_URL,
+    MERCADO_PAGO_CONNECT_TIMEOUT,
+    MERCADO_PAGO_POOL_SIZE,
+    MERCADO_PAGO_READ_TIMEOUT,
+)
+
+
+class AsyncMercadoPagoClient:
+    """
+    Cliente asyncio dos endpoints do Mercado Pago usados pela API.
+    As respostas seguem o formato do SDK: {"status": <http>, "response": <json>}.
+    """
+
+    def __init__(
+        self,
+        access_token: Optional[str] = MERCADO_PAGO_ACCESS_TOKEN,
+        base_url: str = MERCADO_PAGO_BASE_URL,
+        connect_timeout: float = MERCADO_PAGO_CONNECT_TIMEOUT,
+        read_timeout: float = MERCADO_PAGO_READ_TIMEOUT,
+        pool_size: int = MERCADO_PAGO_POOL_SIZE,
+    ):
+        self.access_token = access_token
+        self.base_url = base_url.rstrip("/")
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._closing: Set[asyncio.Future] = set()
+
+    def _discard(self, client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop) -> None:
+        # Fecha o cliente trocado no loop dele quando ainda roda em outra thread;
+        # senão tenta no loop atual, onde as conexões já mortas só são descartadas
+        if loop is not None and loop.is_running() and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+
+        async def close():
+            try:
+                await client.aclose()
+            except Exception:
+                pass
+
+        task = asyncio.ensure_future(close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def _http(self) -> httpx.AsyncClient:
+        # O pool do httpx pertence ao loop em que foi criado
+        loop = asyncio.get_running_loop()
+        if self._client is None or loop is not self._loop:
+            if self._client is not None:
+                self._discard(self._client, self._loop)
+            self._loop = loop
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=self.limits,
+                headers={"Authorization": f"Bearer {self.access_token}"},
+            )
+        return self._client
+
+    async def _request(self, method: str, path: str, **kwargs) -> dict:
+        api_result = await self._http().request(method, path, **kwargs)
+        response = {"status": api_result.status_code, "response": None}
+
+        if api_result.status_code != 204 and api_result.content:
+            try:
+                response["response"] = api_result.json()
+            except ValueError:
+                response["response"] = {"message": api_result.text}
+
+        return response
+
+    async def create_preference(self, preference_data: dict) -> dict:
+        return await self._request(
+            "POST",
+            "/checkout/preferences",
+            json=preference_data,
+            headers={"X-Idempotency-Key": str(uuid.uuid4())},
+        )
+
+    async def get_payment(self, payment_id) -> dict:
+        return await self._request("GET", f"/v1/payments/{payment_id}")
+
+    async def search_payments(self, filters: dict) -> dict:
+        return await self._request("GET", "/v1/payments/search", params=filters)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+mp_client = AsyncMercadoPagoClient()
@@ -0,0 +1,95 @@
+import os
+
+import mercadopago
+import requests
+from dotenv import load_dotenv
+from mercadopago.http import HttpClient
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+load_dotenv()
+
+MERCADO_PAGO_ACCESS_TOKEN = os.getenv("MERCADO_PAGO_ACCESS_TOKEN")
+MERCADO_PAGO_API_URL = "https://api.mercadopago.com"
+MERCADO_PAGO_BASE_URL = os.getenv("MERCADO_PAGO_BASE_URL", MERCADO_PAGO_API_URL).rstrip("/")
+MERCADO_PAGO_CONNECT_TIMEOUT = float(os.getenv("MERCADO_PAGO_CONNECT_TIMEOUT", "3"))
+MERCADO_PAGO_READ_TIMEOUT = float(os.getenv("MERCADO_PAGO_READ_TIMEOUT", "10"))
+MERCADO_PAGO_POOL_SIZE = int(os.getenv("MERCADO_PAGO_POOL_SIZE", "10"))
+MERCADO_PAGO_MAX_RETRIES = int(os.getenv("MERCADO_PAGO_MAX_RETRIES", "2"))
+MERCADO_PAGO_DEADLINE = float(os.getenv("MERCADO_PAGO_DEADLINE", "10"))
+MERCADO_PAGO_BREAKER_THRESHOLD = int(os.getenv("MERCADO_PAGO_BREAKER_THRESHOLD", "5"))
+MERCADO_PAGO_BREAKER_RECOVERY = float(os.getenv("MERCADO_PAGO_BREAKER_RECOVERY", "30"))
+
+
+class PooledHttpClient(HttpClient):
+    """
+    Cliente HTTP para o SDK do Mercado Pago que mantém uma única
+    requests.Session, reaproveitando conexões keep-alive entre chamadas
+    (o cliente padrão do SDK abre uma sessão nova a cada requisição).
+    """
+
+    def __init__(
+        self,
+        base_url: str = MERCADO_PAGO_BASE_URL,
+        pool_size: int = MERCADO_PAGO_POOL_SIZE,
+        connect_timeout: float = MERCADO_PAGO_CONNECT_TIMEOUT,
+        read_timeout: float = MERCADO_PAGO_READ_TIMEOUT,
+        max_retries: int = MERCADO_PAGO_MAX_RETRIES,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+
+        # Só GETs são repetidos: repetir o POST da preferência poderia duplicá-la
+        retry = Retry(
+            total=max_retries,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            backoff_factor=0.2,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _url(self, url: str) -> str:
+        if self.base_url != MERCADO_PAGO_API_URL and url.startswith(MERCADO_PAGO_API_URL):
+            return self.base_url + url[len(MERCADO_PAGO_API_URL):]
+        return url
+
+    def request(self, method, url, **kwargs):
+        for sdk_option in ("timeout", "maxretries", "retry_on", "backoff_factor"):
+            kwargs.pop(sdk_option, None)
+
+        api_result = self.session.request(method, self._url(url), timeout=self.timeout, **kwargs)
+        response = {"status": api_result.status_code, "response": None}
+
+        if api_result.status_code != 204 and api_result.content:
+            try:
+                response["response"] = api_result.json()
+            except ValueError:
+                response["response"] = {"message": api_result.text}
+
+        return response
+
+    def get(self, url, headers, params=None, **kwargs):
+        return self.request("GET", url, headers=headers, params=params, **kwargs)
+
+    def post(self, url, headers, data=None, params=None, **kwargs):
+        return self.request("POST", url, headers=headers, data=data, params=params, **kwargs)
+
+    def put(self, url, headers, data=None, params=None, **kwargs):
+        return self.request("PUT", url, headers=headers, data=data, params=params, **kwargs)
+
+    def delete(self, url, headers, params=None, **kwargs):
+        return self.request("DELETE", url, headers=headers, params=params, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+# Caminho síncrono do SDK: a API usa só o AsyncMercadoPagoClient (mp_client).
+# Este cliente fica para benchmarks e scripts fora do event loop, com as
+# mesmas configurações acima
+http_client = PooledHttpClient()
+
+sdk = mercadopago.SDK(MERCADO_PAGO_ACCESS_TOKEN, http_client=http_client)
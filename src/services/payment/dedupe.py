@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from dotenv import load_dotenv
+from pymongo.errors import DuplicateKeyError
+
+from src.services.mongo import connect, register_indexes
+
+load_dotenv()
+
+DEDUPE_COLLECTION = "webhook_dedupe"
+WEBHOOK_DEDUPE_WINDOW = int(os.getenv("WEBHOOK_DEDUPE_WINDOW", "86400"))
+WEBHOOK_DEDUPE_CACHE_SIZE = int(os.getenv("WEBHOOK_DEDUPE_CACHE_SIZE", "10000"))
+
+
+@register_indexes
+def ensure_dedupe_indexes() -> None:
+    collection, client = connect(DEDUPE_COLLECTION)
+    collection.create_index("created_at", expireAfterSeconds=WEBHOOK_DEDUPE_WINDOW)
+
+
+class DedupeStore:
+    """
+    Registro de notificações já vistas. A unicidade vem do _id na coleção
+    (compartilhada entre instâncias); um LRU em memória responde as
+    repetições mais comuns sem ir ao Mongo.
+    """
+
+    def __init__(self, window: float = WEBHOOK_DEDUPE_WINDOW, cache_size: int = WEBHOOK_DEDUPE_CACHE_SIZE):
+        self.window = window
+        self.cache_size = cache_size
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def seen(self, key: str) -> bool:
+        """Consulta só o cache em memória; não faz I/O."""
+        with self._lock:
+            expires_at = self._seen.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.monotonic():
+                del self._seen[key]
+                return False
+            self._seen.move_to_end(key)
+            return True
+
+    def _remember(self, key: str) -> None:
+        with self._lock:
+            self._seen[key] = time.monotonic() + self.window
+            self._seen.move_to_end(key)
+            while len(self._seen) > self.cache_size:
+                self._seen.popitem(last=False)
+
+    def claim(self, key: str) -> bool:
+        """Devolve True na primeira vez que a chave aparece dentro da janela."""
+        if self.seen(key):
+            return False
+
+        collection, client = connect(DEDUPE_COLLECTION)
+        now = datetime.now(timezone.utc)
+        try:
+            collection.insert_one({"_id": key, "created_at": now})
+            claimed = True
+        except DuplicateKeyError:
+            # Registro vencido que o monitor de TTL ainda não removeu
+            renewed = collection.find_one_and_update(
+                {"_id": key, "created_at": {"$lt": now - timedelta(seconds=self.window)}},
+                {"$set": {"created_at": now}},
+            )
+            claimed = renewed is not None
+
+        self._remember(key)
+        return claimed
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._seen.pop(key, None)
+        collection, client = connect(DEDUPE_COLLECTION)
+        collection.delete_one({"_id": key})
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._seen.clear()
+
+
+def notification_key(payment_id: str, notification_id) -> str:
+    return f"notification:{payment_id}:{notification_id}"
+
+
+def status_key(payment_id: str, status: str) -> str:
+    return f"status:{payment_id}:{status}"
+
+
+dedupe_store = DedupeStore()
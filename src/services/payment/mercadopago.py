@@ -1,11 +1,12 @@
-import mercadopago
-import os
-from dotenv import load_dotenv
 import uuid
-
-load_dotenv()
-
-sdk = mercadopago.SDK(os.getenv("MERCADO_PAGO_ACCESS_TOKEN"))
+from src.services.circuit import CircuitBreaker
+from .client import (
+    MERCADO_PAGO_BREAKER_RECOVERY,
+    MERCADO_PAGO_BREAKER_THRESHOLD,
+    MERCADO_PAGO_DEADLINE,
+    sdk,
+)
+from .async_client import mp_client
 
 BACK_URLS = {
     "success": "https://clara-portfolio-olive.vercel.app/",
@@ -13,8 +14,38 @@ BACK_URLS = {
     "pending": "https://clara-portfolio-olive.vercel.app/",
 }
 
-def create_preference(data: dict):
-    preference_data = {
+mercadopago_breaker = CircuitBreaker(
+    "mercadopago",
+    failure_threshold=MERCADO_PAGO_BREAKER_THRESHOLD,
+    recovery_timeout=MERCADO_PAGO_BREAKER_RECOVERY,
+    timeout=MERCADO_PAGO_DEADLINE,
+)
+
+
+def _raise_for_status(response: dict, unavailable_only: bool = False) -> dict:
+    # Só 429 e 5xx indicam a API indisponível; os demais 4xx são erro da chamada
+    status = response.get("status", 200)
+    if status >= 500 or status == 429 or (status >= 400 and not unavailable_only):
+        raise Exception(f"Mercado Pago respondeu {status}: {response['response']}")
+    return response
+
+
+def _call_sync(request, *args) -> dict:
+    def attempt():
+        return _raise_for_status(request(*args), unavailable_only=True)
+
+    return _raise_for_status(mercadopago_breaker.call_sync(attempt))
+
+
+async def _call_async(request, *args) -> dict:
+    async def attempt():
+        return _raise_for_status(await request(*args), unavailable_only=True)
+
+    return _raise_for_status(await mercadopago_breaker.call(attempt))
+
+
+def build_preference_data(data: dict) -> dict:
+    return {
         "items": [
             {
                 "id": str(uuid.uuid4()),
@@ -41,8 +72,13 @@ def create_preference(data: dict):
         }
     }
 
+
+def create_preference(data: dict):
+    # Versão síncrona, sem uso nas rotas: serve a benchmarks e scripts
+    preference_data = build_preference_data(data)
+
     try:
-        preference_response = sdk.preference().create(preference_data)
+        preference_response = _call_sync(sdk.preference().create, preference_data)
         init_point = preference_response["response"]["init_point"]
         preference_id = preference_response["response"]["id"]
 
@@ -53,3 +89,34 @@ def create_preference(data: dict):
 
     except Exception as e:
         raise Exception(f"Erro ao criar preferência de pagamento: {str(e)}")
+
+
+async def create_preference_async(data: dict):
+    preference_data = build_preference_data(data)
+
+    try:
+        preference_response = await _call_async(mp_client.create_preference, preference_data)
+
+        return {
+            "initPoint": preference_response["response"]["init_point"],
+            "preferenceId": preference_response["response"]["id"]
+        }
+
+    except Exception as e:
+        raise Exception(f"Erro ao criar preferência de pagamento: {str(e)}")
+
+
+def get_payment(payment_id) -> dict:
+    # Versão síncrona, sem uso nas rotas: serve a benchmarks e scripts
+    payment_response = _call_sync(sdk.payment().get, payment_id)
+    return payment_response["response"]
+
+
+async def get_payment_async(payment_id) -> dict:
+    payment_response = await _call_async(mp_client.get_payment, payment_id)
+    return payment_response["response"]
+
+
+async def search_payments_async(filters: dict) -> list:
+    search_response = await _call_async(mp_client.search_payments, filters)
+    return search_response["response"].get("results", [])
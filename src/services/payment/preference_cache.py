@@ -0,0 +1,73 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from src.services.mongo import connect, register_indexes
+from .mercadopago import create_preference_async
+
+load_dotenv()
+
+PREFERENCE_COLLECTION = "payment_preferences"
+PAYMENT_PREFERENCE_TTL = int(os.getenv("PAYMENT_PREFERENCE_TTL", "86400"))
+
+
+@register_indexes
+def ensure_preference_indexes() -> None:
+    collection, client = connect(PREFERENCE_COLLECTION)
+    collection.create_index("expires_at", expireAfterSeconds=0)
+
+
+def find_preference(budget_id: str, value) -> Optional[dict]:
+    """Devolve a preferência ainda válida do orçamento para este valor, se houver."""
+    collection, client = connect(PREFERENCE_COLLECTION)
+    doc = collection.find_one({
+        "_id": budget_id,
+        "value": value,
+        "expires_at": {"$gt": datetime.now(timezone.utc)},
+    })
+    if not doc:
+        return None
+    return {"initPoint": doc["init_point"], "preferenceId": doc["preference_id"]}
+
+
+def store_preference(budget_id: str, value, preference: dict) -> None:
+    collection, client = connect(PREFERENCE_COLLECTION)
+    now = datetime.now(timezone.utc)
+    collection.update_one(
+        {"_id": budget_id},
+        {"$set": {
+            "value": value,
+            "init_point": preference["initPoint"],
+            "preference_id": preference["preferenceId"],
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=PAYMENT_PREFERENCE_TTL),
+        }},
+        upsert=True,
+    )
+
+
+async def get_or_create_preference_async(data: dict) -> dict:
+    """
+    Reaproveita a preferência já criada para o orçamento enquanto o valor
+    não mudar e ela não expirar; caso contrário cria uma nova no Mercado Pago.
+    """
+    budget_id, value = data["id"], data["unit_price"]
+
+    # Falhas do cache não impedem o envio: no pior caso cria-se outra preferência
+    try:
+        cached = await asyncio.to_thread(find_preference, budget_id, value)
+    except Exception as e:
+        print(f"Erro ao buscar preferência do orçamento {budget_id}: {e}")
+        cached = None
+    if cached is not None:
+        return cached
+
+    preference = await create_preference_async(data)
+    try:
+        await asyncio.to_thread(store_preference, budget_id, value, preference)
+    except Exception as e:
+        print(f"Erro ao salvar preferência do orçamento {budget_id}: {e}")
+    return preference
@@ -0,0 +1,151 @@
+"""
+Conciliação dos orçamentos aguardando pagamento com o Mercado Pago, para
+recuperar notificações de webhook perdidas.
+
+Uso (agendado via cron ou similar):
+    python -m src.services.payment.reconcile [--batch-size 50] [--rate 5] [--concurrency 4]
+"""
+import argparse
+import asyncio
+import os
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from pymongo import ASCENDING, UpdateOne
+
+from src.services.availability import CONFIRMED_STATUSES, sync_booking
+from src.services.budget.status_cache import payment_status_cache
+from src.services.mongo import connect
+from .async_client import mp_client
+from .mercadopago import search_payments_async
+
+load_dotenv()
+
+RECONCILE_BATCH_SIZE = int(os.getenv("RECONCILE_BATCH_SIZE", "50"))
+RECONCILE_RATE = float(os.getenv("RECONCILE_RATE", "5"))
+RECONCILE_CONCURRENCY = int(os.getenv("RECONCILE_CONCURRENCY", "4"))
+
+AWAITING_STATUSES = ["Pendente", "failed"]
+FAILED_PAYMENT_STATUSES = {"rejected", "cancelled", "refunded", "charged_back"}
+
+
+class RateLimiter:
+    """Espaça as chamadas para no máximo `rate` por segundo."""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self._next = 0.0
+
+    async def wait(self) -> None:
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def find_awaiting_budgets() -> List[dict]:
+    # Coberta pelo prefixo (status, value) do índice dos orçamentos
+    collection, client = connect("budgets")
+    cursor = collection.find(
+        {"status": {"$in": AWAITING_STATUSES}, "value": {"$ne": None}},
+        {"_id": 1, "status": 1},
+    ).sort("_id", ASCENDING)
+    return list(cursor)
+
+
+def resolve_status(payments: List[dict]) -> Optional[str]:
+    """Status do orçamento a partir dos pagamentos da referência, ou None se ainda indefinido."""
+    statuses = {payment.get("status") for payment in payments}
+    if "approved" in statuses:
+        return "paid"
+    if statuses and statuses <= FAILED_PAYMENT_STATUSES:
+        return "failed"
+    return None
+
+
+def apply_updates(updates: List[tuple]) -> int:
+    if not updates:
+        return 0
+    collection, client = connect("budgets")
+    # O filtro pelo status lido evita sobrescrever o que o webhook aplicou nesse meio tempo
+    result = collection.bulk_write(
+        [
+            UpdateOne({"_id": budget["_id"], "status": budget["status"]}, {"$set": {"status": new_status}})
+            for budget, new_status in updates
+        ],
+        ordered=False,
+    )
+    for budget, new_status in updates:
+        payment_status_cache.invalidate(str(budget["_id"]))
+        if new_status in CONFIRMED_STATUSES:
+            try:
+                sync_booking(collection, budget["_id"])
+            except Exception as e:
+                print(f"Erro ao atualizar disponibilidade do orçamento {budget['_id']}: {e}")
+    return result.modified_count
+
+
+async def _search(budget: dict, limiter: RateLimiter, slots: asyncio.Semaphore) -> List[dict]:
+    async with slots:
+        await limiter.wait()
+        return await search_payments_async({
+            "external_reference": str(budget["_id"]),
+            "sort": "date_created",
+            "criteria": "desc",
+        })
+
+
+async def reconcile_payments(
+    batch_size: int = RECONCILE_BATCH_SIZE,
+    rate: float = RECONCILE_RATE,
+    concurrency: int = RECONCILE_CONCURRENCY,
+) -> dict:
+    budgets = await asyncio.to_thread(find_awaiting_budgets)
+    limiter = RateLimiter(rate)
+    slots = asyncio.Semaphore(concurrency)
+    summary = {"checked": len(budgets), "updated": 0, "errors": 0}
+
+    for start in range(0, len(budgets), batch_size):
+        batch = budgets[start:start + batch_size]
+        results = await asyncio.gather(
+            *(_search(budget, limiter, slots) for budget in batch),
+            return_exceptions=True,
+        )
+
+        updates = []
+        for budget, payments in zip(batch, results):
+            if isinstance(payments, Exception):
+                print(f"Erro ao buscar pagamentos do orçamento {budget['_id']}: {payments}")
+                summary["errors"] += 1
+                continue
+            new_status = resolve_status(payments)
+            if new_status and new_status != budget["status"]:
+                updates.append((budget, new_status))
+
+        summary["updated"] += await asyncio.to_thread(apply_updates, updates)
+
+    return summary
+
+
+async def _run(args) -> dict:
+    try:
+        return await reconcile_payments(args.batch_size, args.rate, args.concurrency)
+    finally:
+        await mp_client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concilia orçamentos pendentes com o Mercado Pago")
+    parser.add_argument("--batch-size", type=int, default=RECONCILE_BATCH_SIZE)
+    parser.add_argument("--rate", type=float, default=RECONCILE_RATE)
+    parser.add_argument("--concurrency", type=int, default=RECONCILE_CONCURRENCY)
+    args = parser.parse_args()
+
+    summary = asyncio.run(_run(args))
+    print(f"Orçamentos verificados: {summary['checked']}  atualizados: {summary['updated']}  erros: {summary['errors']}")
+
+
+if __name__ == "__main__":
+    main()
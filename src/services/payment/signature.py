@@ -0,0 +1,92 @@
+import hashlib
+import hmac
+import os
+import time
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MERCADO_PAGO_WEBHOOK_SECRET = os.getenv("MERCADO_PAGO_WEBHOOK_SECRET")
+# Diferença máxima, em segundos, entre o ts assinado e o relógio local
+MERCADO_PAGO_SIGNATURE_TOLERANCE = float(os.getenv("MERCADO_PAGO_SIGNATURE_TOLERANCE", "300"))
+
+# A chave é processada uma vez; cada verificação só copia o estado do HMAC
+_keyed_hmac = (
+    hmac.new(MERCADO_PAGO_WEBHOOK_SECRET.encode("utf-8"), digestmod=hashlib.sha256)
+    if MERCADO_PAGO_WEBHOOK_SECRET
+    else None
+)
+
+if _keyed_hmac is None:
+    print("MERCADO_PAGO_WEBHOOK_SECRET não definido: assinatura do webhook não será verificada")
+
+
+def _parse_signature(x_signature: str) -> tuple:
+    ts = v1 = None
+    for part in x_signature.split(","):
+        key, _, value = part.strip().partition("=")
+        if key == "ts":
+            ts = value
+        elif key == "v1":
+            v1 = value
+    return ts, v1
+
+
+def _within_tolerance(ts: str, now: Optional[float] = None) -> bool:
+    try:
+        signed_at = float(ts)
+    except ValueError:
+        return False
+    # O Mercado Pago já enviou ts em milissegundos em algumas versões
+    if signed_at > 1e11:
+        signed_at /= 1000
+    now = time.time() if now is None else now
+    return abs(now - signed_at) <= MERCADO_PAGO_SIGNATURE_TOLERANCE
+
+
+def build_manifest(data_id: Optional[str], request_id: Optional[str], ts: str) -> str:
+    # Campos ausentes na notificação são omitidos do manifesto
+    manifest = ""
+    if data_id:
+        manifest += f"id:{data_id.lower()};"
+    if request_id:
+        manifest += f"request-id:{request_id};"
+    return manifest + f"ts:{ts};"
+
+
+def sign(manifest: str, keyed_hmac: Optional["hmac.HMAC"] = None) -> str:
+    mac = (keyed_hmac or _keyed_hmac).copy()
+    mac.update(manifest.encode("utf-8"))
+    return mac.hexdigest()
+
+
+def verify_signature(
+    x_signature: Optional[str],
+    request_id: Optional[str],
+    data_id: Optional[str],
+    keyed_hmac: Optional["hmac.HMAC"] = None,
+    now: Optional[float] = None,
+) -> bool:
+    """
+    Confere o cabeçalho x-signature do Mercado Pago (HMAC-SHA256 de
+    "id:<data.id>;request-id:<x-request-id>;ts:<ts>;"). Sem segredo
+    configurado a verificação é desativada.
+
+    O data.id é obrigatório, para que o id usado na consulta seja sempre
+    assinado, e o ts precisa estar dentro da tolerância, para que uma
+    assinatura capturada não possa ser reaproveitada depois.
+    """
+    keyed_hmac = keyed_hmac or _keyed_hmac
+    if keyed_hmac is None:
+        return True
+    if not x_signature or not data_id:
+        return False
+
+    ts, v1 = _parse_signature(x_signature)
+    if not ts or not v1 or not _within_tolerance(ts, now):
+        return False
+
+    expected = sign(build_manifest(data_id, request_id, ts), keyed_hmac)
+    return hmac.compare_digest(expected, v1)
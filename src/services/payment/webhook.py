@@ -0,0 +1,91 @@
+import asyncio
+import os
+
+from bson import ObjectId
+from dotenv import load_dotenv
+
+from src.models.BudgetModels import BudgetUpdate
+from src.services import queue
+from src.services.budget.create import update_budget_status_and_value
+from .dedupe import dedupe_store, notification_key, status_key
+from .mercadopago import get_payment_async
+
+load_dotenv()
+
+WEBHOOK_COLLECTION = "payment_notifications"
+
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "2"))
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "8"))
+WEBHOOK_BASE_DELAY = float(os.getenv("WEBHOOK_BASE_DELAY", "5"))
+
+budget_locks = queue.KeyedLock()
+
+
+async def enqueue_notification(payment_id: str, notification: dict) -> dict:
+    """
+    Persiste a notificação bruta para processamento fora da requisição.
+    Reenvios do mesmo evento (mesmo id de notificação) são descartados.
+    """
+    key = None
+    if notification.get("id") is not None:
+        key = notification_key(payment_id, notification["id"])
+        if dedupe_store.seen(key) or not await asyncio.to_thread(dedupe_store.claim, key):
+            return {"id": None, "duplicate": True}
+
+    try:
+        job_id = await asyncio.to_thread(
+            queue.enqueue,
+            WEBHOOK_COLLECTION,
+            {"payment_id": payment_id, "notification": notification},
+        )
+    except Exception:
+        # Libera a chave para que o reenvio do Mercado Pago seja aceito
+        if key is not None:
+            await asyncio.to_thread(dedupe_store.release, key)
+        raise
+
+    webhook_workers.notify()
+    return {"id": job_id, "duplicate": False}
+
+
+async def process_notification(job: dict) -> None:
+    payment_id = job["payload"]["payment_id"]
+
+    payment_info = await get_payment_async(payment_id)
+    status = payment_info["status"]
+    external_reference = payment_info.get("external_reference")
+
+    print(f"Pagamento recebido: ID={payment_id}, status={status}, ref={external_reference}")
+
+    # Sem referência a um orçamento o erro é permanente: repetir o job só
+    # consultaria o Mercado Pago de novo com o mesmo resultado
+    if not isinstance(external_reference, str) or not ObjectId.is_valid(external_reference):
+        print(f"Pagamento {payment_id} ignorado: referência externa inválida ({external_reference!r})")
+        return
+
+    # Atualizações do mesmo orçamento são serializadas; orçamentos
+    # diferentes seguem em paralelo entre os workers
+    async with budget_locks.hold(str(external_reference)):
+        # O mesmo status do mesmo pagamento já foi aplicado: nada a escrever
+        key = status_key(payment_id, status)
+        if dedupe_store.seen(key) or not await asyncio.to_thread(dedupe_store.claim, key):
+            return
+
+        update_data = BudgetUpdate(
+            _id=external_reference,
+            new_status="paid" if status == "approved" else "failed"
+        )
+        try:
+            await update_budget_status_and_value(update_data, monotonic=True)
+        except Exception:
+            await asyncio.to_thread(dedupe_store.release, key)
+            raise
+
+
+webhook_workers = queue.QueueWorkerPool(
+    WEBHOOK_COLLECTION,
+    process_notification,
+    concurrency=WEBHOOK_WORKERS,
+    max_attempts=WEBHOOK_MAX_ATTEMPTS,
+    base_delay=WEBHOOK_BASE_DELAY,
+)
@@ -0,0 +1,5 @@
+from .catalog import Catalog, ExtraRate, PackageRate, build_catalog, get_catalog, load_catalog, on_catalog_change, set_catalog
+from .engine import PricingError, compute_quote, quote_budget, validate_details, validate_selection
+from .matrix import matrix_to_list, quote_matrix
+from .preview import clear_quote_cache, preview_quote, quote_cache_stats
+from .store import catalog_refresher, publish_catalog, refresh_catalog
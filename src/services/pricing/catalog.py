@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, List, Mapping, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PRICING_CATALOG_PATH = os.getenv(
+    "PRICING_CATALOG_PATH",
+    os.path.join(os.path.dirname(__file__), "catalog.json"),
+)
+
+EXTRA_UNITS = ("event", "guest", "hour")
+
+
+@dataclass(frozen=True)
+class PackageRate:
+    name: str
+    base: float
+    per_guest: float
+    per_barman_hour: float
+    min_hours: float = 0.0
+    max_hours: Optional[float] = None
+    min_guests: int = 0
+    max_guests: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class ExtraRate:
+    name: str
+    price: float
+    unit: str = "event"
+
+
+@dataclass(frozen=True)
+class Catalog:
+    """Tabela de preços imutável; as chaves dos mapas são os nomes normalizados."""
+
+    version: str
+    currency: str
+    packages: Mapping[str, PackageRate]
+    extras: Mapping[str, ExtraRate]
+
+    def package(self, name: str) -> Optional[PackageRate]:
+        return self.packages.get(normalize_name(name))
+
+    def extra(self, name: str) -> Optional[ExtraRate]:
+        return self.extras.get(normalize_name(name))
+
+
+def normalize_name(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+def catalog_version(data: dict) -> str:
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def build_catalog(data: dict, version: Optional[str] = None) -> Catalog:
+    packages = {}
+    for name, rate in data["packages"].items():
+        packages[normalize_name(name)] = PackageRate(name=name, **rate)
+
+    extras = {}
+    for name, rate in data.get("extras", {}).items():
+        extra = ExtraRate(name=name, **rate)
+        if extra.unit not in EXTRA_UNITS:
+            raise ValueError(f"Unidade inválida para o adicional {name}: {extra.unit}")
+        extras[normalize_name(name)] = extra
+
+    return Catalog(
+        version=version or catalog_version(data),
+        currency=data.get("currency", "BRL"),
+        packages=MappingProxyType(packages),
+        extras=MappingProxyType(extras),
+    )
+
+
+def load_catalog(path: str = PRICING_CATALOG_PATH) -> Catalog:
+    with open(path, encoding="utf-8") as f:
+        return build_catalog(json.load(f))
+
+
+_catalog: Optional[Catalog] = None
+_listeners: List[Callable[[Catalog], None]] = []
+
+
+def on_catalog_change(listener: Callable[[Catalog], None]) -> Callable[[Catalog], None]:
+    """Registra uma função chamada sempre que o catálogo em uso é trocado."""
+    _listeners.append(listener)
+    return listener
+
+
+def get_catalog() -> Catalog:
+    """Catálogo carregado uma única vez por processo."""
+    global _catalog
+    if _catalog is None:
+        _catalog = load_catalog()
+    return _catalog
+
+
+def set_catalog(catalog: Catalog) -> None:
+    global _catalog
+    _catalog = catalog
+    for listener in _listeners:
+        listener(catalog)
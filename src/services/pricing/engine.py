@@ -0,0 +1,118 @@
+from typing import Iterable, List, Optional
+
+from src.models.BudgetModels import BudgetDetails
+from .catalog import Catalog, get_catalog, normalize_name
+
+
+class PricingError(ValueError):
+    pass
+
+
+def unique_extras(extras: Optional[Iterable[str]]) -> List[str]:
+    """
+    Adicionais sem repetição, comparados pelo nome normalizado (como em quote_key).
+    Cada adicional é cobrado uma vez, por mais que apareça na lista.
+    """
+    seen = set()
+    result = []
+    for name in extras or ():
+        key = normalize_name(name)
+        if key not in seen:
+            seen.add(key)
+            result.append(name)
+    return result
+
+
+def validate_selection(
+    package: str,
+    num_guests: int,
+    time: float,
+    extras: Optional[Iterable[str]] = None,
+    catalog: Optional[Catalog] = None,
+) -> None:
+    """
+    Confere pacote, adicionais e limites do pacote contra o catálogo em memória.
+    Horas abaixo do mínimo não são erro: são cobradas pelo mínimo.
+    """
+    catalog = catalog or get_catalog()
+    rate = catalog.package(package)
+    if rate is None:
+        raise PricingError(f"Pacote desconhecido: {package}")
+    if time < 0:
+        raise PricingError("A duração do evento não pode ser negativa")
+    if num_guests < rate.min_guests:
+        raise PricingError(f"O pacote {rate.name} exige ao menos {rate.min_guests} convidados")
+    if rate.max_guests is not None and num_guests > rate.max_guests:
+        raise PricingError(f"O pacote {rate.name} atende no máximo {rate.max_guests} convidados")
+    if rate.max_hours is not None and time > rate.max_hours:
+        raise PricingError(f"O pacote {rate.name} permite no máximo {rate.max_hours:g} horas")
+    for name in extras or ():
+        if catalog.extra(name) is None:
+            raise PricingError(f"Adicional desconhecido: {name}")
+
+
+def validate_details(details: BudgetDetails, catalog: Optional[Catalog] = None) -> None:
+    validate_selection(details.package, details.num_guests, details.time, details.extras, catalog=catalog)
+
+
+def compute_quote(
+    package: str,
+    num_guests: int,
+    num_barmans: int,
+    time: float,
+    extras: Optional[Iterable[str]] = None,
+    catalog: Optional[Catalog] = None,
+) -> dict:
+    """
+    Preço do evento pela tabela do catálogo:
+    base + convidados * por_convidado + barmans * horas * por_barman_hora + adicionais.
+    As horas cobradas respeitam o mínimo do pacote e adicionais repetidos
+    são cobrados uma vez.
+    """
+    catalog = catalog or get_catalog()
+    rate = catalog.package(package)
+    if rate is None:
+        raise PricingError(f"Pacote desconhecido: {package}")
+
+    hours = max(time, rate.min_hours)
+    guests_total = rate.per_guest * num_guests
+    barmans_total = rate.per_barman_hour * num_barmans * hours
+
+    extras_total = {}
+    for name in unique_extras(extras):
+        extra = catalog.extra(name)
+        if extra is None:
+            raise PricingError(f"Adicional desconhecido: {name}")
+        if extra.unit == "guest":
+            price = extra.price * num_guests
+        elif extra.unit == "hour":
+            price = extra.price * hours
+        else:
+            price = extra.price
+        extras_total[extra.name] = round(price, 2)
+
+    total = rate.base + guests_total + barmans_total + sum(extras_total.values())
+    return {
+        "package": rate.name,
+        "currency": catalog.currency,
+        "billed_hours": hours,
+        "breakdown": {
+            "base": round(rate.base, 2),
+            "guests": round(guests_total, 2),
+            "barmans": round(barmans_total, 2),
+            "extras": extras_total,
+        },
+        "total": round(total, 2),
+        "catalog_version": catalog.version,
+    }
+
+
+def quote_budget(details: BudgetDetails, catalog: Optional[Catalog] = None) -> dict:
+    return compute_quote(
+        details.package,
+        details.num_guests,
+        details.num_barmans,
+        details.time,
+        details.extras,
+        catalog=catalog,
+    )
@@ -0,0 +1,87 @@
+import os
+from typing import Iterable, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+from .catalog import Catalog, get_catalog
+from .engine import PricingError, unique_extras
+
+load_dotenv()
+
+QUOTE_MATRIX_MAX_CELLS = int(os.getenv("QUOTE_MATRIX_MAX_CELLS", "200000"))
+
+
+def quote_matrix(
+    packages: List[str],
+    num_guests: List[int],
+    time: List[float],
+    num_barmans: int = 1,
+    extras: Optional[Iterable[str]] = None,
+    catalog: Optional[Catalog] = None,
+) -> np.ndarray:
+    """
+    Preços de todas as combinações pacote × convidados × horas em uma única
+    passada vetorizada, com as mesmas regras de validate_selection e
+    compute_quote. O resultado tem forma (len(packages), len(num_guests), len(time));
+    combinações fora dos limites do pacote ficam como NaN.
+    """
+    cells = len(packages) * len(num_guests) * len(time)
+    if cells > QUOTE_MATRIX_MAX_CELLS:
+        raise PricingError(f"Matriz com {cells} combinações excede o limite de {QUOTE_MATRIX_MAX_CELLS}")
+
+    catalog = catalog or get_catalog()
+    rates = []
+    for name in packages:
+        rate = catalog.package(name)
+        if rate is None:
+            raise PricingError(f"Pacote desconhecido: {name}")
+        rates.append((
+            rate.base,
+            rate.per_guest,
+            rate.per_barman_hour,
+            rate.min_hours,
+            rate.min_guests,
+            np.inf if rate.max_guests is None else rate.max_guests,
+            np.inf if rate.max_hours is None else rate.max_hours,
+        ))
+
+    # Os adicionais não dependem do pacote: viram três coeficientes escalares
+    flat = per_guest_extra = per_hour_extra = 0.0
+    for name in unique_extras(extras):
+        extra = catalog.extra(name)
+        if extra is None:
+            raise PricingError(f"Adicional desconhecido: {name}")
+        if extra.unit == "guest":
+            per_guest_extra += extra.price
+        elif extra.unit == "hour":
+            per_hour_extra += extra.price
+        else:
+            flat += extra.price
+
+    table = np.array(rates, dtype=np.float64).reshape(len(packages), 7)
+    base, per_guest, per_barman_hour, min_hours, min_guests, max_guests, max_hours = (
+        table[:, i, None, None] for i in range(7)
+    )
+    guests = np.asarray(num_guests, dtype=np.float64)[None, :, None]
+    requested = np.asarray(time, dtype=np.float64)[None, None, :]
+    hours = np.maximum(requested, min_hours)
+
+    total = (
+        base
+        + flat
+        + (per_guest + per_guest_extra) * guests
+        + (per_barman_hour * num_barmans + per_hour_extra) * hours
+    )
+    outside = (
+        (guests < min_guests)
+        | (guests > max_guests)
+        | (requested < 0)
+        | (requested > max_hours)
+    )
+    return np.where(outside, np.nan, np.round(total, 2))
+
+
+def matrix_to_list(prices: np.ndarray) -> list:
+    # NaN não é JSON válido: combinações sem preço saem como None
+    return np.where(np.isnan(prices), None, prices).tolist()
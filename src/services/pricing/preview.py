@@ -0,0 +1,62 @@
+import os
+from functools import lru_cache
+from typing import Tuple
+
+from dotenv import load_dotenv
+
+from src.models.BudgetModels import BudgetDetails
+from .catalog import get_catalog, normalize_name, on_catalog_change
+from .engine import compute_quote, validate_selection
+
+load_dotenv()
+
+QUOTE_CACHE_SIZE = int(os.getenv("QUOTE_CACHE_SIZE", "4096"))
+
+QuoteKey = Tuple[str, int, int, float, Tuple[str, ...]]
+
+
+def quote_key(details: BudgetDetails) -> QuoteKey:
+    """
+    Chave canônica da prévia: só os campos que entram no preço, com nomes
+    normalizados e adicionais sem ordem nem repetição.
+    """
+    return (
+        normalize_name(details.package),
+        details.num_guests,
+        details.num_barmans,
+        float(details.time),
+        tuple(sorted({normalize_name(extra) for extra in details.extras or ()})),
+    )
+
+
+@lru_cache(maxsize=QUOTE_CACHE_SIZE)
+def _cached_quote(version: str, key: QuoteKey) -> dict:
+    # A versão só compõe a chave: uma troca de catálogo no meio do cálculo
+    # nunca deixa uma cotação antiga sob a chave da versão nova
+    package, num_guests, num_barmans, time, extras = key
+    catalog = get_catalog()
+    validate_selection(package, num_guests, time, extras, catalog=catalog)
+    return compute_quote(package, num_guests, num_barmans, time, extras, catalog=catalog)
+
+
+def preview_quote(details: BudgetDetails) -> dict:
+    """Cotação memoizada. O dicionário devolvido é compartilhado: não deve ser alterado."""
+    return _cached_quote(get_catalog().version, quote_key(details))
+
+
+def quote_cache_stats() -> dict:
+    info = _cached_quote.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+        "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0,
+    }
+
+
+@on_catalog_change
+def clear_quote_cache(catalog=None) -> None:
+    # A versão na chave já invalida as entradas antigas; limpar só libera memória
+    _cached_quote.cache_clear()
@@ -0,0 +1,26 @@
+"""
+Publica no banco o catálogo de pacotes e adicionais. As instâncias da API
+passam a usá-lo na próxima verificação de versão, sem reiniciar.
+
+Uso:
+    python -m src.services.pricing.publish [--file src/services/pricing/catalog.json]
+"""
+import argparse
+import json
+
+from .catalog import PRICING_CATALOG_PATH
+from .store import publish_catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publica o catálogo de preços no banco")
+    parser.add_argument("--file", default=PRICING_CATALOG_PATH)
+    args = parser.parse_args()
+
+    with open(args.file, encoding="utf-8") as f:
+        version = publish_catalog(json.load(f))
+    print(f"Catálogo publicado na versão {version}")
+
+
+if __name__ == "__main__":
+    main()
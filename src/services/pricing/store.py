@@ -0,0 +1,97 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+from src.services.mongo import connect
+from .catalog import Catalog, build_catalog, get_catalog, set_catalog
+
+load_dotenv()
+
+CATALOG_COLLECTION = "pricing_catalog"
+CATALOG_DOCUMENT_ID = "current"
+CATALOG_REFRESH_INTERVAL = float(os.getenv("CATALOG_REFRESH_INTERVAL", "30"))
+
+
+def fetch_catalog_version() -> Optional[str]:
+    collection, client = connect(CATALOG_COLLECTION)
+    # Só a versão: o documento completo é lido apenas quando ela muda
+    document = collection.find_one({"_id": CATALOG_DOCUMENT_ID}, {"_id": 0, "version": 1})
+    return document.get("version") if document else None
+
+
+def fetch_catalog() -> Optional[Catalog]:
+    collection, client = connect(CATALOG_COLLECTION)
+    document = collection.find_one({"_id": CATALOG_DOCUMENT_ID})
+    if document is None:
+        return None
+    return build_catalog(document, version=document["version"])
+
+
+def refresh_catalog() -> bool:
+    """
+    Troca o catálogo em memória quando a versão no banco difere da atual.
+    Sem catálogo no banco, continua valendo o arquivo local.
+    """
+    version = fetch_catalog_version()
+    if version is None or version == get_catalog().version:
+        return False
+    catalog = fetch_catalog()
+    if catalog is None:
+        return False
+    # Troca de referência: leitores em andamento seguem com o snapshot anterior
+    set_catalog(catalog)
+    print(f"Catálogo de preços atualizado para a versão {catalog.version}")
+    return True
+
+
+def publish_catalog(data: dict) -> str:
+    """Valida e grava um novo catálogo; as instâncias o carregam na próxima verificação."""
+    catalog = build_catalog(data)
+    collection, client = connect(CATALOG_COLLECTION)
+    document = {
+        "currency": data.get("currency", "BRL"),
+        "packages": data["packages"],
+        "extras": data.get("extras", {}),
+        "version": catalog.version,
+        "updated_at": datetime.now(timezone.utc),
+    }
+    collection.replace_one({"_id": CATALOG_DOCUMENT_ID}, document, upsert=True)
+    set_catalog(catalog)
+    return catalog.version
+
+
+class CatalogRefresher:
+    def __init__(self, interval: float = CATALOG_REFRESH_INTERVAL):
+        self.interval = interval
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        if self._tasks or self.interval <= 0:
+            return
+        self._tasks = [asyncio.create_task(self._run())]
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(refresh_catalog)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Erro ao recarregar o catálogo de preços: {e}")
+            await asyncio.sleep(self.interval)
+
+
+catalog_refresher = CatalogRefresher()
@@ -0,0 +1,3 @@
+from .queue import enqueue, claim, complete, fail, update_payload, latest_for_budget
+from .locks import KeyedLock
+from .worker import QueueWorkerPool
@@ -0,0 +1,31 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List
+
+
+class KeyedLock:
+    """
+    Mapa de locks asyncio por chave. Cada entrada conta quem está segurando
+    ou esperando e é removida quando o contador zera, então a memória fica
+    limitada às chaves em uso no momento.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, List] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @asynccontextmanager
+    async def hold(self, key: str) -> AsyncIterator[None]:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._entries[key]
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+
+from src.services.mongo import connect
+
+PENDING = "pending"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+
+def ensure_queue_indexes(collection_name: str) -> None:
+    collection, client = connect(collection_name)
+    collection.create_index([("status", ASCENDING), ("next_attempt_at", ASCENDING)])
+    collection.create_index([("status", ASCENDING), ("locked_until", ASCENDING)])
+    collection.create_index([("budget_id", ASCENDING), ("created_at", DESCENDING)])
+
+
+def enqueue(collection_name: str, payload: dict, budget_id: Optional[str] = None, completed: bool = False) -> str:
+    """Com `completed`, registra um trabalho já feito fora da fila, que os workers ignoram."""
+    collection, client = connect(collection_name)
+    now = datetime.now(timezone.utc)
+    job = {
+        "budget_id": budget_id,
+        "payload": payload,
+        "status": DONE if completed else PENDING,
+        "attempts": 0,
+        "next_attempt_at": now,
+        "locked_until": None,
+        "last_error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+    if completed:
+        job["completed_at"] = now
+    result = collection.insert_one(job)
+    return str(result.inserted_id)
+
+
+def claim(collection_name: str, lease_seconds: float) -> Optional[dict]:
+    collection, client = connect(collection_name)
+    now = datetime.now(timezone.utc)
+    return collection.find_one_and_update(
+        {
+            "$or": [
+                {"status": PENDING, "next_attempt_at": {"$lte": now}},
+                # Lease expirada: o worker que pegou o job morreu no meio
+                {"status": PROCESSING, "locked_until": {"$lte": now}},
+            ]
+        },
+        {
+            "$set": {
+                "status": PROCESSING,
+                "locked_until": now + timedelta(seconds=lease_seconds),
+                "updated_at": now,
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("next_attempt_at", ASCENDING)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def update_payload(collection_name: str, job_id: ObjectId, fields: dict) -> None:
+    collection, client = connect(collection_name)
+    collection.update_one(
+        {"_id": job_id},
+        {"$set": {f"payload.{key}": value for key, value in fields.items()}},
+    )
+
+
+def complete(collection_name: str, job_id: ObjectId) -> None:
+    collection, client = connect(collection_name)
+    now = datetime.now(timezone.utc)
+    collection.update_one(
+        {"_id": job_id},
+        {"$set": {"status": DONE, "locked_until": None, "completed_at": now, "updated_at": now}},
+    )
+
+
+def retry_delay(attempts: int, base_delay: float, max_delay: float) -> float:
+    return min(base_delay * (2 ** max(attempts - 1, 0)), max_delay)
+
+
+def fail(
+    collection_name: str,
+    job: dict,
+    error: str,
+    max_attempts: int,
+    base_delay: float,
+    max_delay: float,
+) -> str:
+    collection, client = connect(collection_name)
+    now = datetime.now(timezone.utc)
+    update = {"locked_until": None, "last_error": error, "updated_at": now}
+
+    if job.get("attempts", 0) >= max_attempts:
+        update["status"] = FAILED
+    else:
+        delay = retry_delay(job.get("attempts", 0), base_delay, max_delay)
+        update["status"] = PENDING
+        update["next_attempt_at"] = now + timedelta(seconds=delay)
+
+    collection.update_one({"_id": job["_id"]}, {"$set": update})
+    return update["status"]
+
+
+def latest_for_budget(collection_name: str, budget_id: str) -> Optional[dict]:
+    collection, client = connect(collection_name)
+    return collection.find_one(
+        {"budget_id": budget_id},
+        {"payload": 0},
+        sort=[("created_at", DESCENDING)],
+    )
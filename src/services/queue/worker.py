@@ -0,0 +1,105 @@
+import asyncio
+from typing import Awaitable, Callable, List, Optional
+
+from . import queue
+
+
+class QueueWorkerPool:
+    def __init__(
+        self,
+        collection_name: str,
+        handler: Callable[[dict], Awaitable[None]],
+        concurrency: int = 2,
+        poll_interval: float = 1.0,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 5,
+        base_delay: float = 2.0,
+        max_delay: float = 300.0,
+        on_failed: Optional[Callable[[dict], Awaitable[None]]] = None,
+    ):
+        self.collection_name = collection_name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # Chamado quando o job esgota as tentativas e fica como falho
+        self.on_failed = on_failed
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        if self._tasks or self.concurrency <= 0:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._prepare())]
+        self._tasks += [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def notify(self) -> None:
+        # Acorda os workers locais sem esperar o próximo ciclo de polling
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _prepare(self) -> None:
+        try:
+            await asyncio.to_thread(queue.ensure_queue_indexes, self.collection_name)
+        except Exception as e:
+            print(f"Erro ao criar índices da fila {self.collection_name}: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.process_next()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Erro no worker da fila {self.collection_name}: {e}")
+                processed = False
+
+            if not processed:
+                await self._idle()
+
+    async def _idle(self) -> None:
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+    async def process_next(self) -> bool:
+        job = await asyncio.to_thread(queue.claim, self.collection_name, self.lease_seconds)
+        if job is None:
+            return False
+
+        try:
+            await self.handler(job)
+        except Exception as e:
+            status = await asyncio.to_thread(
+                queue.fail,
+                self.collection_name,
+                job,
+                str(e),
+                self.max_attempts,
+                self.base_delay,
+                self.max_delay,
+            )
+            if status == queue.FAILED and self.on_failed is not None:
+                try:
+                    await self.on_failed(job)
+                except Exception as hook_error:
+                    print(f"Erro ao tratar falha definitiva na fila {self.collection_name}: {hook_error}")
+        else:
+            await asyncio.to_thread(queue.complete, self.collection_name, job["_id"])
+        return True
@@ -0,0 +1,2 @@
+from .scheduler import ScheduledEvent, allocate_staff, build_event
+from .service import schedule_staff
@@ -0,0 +1,35 @@
+"""
+Monta a escala de barmen para os orçamentos confirmados de um período.
+
+Uso:
+    python -m src.services.schedule.allocate --from 2025-12-01 --to 2026-02-28 --staff Ana,Bruno,Carla
+    python -m src.services.schedule.allocate --from 2025-12-01 --to 2026-02-28 --staff-file equipe.txt
+"""
+import argparse
+import asyncio
+import json
+
+from .service import schedule_staff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distribui os barmen pelos eventos confirmados")
+    parser.add_argument("--from", dest="from_date", required=True)
+    parser.add_argument("--to", dest="to_date", required=True)
+    roster = parser.add_mutually_exclusive_group(required=True)
+    roster.add_argument("--staff", help="Nomes separados por vírgula")
+    roster.add_argument("--staff-file", help="Arquivo com um nome por linha")
+    args = parser.parse_args()
+
+    if args.staff_file:
+        with open(args.staff_file, encoding="utf-8") as f:
+            staff = [line.strip() for line in f if line.strip()]
+    else:
+        staff = [name.strip() for name in args.staff.split(",") if name.strip()]
+
+    schedule = asyncio.run(schedule_staff(args.from_date, args.to_date, staff))
+    print(json.dumps(schedule, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
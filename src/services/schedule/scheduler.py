@@ -0,0 +1,105 @@
+import heapq
+import os
+from dataclasses import dataclass
+from datetime import datetime, time as dt_time, timedelta
+from typing import Iterable, List, Optional, Sequence
+from zoneinfo import ZoneInfo
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Orçamentos guardam só o dia do evento; sem horário, assume-se este início
+SCHEDULE_DEFAULT_START = os.getenv("SCHEDULE_DEFAULT_START", "18:00")
+# Folga entre o fim de um evento e o início do próximo para o mesmo barman
+SCHEDULE_TURNAROUND_HOURS = float(os.getenv("SCHEDULE_TURNAROUND_HOURS", "2"))
+# Fuso dos horários sem offset; datas com offset são convertidas para ele
+SCHEDULE_TIMEZONE = os.getenv("SCHEDULE_TIMEZONE", "America/Sao_Paulo")
+
+
+@dataclass(frozen=True)
+class ScheduledEvent:
+    budget_id: str
+    start: datetime
+    end: datetime
+    num_barmans: int
+
+
+def build_event(budget: dict) -> Optional[ScheduledEvent]:
+    """Intervalo ocupado pelo evento, ou None quando a data não pode ser lida."""
+    details = budget.get("budget") or {}
+    try:
+        value = details["date"]
+        if len(value) > 10:
+            start = datetime.fromisoformat(value)
+        else:
+            start = datetime.combine(datetime.fromisoformat(value).date(), dt_time.fromisoformat(SCHEDULE_DEFAULT_START))
+    except (KeyError, TypeError, ValueError):
+        return None
+    if start.tzinfo is not None:
+        # Mesmo instante com offsets diferentes precisa cair no mesmo horário local
+        start = start.astimezone(ZoneInfo(SCHEDULE_TIMEZONE)).replace(tzinfo=None)
+    end = start + timedelta(hours=float(details.get("time", 0)))
+    return ScheduledEvent(
+        budget_id=str(budget["_id"]),
+        start=start,
+        end=end,
+        num_barmans=int(details.get("num_barmans", 0)),
+    )
+
+
+def allocate_staff(
+    events: Iterable[ScheduledEvent],
+    staff: Sequence[str],
+    turnaround_hours: float = SCHEDULE_TURNAROUND_HOURS,
+) -> dict:
+    """
+    Distribui a equipe pelos eventos em ordem de início, com varredura por heaps:
+    um heap de barmen ocupados por horário de liberação e outro de livres pela
+    carga acumulada, para dividir as horas de forma equilibrada. A folga só
+    atrasa a liberação do barman; não entra nas horas nem no fim informado.
+    O(E·k·log S) para E eventos de k barmen e S pessoas na equipe.
+    Eventos sem gente suficiente recebem quem estiver livre e o que falta em `missing`.
+    """
+    names = list(dict.fromkeys(staff))
+    turnaround = timedelta(hours=turnaround_hours)
+    hours = [0.0] * len(names)
+    events_count = [0] * len(names)
+    free = [(0.0, index) for index in range(len(names))]
+    busy: List[tuple] = []
+
+    assignments = []
+    unfilled = 0
+    for event in sorted(events, key=lambda e: (e.start, e.end, e.budget_id)):
+        while busy and busy[0][0] <= event.start:
+            _, index = heapq.heappop(busy)
+            heapq.heappush(free, (hours[index], index))
+
+        duration = (event.end - event.start).total_seconds() / 3600
+        assigned = []
+        while free and len(assigned) < event.num_barmans:
+            _, index = heapq.heappop(free)
+            hours[index] += duration
+            events_count[index] += 1
+            heapq.heappush(busy, (event.end + turnaround, index))
+            assigned.append(names[index])
+
+        missing = event.num_barmans - len(assigned)
+        unfilled += missing
+        assignments.append({
+            "budget_id": event.budget_id,
+            "start": event.start.isoformat(),
+            "end": event.end.isoformat(),
+            "num_barmans": event.num_barmans,
+            "staff": assigned,
+            "missing": missing,
+        })
+
+    return {
+        "assignments": assignments,
+        "staff": {
+            name: {"events": events_count[index], "hours": round(hours[index], 2)}
+            for index, name in enumerate(names)
+        },
+        "unfilled": unfilled,
+    }
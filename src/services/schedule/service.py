@@ -0,0 +1,52 @@
+import asyncio
+from datetime import date
+from typing import List
+
+from fastapi import HTTPException
+from pymongo import ASCENDING
+
+from src.services.availability import CONFIRMED_STATUSES
+from src.services.mongo import connect, register_indexes
+from .scheduler import allocate_staff, build_event
+
+
+@register_indexes
+def ensure_schedule_indexes() -> None:
+    collection, client = connect("budgets")
+    # Orçamentos confirmados de um período, para a escala
+    collection.create_index([("status", ASCENDING), ("budget.date", ASCENDING)])
+
+
+def find_confirmed_budgets(from_date: str, to_date: str) -> List[dict]:
+    collection, client = connect("budgets")
+    # O limite superior cobre datas com horário ("2025-12-20T19:00")
+    return list(collection.find(
+        {
+            "status": {"$in": CONFIRMED_STATUSES},
+            "budget.date": {"$gte": from_date, "$lte": to_date + "\uffff"},
+        },
+        {"_id": 1, "budget.date": 1, "budget.time": 1, "budget.num_barmans": 1},
+    ))
+
+
+async def schedule_staff(from_date: str, to_date: str, staff: List[str]) -> dict:
+    try:
+        start, end = date.fromisoformat(from_date), date.fromisoformat(to_date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Datas inválidas: use AAAA-MM-DD")
+    if end < start:
+        raise HTTPException(status_code=400, detail="'to' deve ser igual ou posterior a 'from'")
+
+    try:
+        budgets = await asyncio.to_thread(find_confirmed_budgets, start.isoformat(), end.isoformat())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar orçamentos confirmados: {e}")
+
+    events = []
+    for budget in budgets:
+        event = build_event(budget)
+        if event is None:
+            print(f"Orçamento {budget['_id']} sem data válida; fora da escala")
+            continue
+        events.append(event)
+    return allocate_staff(events, staff)
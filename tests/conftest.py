@@ -2,6 +2,10 @@ import os
 
 os.environ["MERCADO_PAGO_ACCESS_TOKEN"] = "dummy_token_de_teste"
 os.environ["EMAIL_PORT"] = "587"
+os.environ["EMAIL_OUTBOX_WORKERS"] = "0"
+os.environ["WEBHOOK_WORKERS"] = "0"
+os.environ["CATALOG_REFRESH_INTERVAL"] = "0"
+os.environ["MONGO_ENSURE_INDEXES"] = "false"
 
 import pytest
 from fastapi.testclient import TestClient
@@ -12,3 +16,14 @@ from main import app
 def client():
     with TestClient(app) as c:
         yield c
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers():
+    # Falhas simuladas em um teste não devem deixar o circuito aberto para o próximo
+    from src.services.email.sendMail import smtp_breaker
+    from src.services.payment import mercadopago_breaker
+
+    smtp_breaker.reset()
+    mercadopago_breaker.reset()
+    yield
@@ -0,0 +1,168 @@
+import pytest
+from fastapi import HTTPException
+
+from src.services.availability import booking as booking_mod
+from src.services.availability import get_availability, sync_booking
+from src.services.availability.backfill import backfill_bookings
+
+
+# -------------------------
+# Fixtures and fakes
+# -------------------------
+def _matches(doc, filter_query):
+    for key, condition in filter_query.items():
+        value = doc.get(key)
+        if isinstance(condition, dict):
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+            if "$nin" in condition and value in condition["$nin"]:
+                return False
+            if "$ne" in condition and value == condition["$ne"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeBudgetsCollection:
+    def __init__(self, docs):
+        self.docs = {doc["_id"]: dict(doc) for doc in docs}
+
+    def find(self, filter_query, projection=None):
+        return [dict(doc) for doc in self.docs.values() if _matches(doc, filter_query)]
+
+    def find_one_and_update(self, filter_query, update, projection=None, return_document=None):
+        for doc in self.docs.values():
+            if _matches(doc, filter_query):
+                before = dict(doc)
+                doc.update(update["$set"])
+                return before
+        return None
+
+
+class FakeAvailabilityCollection:
+    def __init__(self):
+        self.days = {}
+        self.finds = []
+
+    def update_one(self, filter_query, update, upsert=False):
+        day = self.days.setdefault(filter_query["_id"], {"_id": filter_query["_id"]})
+        for field, amount in update["$inc"].items():
+            day[field] = day.get(field, 0) + amount
+
+    def find(self, filter_query):
+        self.finds.append(filter_query)
+        bounds = filter_query["_id"]
+        return [dict(day) for key, day in sorted(self.days.items()) if bounds["$gte"] <= key <= bounds["$lte"]]
+
+
+@pytest.fixture
+def fake_days(monkeypatch):
+    days = FakeAvailabilityCollection()
+
+    def fake_connect(name):
+        assert name == booking_mod.AVAILABILITY_COLLECTION
+        return days, None
+
+    monkeypatch.setattr(booking_mod, "connect", fake_connect)
+    monkeypatch.setattr(booking_mod, "BARMEN_CAPACITY", 6)
+    return days
+
+
+def _budget(budget_id, status, day="2025-12-20", num_barmans=2, **extra):
+    return {"_id": budget_id, "status": status, "budget": {"date": day, "num_barmans": num_barmans}, **extra}
+
+
+# -------------------------
+# Testes do índice de disponibilidade
+# -------------------------
+def test_sync_booking_counts_confirmed_budget_once(fake_days):
+    budgets = FakeBudgetsCollection([_budget("b1", "paid")])
+
+    assert sync_booking(budgets, "b1") == 1
+    assert sync_booking(budgets, "b1") == 0
+
+    assert fake_days.days["2025-12-20"] == {"_id": "2025-12-20", "booked_barmans": 2, "events": 1}
+    assert budgets.docs["b1"]["booked"] is True
+
+
+def test_sync_booking_releases_cancelled_budget(fake_days):
+    budgets = FakeBudgetsCollection([_budget("b1", "paid"), _budget("b2", "paid", num_barmans=3)])
+    sync_booking(budgets, "b1")
+    sync_booking(budgets, "b2")
+
+    budgets.docs["b1"]["status"] = "Cancelado"
+    assert sync_booking(budgets, "b1") == -1
+    assert sync_booking(budgets, "b1") == 0
+
+    assert fake_days.days["2025-12-20"]["booked_barmans"] == 3
+    assert fake_days.days["2025-12-20"]["events"] == 1
+
+
+def test_sync_booking_ignores_unconfirmed_and_undated_budgets(fake_days):
+    budgets = FakeBudgetsCollection([_budget("b1", "Pendente"), _budget("b2", "paid", day="20/12/2025")])
+
+    assert sync_booking(budgets, "b1") == 0
+    assert sync_booking(budgets, "b2") == 1
+    assert fake_days.days == {}
+
+
+def test_backfill_counts_only_unbooked_confirmed_budgets(monkeypatch, fake_days):
+    from src.services.availability import backfill as backfill_mod
+
+    budgets = FakeBudgetsCollection([
+        _budget("b1", "paid"),
+        _budget("b2", "paid", day="2025-12-21", booked=True),
+        _budget("b3", "Pendente"),
+    ])
+    monkeypatch.setattr(backfill_mod, "connect", lambda name: (budgets, None))
+
+    assert backfill_bookings() == 1
+    assert backfill_bookings() == 0
+    assert list(fake_days.days) == ["2025-12-20"]
+
+
+@pytest.mark.asyncio
+async def test_get_availability_reads_range_once(fake_days):
+    fake_days.days = {
+        "2025-12-02": {"_id": "2025-12-02", "booked_barmans": 4, "events": 2},
+        "2025-12-03": {"_id": "2025-12-03", "booked_barmans": 9, "events": 3, "capacity": 8},
+        "2026-01-01": {"_id": "2026-01-01", "booked_barmans": 1, "events": 1},
+    }
+
+    availability = await get_availability("2025-12-01", "2025-12-31")
+
+    assert len(fake_days.finds) == 1
+    days = availability["days"]
+    assert len(days) == 31
+    assert days[0] == {"date": "2025-12-01", "capacity": 6, "booked": 0, "available": 6, "events": 0}
+    assert days[1]["available"] == 2
+    assert days[2] == {"date": "2025-12-03", "capacity": 8, "booked": 9, "available": 0, "events": 3}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("start, end", [("2025-12-31", "2025-12-01"), ("01/12/2025", "2025-12-31"), ("2025-01-01", "2026-12-31")])
+async def test_get_availability_rejects_invalid_range(fake_days, start, end):
+    with pytest.raises(HTTPException) as excinfo:
+        await get_availability(start, end)
+    assert excinfo.value.status_code == 400
+    assert fake_days.finds == []
+
+
+def test_availability_route(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.routes import availability as availability_routes
+
+    async def fake_get_availability(from_date, to_date):
+        return {"from": from_date, "to": to_date, "days": []}
+
+    monkeypatch.setattr(availability_routes, "get_availability", fake_get_availability)
+    app = FastAPI()
+    app.include_router(availability_routes.router)
+    client = TestClient(app)
+
+    response = client.get("/availability", params={"from": "2025-12-01", "to": "2025-12-31"})
+    assert response.status_code == 200
+    assert response.json() == {"availability": {"from": "2025-12-01", "to": "2025-12-31", "days": []}}
+    assert client.get("/availability", params={"from": "2025-12-01"}).status_code == 422
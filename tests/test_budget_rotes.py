@@ -10,7 +10,7 @@ budget_routes_mod = importlib.import_module("src.routes.budget")
 router = budget_routes_mod.router
 
 from src.models.BudgetModels import BudgetIn, BudgetUpdate
-from src.models.MailModels import EmailIn, EmailDetails
+from src.models.MailModels import EmailIn
 
 
 # -------------------------
@@ -121,6 +121,37 @@ def test_update_budget_status_route_success(monkeypatch, app_client):
     assert response.json() == {"message": "Status atualizado com sucesso"}
 
 
+def test_update_budget_status_route_reopens_paid_budget(monkeypatch, app_client):
+    from bson import ObjectId
+
+    budget_id = ObjectId()
+    docs = {budget_id: {"_id": budget_id, "status": "paid", "value": 100.0}}
+
+    class FakeBudgets:
+        def update_one(self, filter_query, update_query):
+            doc = docs.get(filter_query["_id"])
+            excluded = filter_query.get("status", {}).get("$nin", [])
+            matched = doc is not None and doc["status"] not in excluded
+            if matched:
+                doc.update(update_query["$set"])
+
+            class Result:
+                matched_count = int(matched)
+
+            return Result()
+
+    monkeypatch.setattr("src.services.budget.create.connect", lambda name: (FakeBudgets(), None))
+    monkeypatch.setattr("src.services.budget.create.sync_booking", lambda collection, _id: 0)
+
+    payload = {"_id": str(budget_id), "new_status": "Pendente", "value": 250.0}
+    response = app_client.patch("/budget/status", json=payload)
+
+    assert response.status_code == 200
+    # O ajuste manual do admin não passa pela trava de status do webhook
+    assert docs[budget_id]["status"] == "Pendente"
+    assert docs[budget_id]["value"] == 250.0
+
+
 def test_update_budget_status_route_not_found(monkeypatch, app_client):
     async def fake_update_budget(update_data: BudgetUpdate):
         raise HTTPException(status_code=404, detail="Orçamento não encontrado")
@@ -201,6 +232,24 @@ def test_get_pending_budgets_route_success(monkeypatch, app_client):
     assert response.json() == {"budgets": [{"_id": "id2", "status": "Pendente"}]}
 
 
+def test_claim_pending_budget_route(monkeypatch, app_client):
+    claimed = []
+
+    async def fake_claim(operator):
+        claimed.append(operator)
+        return {"_id": "id2", "status": "Pendente", "claimed_by": operator} if len(claimed) == 1 else None
+
+    monkeypatch.setattr("src.routes.budget.claim_pending_budget", fake_claim)
+
+    response = app_client.post("/budget/pending/claim", json={"operator": "Ana"})
+    assert response.status_code == 200
+    assert response.json() == {"budget": {"_id": "id2", "status": "Pendente", "claimed_by": "Ana"}}
+
+    response = app_client.post("/budget/pending/claim", json={"operator": "Bia"})
+    assert response.json() == {"budget": None}
+    assert app_client.post("/budget/pending/claim", json={"operator": ""}).status_code == 422
+
+
 def test_get_pending_budgets_route_error(monkeypatch, app_client):
     async def fake_get_pending():
         raise Exception("Erro pendentes")
@@ -280,28 +329,54 @@ def test_send_budget_email_route_success(monkeypatch, app_client):
         fake_get_by_id,
     )
 
-    def fake_create_preference(data: dict):
-        return {"initPoint": "https://fake.init", "preferenceId": "pref123"}
-
-    monkeypatch.setattr(
-        "src.routes.budget.create_preference",
-        fake_create_preference,
-    )
-
-    def fake_send_email(email_details: EmailDetails):
-        assert email_details.email == fake_budget["email"]
-        assert email_details.name == fake_budget["name"]
-        assert email_details.payment_link == "https://fake.init"
+    async def fake_enqueue_email(budget: dict):
+        assert budget is fake_budget
+        return {"id": "job123", "duplicate": False}
 
     monkeypatch.setattr(
-        "src.routes.budget.send_email",
-        fake_send_email,
+        "src.routes.budget.enqueue_email",
+        fake_enqueue_email,
     )
 
     payload = {"_id": "id_email"}
     response = app_client.post("/budget/email/send", json=payload)
-    assert response.status_code == 200
-    assert response.json() == {"message": "Email enviado com sucesso"}
+    assert response.status_code == 202
+    assert response.json() == {"message": "Email enfileirado para envio", "id": "job123", "duplicate": False}
+
+
+def test_send_budget_email_route_rejects_budget_without_value(monkeypatch, app_client):
+    async def fake_get_by_id(budget_id: str):
+        return {
+            "_id": "id_email",
+            "name": "Cliente Email",
+            "email": "cliente@mail.com",
+            "budget": {"type": "Aniversário", "date": "2025-08-01"},
+        }
+
+    def fail_reserve(key, budget_id):
+        raise AssertionError("Orçamento sem valor não deve reservar a chave")
+
+    monkeypatch.setattr("src.routes.budget.get_budget_by_id", fake_get_by_id)
+    monkeypatch.setattr("src.services.email.outbox.idempotency.reserve", fail_reserve)
+
+    response = app_client.post("/budget/email/send", json={"_id": "id_email"})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Orçamento sem valor definido"
+
+
+def test_send_budget_email_route_duplicate(monkeypatch, app_client):
+    async def fake_get_by_id(budget_id: str):
+        return {"_id": budget_id, "value": 250.0}
+
+    async def fake_enqueue_email(budget: dict):
+        return {"id": "job123", "duplicate": True}
+
+    monkeypatch.setattr("src.routes.budget.get_budget_by_id", fake_get_by_id)
+    monkeypatch.setattr("src.routes.budget.enqueue_email", fake_enqueue_email)
+
+    response = app_client.post("/budget/email/send", json={"_id": "id_email"})
+    assert response.status_code == 202
+    assert response.json() == {"message": "Email já enfileirado para envio", "id": "job123", "duplicate": True}
 
 
 def test_send_budget_email_route_not_found(monkeypatch, app_client):
@@ -334,55 +409,441 @@ def test_send_budget_email_route_internal_error(monkeypatch, app_client):
     assert "Erro interno email" in response.json()["detail"]
 
 
+@pytest.mark.asyncio
+async def test_email_delivery_does_not_block_event_loop(monkeypatch):
+    """
+    Enquanto um servidor SMTP lento está sendo atendido pelo worker do
+    outbox, as rotas continuam respondendo normalmente.
+    """
+    import asyncio
+    import aiosmtplib
+    import httpx
+
+    mail_mod = importlib.import_module("src.services.email.sendMail")
+    outbox_mod = importlib.import_module("src.services.email.outbox")
+    smtp_started = asyncio.Event()
+
+    class SlowSMTP:
+        def __init__(self, **kwargs):
+            pass
+
+        async def connect(self):
+            smtp_started.set()
+            await asyncio.sleep(0.5)
+
+        async def send_message(self, msg):
+            await asyncio.sleep(0.5)
+
+        async def quit(self):
+            pass
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(aiosmtplib, "SMTP", SlowSMTP)
+    monkeypatch.setattr(mail_mod, "async_smtp_pool", mail_mod.AsyncSMTPPool(mail_mod._open_async_connection))
+
+    async def fake_get_pending():
+        return []
+
+    monkeypatch.setattr("src.routes.budget.get_pending_budgets", fake_get_pending)
+
+    job = {
+        "_id": "job_lento",
+        "payload": {
+            "preference": {},
+            "email": {
+                "email": "lento@mail.com",
+                "name": "Cliente Lento",
+                "type": "Casamento",
+                "date": "2025-10-10",
+                "value": "500.0",
+            },
+            "payment_link": "https://fake.init",
+        },
+    }
+
+    app = FastAPI()
+    app.include_router(router)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        delivery = asyncio.create_task(outbox_mod.deliver_email(job))
+        await smtp_started.wait()
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        pending = await ac.get("/budget/pending")
+        elapsed = loop.time() - start
+
+        assert pending.status_code == 200
+        assert elapsed < 0.25
+        assert not delivery.done()
+
+        await delivery
+
+
 # -------------------------
-# Testes para webhook
+# Testes para send_bulk_budget_emails_route
 # -------------------------
-def test_webhook_not_payment(app_client):
-    response = app_client.post("/budget/webhook", json={"type": "nonpayment"})
+def test_send_bulk_budget_emails_route_success(monkeypatch, app_client):
+    async def fake_get_by_ids(budget_ids):
+        assert budget_ids == ["a", "b"]
+        return [{"_id": "a"}]
+
+    async def fake_send_bulk(budget_ids, budgets):
+        return [{"id": "a", "status": "sent"}, {"id": "b", "status": "not_found"}]
+
+    monkeypatch.setattr("src.routes.budget.get_budgets_by_ids", fake_get_by_ids)
+    monkeypatch.setattr("src.routes.budget.send_bulk_emails", fake_send_bulk)
+
+    response = app_client.post("/budget/email/send/bulk", json={"ids": ["a", "b"]})
     assert response.status_code == 200
-    assert response.json() == {"message": "Tipo de notificação não tratada"}
+    assert response.json()["results"][1] == {"id": "b", "status": "not_found"}
 
 
-def test_webhook_payment_success(monkeypatch, app_client):
-    fake_payment_info = {"response": {"status": "approved", "external_reference": "ext123"}}
+def test_send_bulk_budget_emails_route_empty(app_client):
+    response = app_client.post("/budget/email/send/bulk", json={"ids": []})
+    assert response.status_code == 422
 
-    class FakePayment:
-        def get(self, payment_id):
-            return fake_payment_info
 
-    class FakeSDK:
-        def payment(self):
-            return FakePayment()
+# -------------------------
+# Testes para get_budget_email_status_route
+# -------------------------
+def test_get_budget_email_status_route_success(monkeypatch, app_client):
+    async def fake_get_email_status(budget_id: str):
+        return {"id": "job1", "status": "done", "attempts": 1, "last_error": None}
 
-    monkeypatch.setattr(budget_routes_mod, "sdk", FakeSDK())
+    monkeypatch.setattr(
+        "src.routes.budget.get_email_status",
+        fake_get_email_status,
+    )
+
+    response = app_client.get("/budget/id_email/email/status")
+    assert response.status_code == 200
+    assert response.json()["email"]["status"] == "done"
 
-    async def fake_update_budget(update_data: BudgetUpdate):
-        assert update_data.id == "ext123"
-        return None
+
+def test_get_budget_email_status_route_not_found(monkeypatch, app_client):
+    async def fake_get_email_status(budget_id: str):
+        raise HTTPException(status_code=404, detail="Nenhum e-mail encontrado para este orçamento")
 
     monkeypatch.setattr(
-        "src.routes.budget.update_budget_status_and_value",
-        fake_update_budget,
+        "src.routes.budget.get_email_status",
+        fake_get_email_status,
     )
 
+    response = app_client.get("/budget/sem_email/email/status")
+    assert response.status_code == 404
+
+
+def test_get_budget_quote_route_success(monkeypatch, app_client):
+    async def fake_get_budget_by_id(budget_id):
+        return {
+            "_id": budget_id,
+            "budget": {
+                "description": "Evento",
+                "type": "Casamento",
+                "date": "2025-12-01",
+                "num_barmans": 2,
+                "num_guests": 80,
+                "time": 5.0,
+                "package": "Premium",
+                "extras": ["DJ"],
+            },
+        }
+
+    monkeypatch.setattr("src.services.budget.quote.get_budget_by_id", fake_get_budget_by_id)
+
+    response = app_client.get("/budget/abc123/quote")
+    assert response.status_code == 200
+    quote = response.json()["quote"]
+    assert quote["package"] == "Premium"
+    assert quote["breakdown"]["extras"] == {"DJ": 800.0}
+
+
+def test_get_budget_quote_route_unknown_package(monkeypatch, app_client):
+    async def fake_get_budget_by_id(budget_id):
+        return {
+            "_id": budget_id,
+            "budget": {
+                "description": "Evento",
+                "type": "Casamento",
+                "date": "2025-12-01",
+                "num_barmans": 1,
+                "num_guests": 10,
+                "time": 2.0,
+                "package": "Inexistente",
+            },
+        }
+
+    monkeypatch.setattr("src.services.budget.quote.get_budget_by_id", fake_get_budget_by_id)
+
+    response = app_client.get("/budget/abc123/quote")
+    assert response.status_code == 422
+    assert "Pacote desconhecido" in response.json()["detail"]
+
+
+def test_quote_matrix_route(app_client):
+    payload = {
+        "type": "Casamento",
+        "packages": ["Básico", "Premium"],
+        "num_guests": [20, 100, 150],
+        "time": [3.0, 5.0],
+        "num_barmans": 2,
+    }
+
+    response = app_client.post("/budget/quote/matrix", json=payload)
+    assert response.status_code == 200
+    prices = response.json()["prices"]
+    assert len(prices) == 2
+    assert all(len(row) == 3 and all(len(cell) == 2 for cell in row) for row in prices)
+    # Mais convidados e mais horas nunca deixam o evento mais barato
+    assert prices[0][0][0] < prices[0][2][1]
+
+
+def test_quote_matrix_route_masks_out_of_range_cells(app_client):
+    payload = {"type": "Casamento", "packages": ["Básico"], "num_guests": [1000, 30], "time": [20.0, 3.0]}
+
+    response = app_client.post("/budget/quote/matrix", json=payload)
+    assert response.status_code == 200
+    assert response.json()["prices"] == [[[None, None], [None, 1275.0]]]
+
+
+def test_quote_matrix_route_rejects_negative_values(app_client):
+    payload = {"type": "Casamento", "packages": ["Básico"], "num_guests": [-5], "time": [3.0], "num_barmans": 0}
+
+    response = app_client.post("/budget/quote/matrix", json=payload)
+    assert response.status_code == 422
+
+
+def test_quote_matrix_route_unknown_package(app_client):
+    payload = {"type": "Casamento", "packages": ["Inexistente"], "num_guests": [20], "time": [3.0]}
+
+    response = app_client.post("/budget/quote/matrix", json=payload)
+    assert response.status_code == 422
+    assert "Pacote desconhecido" in response.json()["detail"]
+
+
+def test_preview_quote_route_is_memoized(app_client):
+    from src.services.pricing import clear_quote_cache
+
+    clear_quote_cache()
+    payload = {
+        "description": "Festa",
+        "type": "Aniversário",
+        "date": "2025-10-10",
+        "num_barmans": 2,
+        "num_guests": 50,
+        "time": 4.0,
+        "package": "Básico",
+        "extras": ["DJ", "Decoracao"],
+    }
+
+    first = app_client.post("/budget/quote", json=payload)
+    second = app_client.post("/budget/quote", json={**payload, "package": " básico", "extras": ["decoracao", "DJ"]})
+
+    assert first.status_code == 200
+    assert second.json() == first.json()
+    assert first.json()["quote"]["breakdown"]["extras"] == {"DJ": 800.0, "Decoracao": 400.0}
+    stats = app_client.get("/budget/quote/cache").json()["cache"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_preview_quote_route_unknown_package(app_client):
+    response = app_client.post("/budget/quote", json={
+        "description": "Festa",
+        "type": "Aniversário",
+        "date": "2025-10-10",
+        "num_barmans": 1,
+        "num_guests": 10,
+        "time": 3.0,
+        "package": "Inexistente",
+    })
+
+    assert response.status_code == 422
+    assert "Pacote desconhecido" in response.json()["detail"]
+
+
+def test_get_budget_payment_status_route_success(monkeypatch, app_client):
+    async def fake_get_payment_status(budget_id):
+        return {"id": budget_id, "status": "paid", "paid": True}
+
+    monkeypatch.setattr("src.routes.budget.get_payment_status", fake_get_payment_status)
+
+    response = app_client.get("/budget/abc123/payment-status")
+    assert response.status_code == 200
+    assert response.json() == {"payment": {"id": "abc123", "status": "paid", "paid": True}}
+
+
+def test_get_budget_payment_status_route_not_found(monkeypatch, app_client):
+    async def fake_get_payment_status(budget_id):
+        raise HTTPException(status_code=404, detail="Orçamento não encontrado")
+
+    monkeypatch.setattr("src.routes.budget.get_payment_status", fake_get_payment_status)
+
+    response = app_client.get("/budget/abc123/payment-status")
+    assert response.status_code == 404
+
+
+# -------------------------
+# Testes para webhook
+# -------------------------
+def test_webhook_not_payment(app_client):
+    response = app_client.post("/budget/webhook", json={"type": "nonpayment"})
+    assert response.status_code == 200
+    assert response.json() == {"message": "Tipo de notificação não tratada"}
+
+
+def test_webhook_payment_is_persisted_and_acknowledged(monkeypatch, app_client):
+    enqueued = []
+
+    async def fake_enqueue_notification(payment_id, notification):
+        enqueued.append((payment_id, notification))
+        return {"id": "job1", "duplicate": False}
+
+    async def fail_get_payment(payment_id):
+        raise AssertionError("O webhook não deve consultar o Mercado Pago")
+
+    monkeypatch.setattr("src.routes.budget.enqueue_notification", fake_enqueue_notification)
+    monkeypatch.setattr("src.services.payment.webhook.get_payment_async", fail_get_payment)
+
     payload = {"type": "payment", "data": {"id": "pay123"}}
     response = app_client.post("/budget/webhook", json=payload)
     assert response.status_code == 200
-    assert response.json() == {"message": "Notificação processada com sucesso"}
+    assert response.json() == {"message": "Notificação recebida"}
+    assert enqueued == [("pay123", payload)]
 
 
-def test_webhook_payment_failure(monkeypatch, app_client):
-    class FakePaymentError:
-        def get(self, payment_id):
-            raise Exception("Erro Mercado Pago")
+def test_webhook_duplicate_notification_is_acknowledged(monkeypatch, app_client):
+    async def fake_enqueue_notification(payment_id, notification):
+        return {"id": None, "duplicate": True}
 
-    class FakeSDK:
-        def payment(self):
-            return FakePaymentError()
+    monkeypatch.setattr("src.routes.budget.enqueue_notification", fake_enqueue_notification)
 
-    monkeypatch.setattr(budget_routes_mod, "sdk", FakeSDK())
+    payload = {"id": 991, "type": "payment", "data": {"id": "pay123"}}
+    response = app_client.post("/budget/webhook", json=payload)
+    assert response.status_code == 200
+    assert response.json() == {"message": "Notificação já recebida"}
+
+
+def test_webhook_payment_persist_failure(monkeypatch, app_client):
+    async def fake_enqueue_notification(payment_id, notification):
+        raise Exception("Mongo fora do ar")
+
+    monkeypatch.setattr("src.routes.budget.enqueue_notification", fake_enqueue_notification)
 
     payload = {"type": "payment", "data": {"id": "pay123"}}
     response = app_client.post("/budget/webhook", json=payload)
+    assert response.status_code == 500
+    assert "Erro ao registrar notificação" in response.json()["detail"]
+
+
+def test_webhook_payment_without_id(app_client):
+    response = app_client.post("/budget/webhook", json={"type": "payment", "data": {}})
+    assert response.status_code == 400
+
+
+def test_webhook_invalid_json(app_client):
+    response = app_client.post(
+        "/budget/webhook",
+        content=b"{nao e json",
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == 400
+
+
+def _signed_headers(secret, data_id, request_id="req-1", ts=None):
+    import hashlib
+    import hmac
+    import time
+
+    ts = ts or str(int(time.time()))
+
+    manifest = f"id:{data_id};request-id:{request_id};ts:{ts};"
+    v1 = hmac.new(secret.encode(), manifest.encode(), hashlib.sha256).hexdigest()
+    return {"x-signature": f"ts={ts},v1={v1}", "x-request-id": request_id}
+
+
+@pytest.fixture
+def webhook_secret(monkeypatch):
+    import hashlib
+    import hmac
+
+    signature_mod = importlib.import_module("src.services.payment.signature")
+    secret = "segredo-de-teste"
+    monkeypatch.setattr(signature_mod, "_keyed_hmac", hmac.new(secret.encode(), digestmod=hashlib.sha256))
+    return secret
+
+
+def test_webhook_rejects_invalid_signature_before_reading_body(monkeypatch, app_client, webhook_secret):
+    async def fail_enqueue(payment_id, notification):
+        raise AssertionError("Notificação não assinada não deve ser registrada")
+
+    monkeypatch.setattr("src.routes.budget.enqueue_notification", fail_enqueue)
+
+    headers = _signed_headers("outro-segredo", "pay123")
+    response = app_client.post(
+        "/budget/webhook?data.id=pay123&type=payment",
+        content=b"{corpo que nem seria lido",
+        headers={**headers, "Content-Type": "application/json"},
+    )
+    assert response.status_code == 401
+
+    response = app_client.post("/budget/webhook", json={"type": "payment", "data": {"id": "pay123"}})
+    assert response.status_code == 401
+
+
+def test_webhook_accepts_valid_signature(monkeypatch, app_client, webhook_secret):
+    async def fake_enqueue_notification(payment_id, notification):
+        return {"id": "job1", "duplicate": False}
+
+    monkeypatch.setattr("src.routes.budget.enqueue_notification", fake_enqueue_notification)
+
+    response = app_client.post(
+        "/budget/webhook?data.id=pay123&type=payment",
+        json={"type": "payment", "data": {"id": "pay123"}},
+        headers=_signed_headers(webhook_secret, "pay123"),
+    )
+    assert response.status_code == 200
+    assert response.json() == {"message": "Notificação recebida"}
+
+
+def test_webhook_rejects_unsigned_id_and_replayed_signature(monkeypatch, app_client, webhook_secret):
+    import hashlib
+    import hmac
+
+    async def fail_enqueue(payment_id, notification):
+        raise AssertionError("Notificação com id não assinado não deve ser registrada")
+
+    monkeypatch.setattr("src.routes.budget.enqueue_notification", fail_enqueue)
+
+    # Assinatura válida sobre um manifesto sem id: o id do corpo não pode ser confiado
+    manifest = "request-id:req-1;ts:1;"
+    v1 = hmac.new(webhook_secret.encode(), manifest.encode(), hashlib.sha256).hexdigest()
+    headers = {"x-signature": f"ts=1,v1={v1}", "x-request-id": "req-1"}
+    for payment_id in ("111", "222"):
+        response = app_client.post(
+            "/budget/webhook",
+            json={"type": "payment", "data": {"id": payment_id}},
+            headers=headers,
+        )
+        assert response.status_code == 401
+
+    # Assinatura antiga, mesmo correta, fica fora da janela de tolerância
+    response = app_client.post(
+        "/budget/webhook?data.id=pay123&type=payment",
+        json={"type": "payment", "data": {"id": "pay123"}},
+        headers=_signed_headers(webhook_secret, "pay123", ts="1704908010"),
+    )
+    assert response.status_code == 401
+
+
+def test_webhook_rejects_body_id_different_from_signed_id(app_client, webhook_secret):
+    response = app_client.post(
+        "/budget/webhook?data.id=pay123&type=payment",
+        json={"type": "payment", "data": {"id": "outro"}},
+        headers=_signed_headers(webhook_secret, "pay123"),
+    )
     assert response.status_code == 400
-    assert "Erro ao processar pagamento" in response.json()["detail"]
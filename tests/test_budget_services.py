@@ -4,7 +4,7 @@ from fastapi import HTTPException
 
 from src.models.BudgetModels import BudgetIn, BudgetUpdate
 from src.services.budget.create import create_budget, update_budget_status_and_value
-from src.services.budget.read import get_all_budgets, get_pending_budgets, get_budget_by_id
+from src.services.budget.read import get_all_budgets, get_pending_budgets, get_budget_by_id, get_budgets_by_ids
 
 
 # -------------------------
@@ -41,7 +41,8 @@ class FakeCollection:
         """
         oid = filter_query.get("_id")
         str_oid = str(oid)
-        if str_oid in self._docs:
+        excluded = filter_query.get("status", {}).get("$nin", [])
+        if str_oid in self._docs and self._docs[str_oid].get("status") not in excluded:
             set_fields = update_query.get("$set", {})
             self._docs[str_oid].update(set_fields)
             return FakeUpdateResult(matched_count=1)
@@ -59,7 +60,7 @@ class FakeCollection:
             docs = [d for d in docs if d.get("status") == status_val]
         return [d.copy() for d in docs]
 
-    def find_one(self, filter_query):
+    def find_one(self, filter_query, projection=None):
         """
         Simula find_one: procura pelo "_id" em _docs e retorna cópia ou None.
         """
@@ -74,6 +75,14 @@ class FakeClient:
     pass
 
 
+@pytest.fixture(autouse=True)
+def booking_syncs(monkeypatch):
+    """O índice de disponibilidade é testado à parte; aqui só registramos as chamadas."""
+    calls = []
+    monkeypatch.setattr("src.services.budget.create.sync_booking", lambda collection, budget_id: calls.append(budget_id))
+    return calls
+
+
 @pytest.fixture
 def fake_collection_and_client():
     """
@@ -124,6 +133,10 @@ async def test_create_budget_success(monkeypatch, fake_collection_and_client):
     assert stored["name"] == "Teste Cliente"
     # Como excluímos unset, o campo "status" não estará presente por padrão
     assert "status" not in stored
+    # A cotação do catálogo é gravada junto, sem definir o valor do orçamento
+    assert stored["quote"]["package"] == "Básico"
+    assert stored["quote"]["total"] > 0
+    assert "value" not in stored
 
 
 @pytest.mark.asyncio
@@ -162,6 +175,33 @@ async def test_create_budget_insertion_error(monkeypatch, fake_collection_and_cl
     assert "Falha no banco" in excinfo.value.detail
 
 
+@pytest.mark.asyncio
+async def test_create_budget_rejects_selection_outside_catalog(monkeypatch, fake_collection_and_client):
+    fake_coll, fake_client = fake_collection_and_client
+    monkeypatch.setattr("src.services.budget.create.connect", lambda name: (fake_coll, fake_client))
+
+    budget_in = BudgetIn(
+        name="Cliente",
+        email="cliente@example.com",
+        phone="(11) 99999-0000",
+        budget={
+            "description": "Evento",
+            "type": "Teste",
+            "date": "2025-12-01",
+            "num_barmans": 1,
+            "num_guests": 30,
+            "time": 3.0,
+            "package": "Básico",
+            "extras": ["Fogos"],
+        },
+    )
+    with pytest.raises(HTTPException) as excinfo:
+        await create_budget(budget_in)
+    assert excinfo.value.status_code == 422
+    assert "Fogos" in excinfo.value.detail
+    assert fake_coll._docs == {}
+
+
 # ----------------------------------------------
 # Tests para update_budget_status_and_value
 # ----------------------------------------------
@@ -226,6 +266,45 @@ async def test_update_budget_not_found(monkeypatch, fake_collection_and_client):
     assert "Orçamento não encontrado" in excinfo.value.detail
 
 
+@pytest.mark.asyncio
+async def test_update_budget_status_never_regresses(monkeypatch, fake_collection_and_client, booking_syncs):
+    fake_coll, fake_client = fake_collection_and_client
+    existing_id = ObjectId()
+    fake_coll._docs[str(existing_id)] = {"_id": existing_id, "status": "Pendente"}
+
+    monkeypatch.setattr("src.services.budget.create.connect", lambda name: (fake_coll, fake_client))
+
+    def update(new_status):
+        return update_budget_status_and_value(BudgetUpdate(_id=str(existing_id), new_status=new_status), monotonic=True)
+
+    assert await update("failed") is True
+    assert await update("paid") is True
+
+    # Um "failed" atrasado não sobrescreve o pagamento aprovado
+    assert await update("failed") is False
+    assert fake_coll._docs[str(existing_id)]["status"] == "paid"
+
+    # Status manuais não entram na ordem e continuam livres
+    assert await update("Aprovado") is True
+
+    # A disponibilidade só é sincronizada pelas transições aplicadas
+    assert booking_syncs == [existing_id] * 3
+
+
+@pytest.mark.asyncio
+async def test_admin_update_can_reopen_budget(monkeypatch, fake_collection_and_client):
+    fake_coll, fake_client = fake_collection_and_client
+    existing_id = ObjectId()
+    fake_coll._docs[str(existing_id)] = {"_id": existing_id, "status": "failed", "value": 100.0}
+    monkeypatch.setattr("src.services.budget.create.connect", lambda name: (fake_coll, fake_client))
+
+    updated = await update_budget_status_and_value(BudgetUpdate(_id=str(existing_id), new_status="Pendente", value=150.0))
+
+    assert updated is True
+    assert fake_coll._docs[str(existing_id)]["status"] == "Pendente"
+    assert fake_coll._docs[str(existing_id)]["value"] == 150.0
+
+
 @pytest.mark.asyncio
 async def test_update_budget_error(monkeypatch, fake_collection_and_client):
     fake_coll, fake_client = fake_collection_and_client
@@ -408,3 +487,203 @@ async def test_get_budget_by_id_error(monkeypatch, fake_collection_and_client):
         await get_budget_by_id(str(ObjectId()))
     assert excinfo.value.status_code == 500
     assert "Erro find_one" in excinfo.value.detail
+
+
+# -------------------------------------
+# Tests para get_budgets_by_ids
+# -------------------------------------
+@pytest.mark.asyncio
+async def test_get_budgets_by_ids_single_query(monkeypatch, fake_collection_and_client):
+    fake_coll, fake_client = fake_collection_and_client
+    queries = []
+
+    class InCollection(FakeCollection):
+        def find(self, filter_query=None):
+            queries.append(filter_query)
+            wanted = set(filter_query["_id"]["$in"])
+            return [d.copy() for d in self._docs.values() if d["_id"] in wanted]
+
+    coll = InCollection()
+    oid1, oid2, oid3 = ObjectId(), ObjectId(), ObjectId()
+    for oid in (oid1, oid2, oid3):
+        coll._docs[str(oid)] = {"_id": oid, "status": "Pendente"}
+
+    monkeypatch.setattr("src.services.budget.read.connect", lambda name: (coll, fake_client))
+
+    results = await get_budgets_by_ids([str(oid1), str(oid3), "id-invalido"])
+
+    assert len(queries) == 1
+    assert {r["_id"] for r in results} == {str(oid1), str(oid3)}
+
+
+# ----------------------------------------------
+# Tests para get_payment_status
+# ----------------------------------------------
+@pytest.fixture
+def status_cache():
+    from src.services.budget.status_cache import payment_status_cache
+
+    payment_status_cache.clear()
+    yield payment_status_cache
+    payment_status_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_payment_status_falls_back_to_projected_read(monkeypatch, status_cache):
+    from src.services.budget import status_cache as status_mod
+
+    reads = []
+    existing_id = ObjectId()
+
+    class ProjectedCollection:
+        def find_one(self, filter_query, projection=None):
+            reads.append(projection)
+            if filter_query["_id"] == existing_id:
+                return {"status": "Pendente"}
+            return None
+
+    monkeypatch.setattr(status_mod, "connect", lambda name: (ProjectedCollection(), None))
+
+    first = await status_mod.get_payment_status(str(existing_id))
+    second = await status_mod.get_payment_status(str(existing_id))
+
+    assert first == second == {"id": str(existing_id), "status": "Pendente", "paid": False}
+    # A segunda consulta sai do cache, e a leitura traz só o status
+    assert reads == [{"_id": 0, "status": 1}]
+
+    with pytest.raises(HTTPException) as excinfo:
+        await status_mod.get_payment_status(str(ObjectId()))
+    assert excinfo.value.status_code == 404
+
+    with pytest.raises(HTTPException) as excinfo:
+        await status_mod.get_payment_status("id-invalido")
+    assert excinfo.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_status_update_populates_payment_status_cache(monkeypatch, fake_collection_and_client, status_cache):
+    from src.services.budget import status_cache as status_mod
+
+    fake_coll, fake_client = fake_collection_and_client
+    existing_id = ObjectId()
+    fake_coll._docs[str(existing_id)] = {"_id": existing_id, "status": "Pendente"}
+    monkeypatch.setattr("src.services.budget.create.connect", lambda name: (fake_coll, fake_client))
+
+    def no_read(name):
+        raise AssertionError("O status deve sair do cache")
+
+    monkeypatch.setattr(status_mod, "connect", no_read)
+
+    await update_budget_status_and_value(BudgetUpdate(_id=str(existing_id), new_status="paid"))
+    result = await status_mod.get_payment_status(str(existing_id))
+
+    assert result == {"id": str(existing_id), "status": "paid", "paid": True}
+
+
+def test_payment_status_cache_expires_and_is_bounded():
+    import time
+
+    from src.services.budget.status_cache import PaymentStatusCache
+
+    cache = PaymentStatusCache(ttl=0.01, max_size=2)
+    cache.set("a", "paid")
+    cache.set("b", "paid")
+    cache.set("c", "paid")
+    assert cache.get("a") is None
+    assert cache.get("c") == "paid"
+
+    time.sleep(0.02)
+    assert cache.get("c") is None
+
+
+# -------------------------
+# Testes da fila de precificação
+# -------------------------
+class FakeClaimCollection:
+    def __init__(self, docs):
+        self.docs = [dict(doc) for doc in docs]
+        self.calls = []
+
+    def _claimable(self, doc, now):
+        claimed_until = doc.get("claimed_until")
+        return (
+            doc.get("status") == "Pendente"
+            and doc.get("value") is None
+            and (claimed_until is None or claimed_until <= now)
+        )
+
+    def find_one_and_update(self, filter_query, update, sort=None, return_document=None):
+        self.calls.append((filter_query, sort))
+        now = filter_query["$or"][1]["claimed_until"]["$lte"]
+        candidates = sorted(
+            (doc for doc in self.docs if self._claimable(doc, now)),
+            key=lambda doc: doc["budget"]["date"],
+        )
+        if not candidates:
+            return None
+        candidates[0].update(update["$set"])
+        return dict(candidates[0])
+
+
+@pytest.mark.asyncio
+async def test_claim_pending_budget_takes_soonest_unclaimed(monkeypatch):
+    from datetime import datetime, timedelta, timezone
+
+    from src.services.budget import claim_pending_budget
+
+    now = datetime.now(timezone.utc)
+    collection = FakeClaimCollection([
+        {"_id": "late", "status": "Pendente", "budget": {"date": "2026-03-01"}},
+        {"_id": "priced", "status": "Pendente", "value": 900.0, "budget": {"date": "2025-11-01"}},
+        {"_id": "taken", "status": "Pendente", "budget": {"date": "2025-11-02"},
+         "claimed_by": "Bia", "claimed_until": now + timedelta(minutes=5)},
+        {"_id": "expired", "status": "Pendente", "budget": {"date": "2025-11-03"},
+         "claimed_by": "Caio", "claimed_until": now - timedelta(minutes=1)},
+        {"_id": "paid", "status": "paid", "budget": {"date": "2025-10-01"}},
+    ])
+    monkeypatch.setattr("src.services.budget.claim.connect", lambda name: (collection, None))
+
+    first = await claim_pending_budget("Ana", lease_seconds=60)
+    second = await claim_pending_budget("Davi", lease_seconds=60)
+    third = await claim_pending_budget("Eva", lease_seconds=60)
+
+    assert first["_id"] == "expired" and first["claimed_by"] == "Ana"
+    assert first["claimed_until"] > now
+    assert second["_id"] == "late"
+    assert third is None
+    assert collection.calls[0][1] == [("budget.date", 1)]
+
+
+@pytest.mark.asyncio
+async def test_claim_pending_budget_error(monkeypatch):
+    from src.services.budget import claim_pending_budget
+
+    class BadCollection:
+        def find_one_and_update(self, *args, **kwargs):
+            raise Exception("Falha no banco")
+
+    monkeypatch.setattr("src.services.budget.claim.connect", lambda name: (BadCollection(), None))
+
+    with pytest.raises(HTTPException) as excinfo:
+        await claim_pending_budget("Ana")
+    assert excinfo.value.status_code == 500
+    assert "Falha no banco" in excinfo.value.detail
+
+
+def test_budget_indexes_cover_pending_pricing_queue(monkeypatch):
+    from src.services.budget import read as read_mod
+
+    class FakeIndexCollection:
+        def __init__(self):
+            self.created = []
+
+        def create_index(self, keys):
+            self.created.append(keys)
+
+    collection = FakeIndexCollection()
+    monkeypatch.setattr(read_mod, "connect", lambda name: (collection, None))
+
+    read_mod.ensure_budget_indexes()
+
+    # Um único índice atende listagem, conciliação e a fila de precificação
+    assert collection.created == [[("status", 1), ("value", 1), ("budget.date", 1)]]
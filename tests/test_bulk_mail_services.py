@@ -0,0 +1,174 @@
+import asyncio
+import pytest
+
+from src.services.email import bulk as bulk_mod
+
+
+def _budget(budget_id, value=100.0):
+    return {
+        "_id": budget_id,
+        "name": f"Cliente {budget_id}",
+        "email": f"{budget_id}@mail.com",
+        "budget": {"type": "Aniversário", "date": "2025-08-01"},
+        "value": value,
+    }
+
+
+# -------------------------
+# Fakes com contagem de concorrência
+# -------------------------
+class ConcurrencyProbe:
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+
+    def enter(self):
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+
+    def leave(self):
+        self.current -= 1
+
+
+@pytest.fixture
+def fakes(monkeypatch):
+    payment_probe = ConcurrencyProbe()
+    email_probe = ConcurrencyProbe()
+    sent = []
+
+    async def fake_create_preference(data):
+        payment_probe.enter()
+        await asyncio.sleep(0.01)
+        payment_probe.leave()
+        return {"initPoint": f"https://fake.init/{data['id']}", "preferenceId": data["id"]}
+
+    async def fake_send_email_async(details):
+        email_probe.enter()
+        await asyncio.sleep(0.01)
+        email_probe.leave()
+        if details.email.startswith("falha"):
+            raise Exception("Erro ao enviar e-mail: caixa inexistente")
+        sent.append(details)
+
+    monkeypatch.setattr(bulk_mod, "get_or_create_preference_async", fake_create_preference)
+    monkeypatch.setattr(bulk_mod, "send_email_async", fake_send_email_async)
+    monkeypatch.setattr(bulk_mod, "BULK_PAYMENT_CONCURRENCY", 3)
+    monkeypatch.setattr(bulk_mod, "BULK_EMAIL_CONCURRENCY", 2)
+
+    reserved = {}
+
+    def fake_reserve(key, budget_id):
+        if key in reserved:
+            return {"_id": key, "result": reserved[key]}
+        reserved[key] = None
+        return None
+
+    def fake_enqueue(collection_name, payload, budget_id=None, completed=False):
+        assert completed
+        return f"job-{budget_id}"
+
+    monkeypatch.setattr(bulk_mod.idempotency, "reserve", fake_reserve)
+    monkeypatch.setattr(bulk_mod.idempotency, "record_result", reserved.__setitem__)
+    monkeypatch.setattr(bulk_mod.queue, "enqueue", fake_enqueue)
+    monkeypatch.setattr(bulk_mod.idempotency, "release", lambda key: reserved.pop(key, None))
+    return payment_probe, email_probe, sent
+
+
+# -------------------------
+# Testes de send_bulk_emails
+# -------------------------
+@pytest.mark.asyncio
+async def test_send_bulk_emails_respects_limits(fakes):
+    payment_probe, email_probe, sent = fakes
+    ids = [f"b{i}" for i in range(10)]
+
+    results = await bulk_mod.send_bulk_emails(ids, [_budget(i) for i in ids])
+
+    assert [r["id"] for r in results] == ids
+    assert all(r["status"] == "sent" for r in results)
+    assert len(sent) == 10
+    assert sent[0].payment_link.startswith("https://fake.init/")
+    assert payment_probe.peak == 3
+    assert email_probe.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_send_bulk_emails_reports_each_id(fakes):
+    budgets = [_budget("ok"), _budget("falha"), _budget("sem_valor", value=None)]
+    budgets[1]["email"] = "falha@mail.com"
+
+    results = await bulk_mod.send_bulk_emails(["ok", "falha", "sem_valor", "ausente", "ok"], budgets)
+    by_id = {r["id"]: r for r in results}
+
+    # Ids repetidos são enviados uma única vez
+    assert len(results) == 4
+    assert by_id["ok"]["status"] == "sent"
+    assert by_id["falha"]["status"] == "error"
+    assert "caixa inexistente" in by_id["falha"]["detail"]
+    assert by_id["sem_valor"] == {"id": "sem_valor", "status": "error", "detail": "Orçamento sem valor definido"}
+    assert by_id["ausente"]["status"] == "not_found"
+
+
+@pytest.mark.asyncio
+async def test_send_bulk_emails_skips_recent_duplicates(fakes):
+    payment_probe, email_probe, sent = fakes
+
+    await bulk_mod.send_bulk_emails(["b1"], [_budget("b1")])
+    results = await bulk_mod.send_bulk_emails(["b1"], [_budget("b1")])
+
+    assert results[0]["status"] == "duplicate"
+    assert len(sent) == 1
+
+
+@pytest.mark.asyncio
+async def test_send_bulk_emails_records_sent_job(fakes):
+    from src.services.email import outbox as outbox_mod
+
+    await bulk_mod.send_bulk_emails(["b1"], [_budget("b1")])
+
+    # Um envio individual logo depois aponta para o registro do envio em lote
+    previous = bulk_mod.idempotency.reserve(outbox_mod.email_idempotency_key(_budget("b1")), "b1")
+    assert previous["result"] == {"id": "job-b1"}
+
+
+@pytest.mark.asyncio
+async def test_send_bulk_emails_failure_allows_retry(fakes):
+    payment_probe, email_probe, sent = fakes
+    budget = _budget("falha")
+    budget["email"] = "falha@mail.com"
+
+    first = await bulk_mod.send_bulk_emails(["falha"], [budget])
+    second = await bulk_mod.send_bulk_emails(["falha"], [budget])
+
+    assert first[0]["status"] == "error"
+    assert second[0]["status"] == "error"
+
+
+@pytest.mark.asyncio
+async def test_send_bulk_emails_runs_mongo_off_the_event_loop(fakes, monkeypatch):
+    import threading
+    import time
+
+    loop_thread = threading.get_ident()
+    lock = threading.Lock()
+    probe = ConcurrencyProbe()
+    threads = set()
+
+    def blocking_reserve(key, budget_id):
+        with lock:
+            probe.enter()
+            threads.add(threading.get_ident())
+        time.sleep(0.01)
+        with lock:
+            probe.leave()
+        return None
+
+    monkeypatch.setattr(bulk_mod, "BULK_MONGO_CONCURRENCY", 2)
+    monkeypatch.setattr(bulk_mod.idempotency, "reserve", blocking_reserve)
+    ids = [f"b{i}" for i in range(6)]
+
+    results = await bulk_mod.send_bulk_emails(ids, [_budget(i) for i in ids])
+
+    assert all(r["status"] == "sent" for r in results)
+    assert loop_thread not in threads
+    assert probe.peak <= 2
@@ -0,0 +1,242 @@
+import asyncio
+import importlib
+import time
+
+import pytest
+
+from src.services.circuit import CircuitBreaker, CircuitOpenError, CLOSED, HALF_OPEN, OPEN
+
+payment_mod = importlib.import_module("src.services.payment.mercadopago")
+mail_mod = importlib.import_module("src.services.email.sendMail")
+
+
+def _fail():
+    raise Exception("dependência fora do ar")
+
+
+# -------------------------
+# Testes do disjuntor
+# -------------------------
+def test_breaker_opens_after_threshold_and_sheds_calls():
+    breaker = CircuitBreaker("teste", failure_threshold=2, recovery_timeout=60)
+    calls = []
+
+    for _ in range(2):
+        with pytest.raises(Exception):
+            breaker.call_sync(_fail)
+    assert breaker.state == OPEN
+
+    # Circuito aberto: a chamada falha na hora, sem tocar a dependência
+    with pytest.raises(CircuitOpenError):
+        breaker.call_sync(calls.append, "não deve ser chamado")
+    assert calls == []
+
+
+def test_breaker_ignores_errors_not_marked_as_failures():
+    breaker = CircuitBreaker("teste", failure_threshold=2, is_failure=lambda e: not isinstance(e, ValueError))
+
+    def reject():
+        raise ValueError("pedido inválido")
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            breaker.call_sync(reject)
+    assert breaker.state == CLOSED
+
+    for _ in range(2):
+        with pytest.raises(Exception):
+            breaker.call_sync(_fail)
+    assert breaker.state == OPEN
+
+
+def test_breaker_success_resets_failure_count():
+    breaker = CircuitBreaker("teste", failure_threshold=2)
+
+    with pytest.raises(Exception):
+        breaker.call_sync(_fail)
+    breaker.call_sync(lambda: None)
+    with pytest.raises(Exception):
+        breaker.call_sync(_fail)
+
+    assert breaker.state == CLOSED
+
+
+def test_breaker_half_open_recovers_or_reopens():
+    breaker = CircuitBreaker("teste", failure_threshold=1, recovery_timeout=0.05)
+
+    with pytest.raises(Exception):
+        breaker.call_sync(_fail)
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+
+    # Teste falho: volta a abrir
+    with pytest.raises(Exception):
+        breaker.call_sync(_fail)
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    assert breaker.call_sync(lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_breaker_half_open_allows_a_single_trial():
+    breaker = CircuitBreaker("teste", failure_threshold=1, recovery_timeout=0.01)
+    with pytest.raises(Exception):
+        breaker.call_sync(_fail)
+    await asyncio.sleep(0.02)
+
+    release = asyncio.Event()
+
+    async def slow():
+        await release.wait()
+        return "ok"
+
+    trial = asyncio.create_task(breaker.call(slow))
+    await asyncio.sleep(0)
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(slow)
+
+    release.set()
+    assert await trial == "ok"
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_breaker_deadline_counts_as_failure():
+    breaker = CircuitBreaker("teste", failure_threshold=1, timeout=0.01)
+
+    with pytest.raises(TimeoutError) as excinfo:
+        await breaker.call(asyncio.sleep, 1)
+
+    assert "Prazo de 0.01s excedido em teste" in str(excinfo.value)
+    assert breaker.state == OPEN
+
+
+# -------------------------
+# Testes da integração com Mercado Pago e SMTP
+# -------------------------
+class CountingClient:
+    def __init__(self, status):
+        self.status = status
+        self.calls = 0
+
+    async def get_payment(self, payment_id):
+        self.calls += 1
+        return {"status": self.status, "response": {"message": "erro"}}
+
+
+@pytest.mark.asyncio
+async def test_mercadopago_server_errors_open_the_circuit(monkeypatch):
+    client = CountingClient(503)
+    monkeypatch.setattr(payment_mod, "mp_client", client)
+
+    for _ in range(payment_mod.mercadopago_breaker.failure_threshold):
+        with pytest.raises(Exception):
+            await payment_mod.get_payment_async("1")
+
+    with pytest.raises(CircuitOpenError):
+        await payment_mod.get_payment_async("1")
+    assert client.calls == payment_mod.mercadopago_breaker.failure_threshold
+
+
+@pytest.mark.asyncio
+async def test_mercadopago_client_errors_do_not_open_the_circuit(monkeypatch):
+    client = CountingClient(404)
+    monkeypatch.setattr(payment_mod, "mp_client", client)
+
+    for _ in range(payment_mod.mercadopago_breaker.failure_threshold + 1):
+        with pytest.raises(Exception) as excinfo:
+            await payment_mod.get_payment_async("inexistente")
+        assert "404" in str(excinfo.value)
+
+    assert payment_mod.mercadopago_breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_send_email_async_respects_deadline(monkeypatch):
+    class HangingPool:
+        async def send(self, msg):
+            await asyncio.Event().wait()
+
+    from src.models.MailModels import EmailDetails
+
+    monkeypatch.setattr(mail_mod, "async_smtp_pool", HangingPool())
+    monkeypatch.setattr(mail_mod.smtp_breaker, "timeout", 0.01)
+
+    details = EmailDetails(
+        email="cliente@example.com",
+        name="Cliente",
+        type="Aniversário",
+        date="2025-06-10",
+        value="150.0",
+        payment_link="https://example.com/pagar",
+    )
+    with pytest.raises(Exception) as excinfo:
+        await mail_mod.send_email_async(details)
+
+    assert "Erro ao enviar e-mail" in str(excinfo.value)
+    assert "Prazo" in str(excinfo.value)
+
+
+def _details():
+    from src.models.MailModels import EmailDetails
+
+    return EmailDetails(
+        email="cliente@example.com",
+        name="Cliente",
+        type="Aniversário",
+        date="2025-06-10",
+        value="150.0",
+        payment_link="https://example.com/pagar",
+    )
+
+
+@pytest.mark.asyncio
+async def test_smtp_message_rejections_do_not_open_the_circuit(monkeypatch):
+    import aiosmtplib
+
+    class RefusingPool:
+        async def send(self, msg):
+            raise aiosmtplib.SMTPRecipientsRefused([])
+
+    monkeypatch.setattr(mail_mod, "async_smtp_pool", RefusingPool())
+
+    for _ in range(mail_mod.smtp_breaker.failure_threshold + 1):
+        with pytest.raises(Exception):
+            await mail_mod.send_email_async(_details())
+
+    assert mail_mod.smtp_breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_smtp_connection_errors_open_the_circuit(monkeypatch):
+    import aiosmtplib
+
+    class DisconnectedPool:
+        async def send(self, msg):
+            raise aiosmtplib.SMTPServerDisconnected("conexão perdida")
+
+    monkeypatch.setattr(mail_mod, "async_smtp_pool", DisconnectedPool())
+
+    for _ in range(mail_mod.smtp_breaker.failure_threshold):
+        with pytest.raises(Exception):
+            await mail_mod.send_email_async(_details())
+
+    assert mail_mod.smtp_breaker.state == OPEN
+
+
+def test_is_smtp_unavailable_classifies_errors():
+    import smtplib
+
+    import aiosmtplib
+
+    assert mail_mod.is_smtp_unavailable(ConnectionRefusedError()) is True
+    assert mail_mod.is_smtp_unavailable(TimeoutError()) is True
+    assert mail_mod.is_smtp_unavailable(smtplib.SMTPServerDisconnected()) is True
+    assert mail_mod.is_smtp_unavailable(smtplib.SMTPConnectError(421, b"ocupado")) is True
+    assert mail_mod.is_smtp_unavailable(aiosmtplib.SMTPReadTimeoutError("lento")) is True
+    assert mail_mod.is_smtp_unavailable(smtplib.SMTPRecipientsRefused({})) is False
+    assert mail_mod.is_smtp_unavailable(smtplib.SMTPDataError(554, b"rejeitada")) is False
+    assert mail_mod.is_smtp_unavailable(aiosmtplib.SMTPDataError(550, "rejeitada")) is False
+    assert mail_mod.is_smtp_unavailable(ValueError()) is False
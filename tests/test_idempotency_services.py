@@ -0,0 +1,197 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from pymongo.errors import DuplicateKeyError
+
+from src.services.email import idempotency as idem_mod
+from src.services.email import outbox as outbox_mod
+
+
+# -------------------------
+# Fake collection de chaves de idempotência
+# -------------------------
+class FakeIdempotencyCollection:
+    def __init__(self):
+        self.docs = {}
+
+    def insert_one(self, data):
+        if data["_id"] in self.docs:
+            raise DuplicateKeyError("E11000 duplicate key")
+        self.docs[data["_id"]] = dict(data)
+
+    def find_one_and_update(self, filter_query, update_query):
+        doc = self.docs.get(filter_query["_id"])
+        if doc and doc["created_at"] < filter_query["created_at"]["$lt"]:
+            before = dict(doc)
+            doc.update(update_query["$set"])
+            return before
+        return None
+
+    def find_one(self, filter_query):
+        doc = self.docs.get(filter_query["_id"])
+        return dict(doc) if doc else None
+
+    def update_one(self, filter_query, update_query):
+        self.docs[filter_query["_id"]].update(update_query["$set"])
+
+    def delete_one(self, filter_query):
+        doc = self.docs.get(filter_query["_id"])
+        if doc is None:
+            return
+        if "result.id" in filter_query and (doc.get("result") or {}).get("id") != filter_query["result.id"]:
+            return
+        del self.docs[filter_query["_id"]]
+
+
+@pytest.fixture
+def fake_keys(monkeypatch):
+    collection = FakeIdempotencyCollection()
+    monkeypatch.setattr(idem_mod, "connect", lambda name: (collection, None))
+    return collection
+
+
+# -------------------------
+# Testes da chave e da reserva
+# -------------------------
+def test_idempotency_key_depends_on_value_and_template():
+    base = idem_mod.idempotency_key("b1", 100.0, "v1")
+
+    assert base == idem_mod.idempotency_key("b1", 100.0, "v1")
+    assert base != idem_mod.idempotency_key("b1", 120.0, "v1")
+    assert base != idem_mod.idempotency_key("b1", 100.0, "v2")
+    assert base != idem_mod.idempotency_key("b2", 100.0, "v1")
+
+
+def test_reserve_returns_previous_result(fake_keys):
+    assert idem_mod.reserve("k", "b1") is None
+    idem_mod.record_result("k", {"id": "job1"})
+
+    previous = idem_mod.reserve("k", "b1")
+    assert previous["result"] == {"id": "job1"}
+
+
+def test_reserve_renews_expired_key(fake_keys):
+    idem_mod.reserve("k", "b1")
+    fake_keys.docs["k"]["created_at"] = datetime.now(timezone.utc) - timedelta(
+        seconds=idem_mod.EMAIL_IDEMPOTENCY_WINDOW + 1
+    )
+
+    assert idem_mod.reserve("k", "b1") is None
+
+
+def test_release_allows_new_reservation(fake_keys):
+    idem_mod.reserve("k", "b1")
+    idem_mod.release("k")
+
+    assert idem_mod.reserve("k", "b1") is None
+
+
+# -------------------------
+# Testes de enqueue_email com idempotência
+# -------------------------
+def _budget(value=350.0):
+    return {
+        "_id": "665f1c2e8f1b2a0012345678",
+        "name": "Cliente Duplo",
+        "email": "duplo@mail.com",
+        "budget": {"type": "Formatura", "date": "2025-12-20"},
+        "value": value,
+    }
+
+
+@pytest.mark.asyncio
+async def test_enqueue_email_short_circuits_duplicates(monkeypatch, fake_keys):
+    enqueued = []
+
+    def fake_enqueue(collection_name, payload, budget_id=None):
+        enqueued.append(payload)
+        return f"job{len(enqueued)}"
+
+    monkeypatch.setattr(outbox_mod.queue, "enqueue", fake_enqueue)
+
+    first = await outbox_mod.enqueue_email(_budget())
+    second = await outbox_mod.enqueue_email(_budget())
+
+    assert first == {"id": "job1", "duplicate": False}
+    assert second == {"id": "job1", "duplicate": True}
+    assert len(enqueued) == 1
+
+    # Valor novo gera um novo envio
+    third = await outbox_mod.enqueue_email(_budget(value=400.0))
+    assert third == {"id": "job2", "duplicate": False}
+
+
+@pytest.mark.asyncio
+async def test_enqueue_email_releases_key_on_failure(monkeypatch, fake_keys):
+    def failing_enqueue(collection_name, payload, budget_id=None):
+        raise Exception("Mongo fora do ar")
+
+    monkeypatch.setattr(outbox_mod.queue, "enqueue", failing_enqueue)
+
+    with pytest.raises(Exception):
+        await outbox_mod.enqueue_email(_budget())
+
+    assert fake_keys.docs == {}
+
+
+@pytest.mark.asyncio
+async def test_failed_email_job_releases_its_key(monkeypatch, fake_keys):
+    jobs = {}
+
+    def fake_enqueue(collection_name, payload, budget_id=None):
+        job_id = f"job{len(jobs) + 1}"
+        jobs[job_id] = {"_id": job_id, "payload": payload}
+        return job_id
+
+    monkeypatch.setattr(outbox_mod.queue, "enqueue", fake_enqueue)
+
+    first = await outbox_mod.enqueue_email(_budget())
+    await outbox_mod.release_failed_email(jobs[first["id"]])
+
+    # O admin pode reenviar logo após a falha definitiva
+    second = await outbox_mod.enqueue_email(_budget())
+    assert second == {"id": "job2", "duplicate": False}
+
+    # A falha de um job antigo não libera a reserva do envio mais novo
+    await outbox_mod.release_failed_email(jobs["job1"])
+    third = await outbox_mod.enqueue_email(_budget())
+    assert third == {"id": "job2", "duplicate": True}
+
+
+@pytest.mark.asyncio
+async def test_enqueue_email_rejects_budget_without_value(monkeypatch, fake_keys):
+    from fastapi import HTTPException
+
+    def fail_enqueue(collection_name, payload, budget_id=None):
+        raise AssertionError("Orçamento sem valor não deve ser enfileirado")
+
+    monkeypatch.setattr(outbox_mod.queue, "enqueue", fail_enqueue)
+
+    with pytest.raises(HTTPException) as excinfo:
+        await outbox_mod.enqueue_email(_budget(value=None))
+    assert excinfo.value.status_code == 422
+    assert fake_keys.docs == {}
+
+
+@pytest.mark.asyncio
+async def test_enqueue_email_runs_mongo_off_the_event_loop(monkeypatch, fake_keys):
+    import threading
+
+    loop_thread = threading.get_ident()
+    threads = []
+
+    def fake_enqueue(collection_name, payload, budget_id=None):
+        threads.append(threading.get_ident())
+        return "job1"
+
+    def fake_latest(collection_name, budget_id):
+        threads.append(threading.get_ident())
+        return {"_id": "job1", "status": "pending"}
+
+    monkeypatch.setattr(outbox_mod.queue, "enqueue", fake_enqueue)
+    monkeypatch.setattr(outbox_mod.queue, "latest_for_budget", fake_latest)
+
+    await outbox_mod.enqueue_email(_budget())
+    status = await outbox_mod.get_email_status(_budget()["_id"])
+
+    assert status["status"] == "pending"
+    assert len(threads) == 2 and loop_thread not in threads
@@ -0,0 +1,67 @@
+import pytest
+import importlib
+
+from benchmarks.smtp_stand_in import smtp_stand_in
+from src.models.MailModels import EmailDetails
+
+mail_mod = importlib.import_module("src.services.email.sendMail")
+
+
+# -------------------------
+# Fixture: servidor SMTP local (aiosmtpd) com o módulo apontando para ele
+# -------------------------
+@pytest.fixture
+def stand_in(monkeypatch, request):
+    options = getattr(request, "param", {})
+    with smtp_stand_in(**options) as (handler, host, port):
+        monkeypatch.setattr(mail_mod, "EMAIL_HOST", host)
+        monkeypatch.setattr(mail_mod, "EMAIL_PORT", port)
+        monkeypatch.setattr(mail_mod, "EMAIL_USER", "user@test.com")
+        monkeypatch.setattr(mail_mod, "EMAIL_PASS", "password123")
+        monkeypatch.setattr(mail_mod, "EMAIL_STARTTLS", False)
+        monkeypatch.setattr(mail_mod, "smtp_pool", mail_mod.SMTPPool(mail_mod._open_connection, max_size=2))
+        monkeypatch.setattr(
+            mail_mod, "async_smtp_pool", mail_mod.AsyncSMTPPool(mail_mod._open_async_connection, max_size=2)
+        )
+        yield handler
+        mail_mod.smtp_pool.close()
+
+
+def _email_details():
+    return EmailDetails(
+        email="cliente@example.com",
+        name="Cliente Integração",
+        type="Casamento",
+        date="2025-12-12",
+        value="1200.00",
+        payment_link="https://testlink.com/pagar/999",
+    )
+
+
+def test_send_email_against_local_server(stand_in):
+    for _ in range(3):
+        mail_mod.send_email(_email_details())
+
+    assert stand_in.received == 3
+    assert stand_in.sessions == 1
+    assert stand_in.messages[0].rcpt_tos == ["cliente@example.com"]
+    assert b"Cliente Integra" in stand_in.messages[0].content
+
+
+@pytest.mark.asyncio
+async def test_send_email_async_against_local_server(stand_in):
+    for _ in range(3):
+        await mail_mod.send_email_async(_email_details())
+    await mail_mod.async_smtp_pool.close()
+
+    assert stand_in.received == 3
+    assert stand_in.sessions == 1
+
+
+@pytest.mark.parametrize("stand_in", [{"failure_rate": 1.0}], indirect=True)
+def test_send_email_reports_injected_failure(stand_in):
+    with pytest.raises(Exception) as excinfo:
+        mail_mod.send_email(_email_details())
+
+    assert "Erro ao enviar e-mail" in str(excinfo.value)
+    assert stand_in.rejected == 1
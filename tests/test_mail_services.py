@@ -1,6 +1,8 @@
 import os
 import pytest
 import smtplib
+import asyncio
+import aiosmtplib
 import importlib
 from email.message import EmailMessage
 
@@ -8,6 +10,7 @@ from src.models.MailModels import EmailDetails
 
 # Import do módulo correto: src.services.email.sendMail
 mail_mod = importlib.import_module("src.services.email.sendMail")
+template_mod = importlib.import_module("src.services.email.template")
 
 
 # -------------------------
@@ -49,12 +52,17 @@ class FakeSMTP:
     - login()
     - send_message()
     """
-    def __init__(self, host, port):
+    instances = 0
+
+    def __init__(self, host, port, timeout=None):
         self.host = host
         self.port = port
         self.started_tls = False
         self.logged_in = False
         self.sent_message = None
+        self.sent_count = 0
+        self.alive = True
+        FakeSMTP.instances += 1
 
         # Armazena a última instância criada para inspeção
         FakeSMTP._last_instance = self
@@ -75,8 +83,19 @@ class FakeSMTP:
         self.logged_in = True
 
     def send_message(self, msg: EmailMessage):
+        if not self.alive:
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
         # Armazena a mensagem para inspeção posterior
         self.sent_message = msg
+        self.sent_count += 1
+
+    def noop(self):
+        if not self.alive:
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        return 250, b"OK"
+
+    def quit(self):
+        self.alive = False
 
 
 # -------------------------
@@ -86,7 +105,7 @@ class FakeSMTPError:
     """
     FakeSMTPError simula smtplib.SMTP que falha ao enviar a mensagem.
     """
-    def __init__(self, host, port):
+    def __init__(self, host, port, timeout=None):
         FakeSMTPError._last_instance = self
 
     def __enter__(self):
@@ -104,6 +123,9 @@ class FakeSMTPError:
     def send_message(self, msg: EmailMessage):
         raise smtplib.SMTPException("Simulated send failure")
 
+    def quit(self):
+        pass
+
 
 # -------------------------
 # Teste de envio bem-sucedido
@@ -177,3 +199,256 @@ def test_send_email_failure(monkeypatch):
     msg = str(excinfo.value)
     assert "Erro ao enviar e-mail" in msg
     assert "Simulated send failure" in msg
+
+
+# -------------------------
+# Testes do pool de conexões SMTP
+# -------------------------
+def _email_details():
+    return EmailDetails(
+        email="cliente@example.com",
+        name="Cliente Pool",
+        type="Formatura",
+        date="2025-09-20",
+        value="300.00",
+        payment_link="https://testlink.com/pagar/789",
+    )
+
+
+def test_send_email_reuses_pooled_connection(monkeypatch):
+    monkeypatch.setattr(smtplib, "SMTP", FakeSMTP)
+    FakeSMTP.instances = 0
+
+    for _ in range(3):
+        mail_mod.send_email(_email_details())
+
+    # Uma única conexão autenticada atende todos os envios
+    assert FakeSMTP.instances == 1
+    assert FakeSMTP._last_instance.sent_count == 3
+    assert FakeSMTP._last_instance.started_tls
+    assert FakeSMTP._last_instance.logged_in
+
+
+def test_send_email_reconnects_dead_connection(monkeypatch):
+    monkeypatch.setattr(smtplib, "SMTP", FakeSMTP)
+    FakeSMTP.instances = 0
+
+    mail_mod.send_email(_email_details())
+    first = FakeSMTP._last_instance
+
+    # Simula o servidor derrubando a sessão ociosa
+    first.alive = False
+    mail_mod.send_email(_email_details())
+
+    assert FakeSMTP.instances == 2
+    assert FakeSMTP._last_instance is not first
+    assert FakeSMTP._last_instance.sent_count == 1
+
+
+def test_pool_checks_idle_connection_with_noop(monkeypatch):
+    monkeypatch.setattr(smtplib, "SMTP", FakeSMTP)
+    FakeSMTP.instances = 0
+
+    pool = mail_mod.SMTPPool(mail_mod._open_connection, max_size=2, check_after=0.0)
+    with pool.connection() as smtp:
+        first = smtp
+    first.alive = False
+
+    # O NOOP falha, então o pool descarta a conexão e abre outra
+    with pool.connection() as smtp:
+        assert smtp is not first
+    assert FakeSMTP.instances == 2
+
+
+def test_pool_discards_connection_after_failure(monkeypatch):
+    monkeypatch.setattr(smtplib, "SMTP", FakeSMTPError)
+
+    with pytest.raises(Exception):
+        mail_mod.send_email(_email_details())
+
+    assert mail_mod.smtp_pool._idle == []
+
+
+# -------------------------
+# Testes do envio assíncrono
+# -------------------------
+class FakeAsyncSMTP:
+    """
+    FakeAsyncSMTP simula aiosmtplib.SMTP: connect() faz STARTTLS e login
+    conforme os parâmetros recebidos no construtor.
+    """
+    instances = 0
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.sent_messages = []
+        self.alive = True
+        FakeAsyncSMTP.instances += 1
+        FakeAsyncSMTP._last_instance = self
+
+    async def connect(self):
+        await asyncio.sleep(0)
+
+    async def send_message(self, msg: EmailMessage):
+        if not self.alive:
+            raise aiosmtplib.SMTPServerDisconnected("Connection lost")
+        self.sent_messages.append(msg)
+
+    async def noop(self):
+        if not self.alive:
+            raise aiosmtplib.SMTPServerDisconnected("Connection lost")
+        return aiosmtplib.SMTPResponse(250, "OK")
+
+    async def quit(self):
+        self.alive = False
+
+    def close(self):
+        self.alive = False
+
+
+def _async_pool():
+    from src.services.email.pool import AsyncSMTPPool
+
+    async def factory():
+        return FakeAsyncSMTP()
+
+    return AsyncSMTPPool(factory, max_size=2)
+
+
+async def _use_pool(pool):
+    async with pool.connection() as smtp:
+        return smtp
+
+
+def test_async_pool_closes_idle_connections_of_finished_loop():
+    pool = _async_pool()
+
+    old = asyncio.run(_use_pool(pool))
+    assert old.alive
+    new = asyncio.run(_use_pool(pool))
+
+    # A conexão do loop encerrado é fechada, não apenas esquecida
+    assert old is not new
+    assert old.alive is False
+
+
+def test_async_pool_quits_idle_connections_on_their_running_loop():
+    import threading
+
+    pool = _async_pool()
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        old = asyncio.run_coroutine_threadsafe(_use_pool(pool), loop).result(timeout=5)
+        asyncio.run(_use_pool(pool))
+        # O QUIT roda no loop dono da conexão
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result(timeout=5)
+        assert old.alive is False
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+
+@pytest.mark.asyncio
+async def test_send_email_async_success(monkeypatch):
+    monkeypatch.setattr(aiosmtplib, "SMTP", FakeAsyncSMTP)
+    FakeAsyncSMTP.instances = 0
+
+    await mail_mod.send_email_async(_email_details())
+    await mail_mod.send_email_async(_email_details())
+
+    smtp = FakeAsyncSMTP._last_instance
+    assert FakeAsyncSMTP.instances == 1
+    assert smtp.kwargs["hostname"] == mail_mod.EMAIL_HOST
+    assert smtp.kwargs["username"] == mail_mod.EMAIL_USER
+    assert smtp.kwargs["start_tls"] is True
+    assert len(smtp.sent_messages) == 2
+    assert smtp.sent_messages[0]["To"] == "cliente@example.com"
+
+
+@pytest.mark.asyncio
+async def test_send_email_async_reconnects_dead_connection(monkeypatch):
+    monkeypatch.setattr(aiosmtplib, "SMTP", FakeAsyncSMTP)
+    FakeAsyncSMTP.instances = 0
+
+    await mail_mod.send_email_async(_email_details())
+    FakeAsyncSMTP._last_instance.alive = False
+    await mail_mod.send_email_async(_email_details())
+
+    assert FakeAsyncSMTP.instances == 2
+    assert len(FakeAsyncSMTP._last_instance.sent_messages) == 1
+
+
+@pytest.mark.asyncio
+async def test_send_email_async_failure(monkeypatch):
+    class FailingAsyncSMTP(FakeAsyncSMTP):
+        async def send_message(self, msg):
+            raise aiosmtplib.SMTPException("Simulated async failure")
+
+    monkeypatch.setattr(aiosmtplib, "SMTP", FailingAsyncSMTP)
+
+    with pytest.raises(Exception) as excinfo:
+        await mail_mod.send_email_async(_email_details())
+
+    assert "Erro ao enviar e-mail" in str(excinfo.value)
+    assert "Simulated async failure" in str(excinfo.value)
+
+
+# -------------------------
+# Testes dos templates pré-compilados
+# -------------------------
+def test_compile_template_embeds_static_fields():
+    parts, tail = template_mod.compile_template(
+        "Olá ${name}, custa R$$${value}. Contato: ${contato}",
+        static_fields={"contato": "+55 35 9999"},
+    )
+
+    assert [name for _, name in parts] == ["name", "value"]
+    assert "+55 35 9999" in tail
+    assert parts[1][0] == ", custa R$"
+
+
+def test_compiled_template_render_escapes_fields(tmp_path):
+    path = tmp_path / "t.html"
+    path.write_text("<p>${name}</p><a href=\"${link}\">pagar</a>", encoding="utf-8")
+
+    template = template_mod.CompiledTemplate(str(path))
+    html = template.render(name="<b>Ana & Bia</b>", link="https://x.com/?a=1&b=2")
+
+    assert html == '<p>&lt;b&gt;Ana &amp; Bia&lt;/b&gt;</p><a href="https://x.com/?a=1&amp;b=2">pagar</a>'
+    assert template.fields == ("name", "link")
+
+
+def test_compiled_template_hot_reload(tmp_path):
+    path = tmp_path / "t.html"
+    path.write_text("v1 ${name}", encoding="utf-8")
+
+    template = template_mod.CompiledTemplate(str(path), reload=True)
+    first_version = template.version
+    assert template.render(name="Ana") == "v1 Ana"
+
+    path.write_text("v2 ${name}", encoding="utf-8")
+    os.utime(path, ns=(0, 1))
+
+    assert template.render(name="Ana") == "v2 Ana"
+    assert template.version != first_version
+
+
+def test_compiled_template_without_reload_keeps_cached_version(tmp_path):
+    path = tmp_path / "t.html"
+    path.write_text("v1 ${name}", encoding="utf-8")
+
+    template = template_mod.CompiledTemplate(str(path))
+    path.write_text("v2 ${name}", encoding="utf-8")
+
+    assert template.render(name="Ana") == "v1 Ana"
+
+
+def test_build_message_shares_static_plain_part():
+    first = mail_mod.build_message(_email_details())
+    second = mail_mod.build_message(_email_details())
+
+    assert first.get_body(preferencelist=("plain",)) is second.get_body(preferencelist=("plain",))
+    assert first.get_body(preferencelist=("html",)) is not second.get_body(preferencelist=("html",))
@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import hmac
+import importlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from benchmarks.mercadopago_stand_in import mercadopago_stand_in
+from benchmarks.mongo_stand_in import InMemoryDatabase
+from src.services.payment.async_client import AsyncMercadoPagoClient
+from src.services.queue import QueueWorkerPool
+
+payment_mod = importlib.import_module("src.services.payment.mercadopago")
+webhook_mod = importlib.import_module("src.services.payment.webhook")
+dedupe_mod = importlib.import_module("src.services.payment.dedupe")
+signature_mod = importlib.import_module("src.services.payment.signature")
+queue_mod = importlib.import_module("src.services.queue.queue")
+budget_routes_mod = importlib.import_module("src.routes.budget")
+
+WEBHOOK_SECRET = "segredo-integracao"
+
+
+def _preference_data(budget_id="665f1c2e8f1b2a0012345678"):
+    return {
+        "id": budget_id,
+        "title": "Orçamento EloDrinks - Integração",
+        "unit_price": 250.0,
+        "quantity": 1,
+        "email": "cliente@example.com",
+    }
+
+
+# -------------------------
+# Fixture: fake do Mercado Pago com o cliente assíncrono apontando para ele
+# -------------------------
+@pytest.fixture
+def stand_in(monkeypatch, request):
+    options = getattr(request, "param", {})
+    with mercadopago_stand_in(**options) as (state, base_url):
+        client = AsyncMercadoPagoClient(access_token="integracao", base_url=base_url)
+        monkeypatch.setattr(payment_mod, "mp_client", client)
+        yield state
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("stand_in", [{"latency": 0.02, "jitter": 0.01, "seed": 1}], indirect=True)
+async def test_payment_paths_under_http_latency(stand_in):
+    preference = await payment_mod.create_preference_async(_preference_data())
+    payment = stand_in.pay(preference["preferenceId"], "approved")
+
+    fetched = await payment_mod.get_payment_async(str(payment["id"]))
+    found = await payment_mod.search_payments_async({"external_reference": _preference_data()["id"]})
+
+    assert fetched["status"] == "approved"
+    assert [result["id"] for result in found] == [payment["id"]]
+    assert stand_in.requests == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("stand_in", [{"error_rate": 1.0}], indirect=True)
+async def test_injected_errors_open_the_circuit(stand_in):
+    threshold = payment_mod.mercadopago_breaker.failure_threshold
+
+    for _ in range(threshold):
+        with pytest.raises(Exception) as excinfo:
+            await payment_mod.create_preference_async(_preference_data())
+        assert "503" in str(excinfo.value)
+
+    with pytest.raises(Exception) as excinfo:
+        await payment_mod.create_preference_async(_preference_data())
+
+    assert "aberto" in str(excinfo.value)
+    assert stand_in.requests == threshold
+
+
+@pytest.mark.asyncio
+async def test_signed_webhook_callback_updates_budget(monkeypatch):
+    database = InMemoryDatabase()
+    monkeypatch.setattr(queue_mod, "connect", database.connect)
+    monkeypatch.setattr(dedupe_mod, "connect", database.connect)
+    monkeypatch.setattr(webhook_mod, "dedupe_store", dedupe_mod.DedupeStore())
+    monkeypatch.setattr(
+        signature_mod,
+        "_keyed_hmac",
+        hmac.new(WEBHOOK_SECRET.encode(), digestmod=hashlib.sha256),
+    )
+
+    updates = []
+
+    async def fake_update_budget(update_data, monotonic=False):
+        updates.append((update_data.id, update_data.new_status))
+        return True
+
+    monkeypatch.setattr(webhook_mod, "update_budget_status_and_value", fake_update_budget)
+
+    app = FastAPI()
+    app.include_router(budget_routes_mod.router)
+    app_client = TestClient(app)
+
+    def deliver(query, headers, body):
+        return app_client.post("/budget/webhook" + query, content=body, headers=headers).status_code
+
+    with mercadopago_stand_in(webhook=deliver, webhook_secret=WEBHOOK_SECRET) as (state, base_url):
+        monkeypatch.setattr(payment_mod, "mp_client", AsyncMercadoPagoClient(access_token="integracao", base_url=base_url))
+
+        preference = await payment_mod.create_preference_async(_preference_data())
+        await asyncio.to_thread(state.pay, preference["preferenceId"], "approved")
+        await asyncio.to_thread(state.flush)
+
+        pool = QueueWorkerPool(webhook_mod.WEBHOOK_COLLECTION, webhook_mod.process_notification)
+        assert await pool.process_next() is True
+
+    assert [delivery["status"] for delivery in state.webhook_deliveries] == [200]
+    assert updates == [(_preference_data()["id"], "paid")]
+
+
+@pytest.mark.asyncio
+async def test_unsigned_webhook_callback_is_rejected(monkeypatch):
+    monkeypatch.setattr(
+        signature_mod,
+        "_keyed_hmac",
+        hmac.new(WEBHOOK_SECRET.encode(), digestmod=hashlib.sha256),
+    )
+    app = FastAPI()
+    app.include_router(budget_routes_mod.router)
+    app_client = TestClient(app)
+
+    def deliver(query, headers, body):
+        return app_client.post("/budget/webhook" + query, content=body, headers=headers).status_code
+
+    with mercadopago_stand_in(webhook=deliver, webhook_secret="segredo-errado") as (state, base_url):
+        state.preferences["pref"] = {"external_reference": "ref", "items": [{"unit_price": 10.0, "quantity": 1}]}
+        await asyncio.to_thread(state.pay, "pref")
+        await asyncio.to_thread(state.flush)
+
+    assert [delivery["status"] for delivery in state.webhook_deliveries] == [401]
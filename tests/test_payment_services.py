@@ -1,3 +1,4 @@
+import asyncio
 import os
 import uuid
 import pytest
@@ -140,3 +141,443 @@ def test_create_preference_missing_required_field(missing_key):
         create_preference(incomplete)
     # Verifica que a mensagem do KeyError mencione a chave faltante
     assert missing_key in str(excinfo.value)
+
+
+# -------------------------
+# Testes do cliente HTTP compartilhado
+# -------------------------
+client_mod = importlib.import_module("src.services.payment.client")
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=b'{"ok": true}'):
+        self.status_code = status_code
+        self.content = body
+        self.text = body.decode()
+
+    def json(self):
+        import json
+        return json.loads(self.content)
+
+
+def test_shared_sdk_is_used_by_services():
+    assert payment_mod.sdk is client_mod.sdk
+
+
+def test_pooled_client_reuses_session_and_applies_timeouts(monkeypatch):
+    http_client = client_mod.PooledHttpClient(connect_timeout=1.5, read_timeout=4.0)
+    calls = []
+
+    def fake_request(method, url, **kwargs):
+        calls.append((method, url, kwargs))
+        return FakeResponse()
+
+    monkeypatch.setattr(http_client.session, "request", fake_request)
+
+    first = http_client.get(url="https://api.mercadopago.com/v1/payments/1", headers={}, timeout=60)
+    second = http_client.post(url="https://api.mercadopago.com/checkout/preferences", headers={}, data="{}")
+
+    assert first == {"status": 200, "response": {"ok": True}}
+    assert second["status"] == 200
+    # O timeout padrão do SDK (60s) é substituído pelo par (conexão, leitura)
+    assert all(kwargs["timeout"] == (1.5, 4.0) for _, _, kwargs in calls)
+
+
+def test_pooled_client_rewrites_base_url(monkeypatch):
+    http_client = client_mod.PooledHttpClient(base_url="http://127.0.0.1:9999/")
+    urls = []
+
+    def fake_request(method, url, **kwargs):
+        urls.append(url)
+        return FakeResponse(status_code=204, body=b"")
+
+    monkeypatch.setattr(http_client.session, "request", fake_request)
+
+    result = http_client.get(url="https://api.mercadopago.com/v1/payments/7", headers={})
+
+    assert urls == ["http://127.0.0.1:9999/v1/payments/7"]
+    assert result == {"status": 204, "response": None}
+
+
+def test_create_preference_against_local_stand_in(monkeypatch):
+    import mercadopago
+    from benchmarks.mercadopago_stand_in import mercadopago_stand_in
+
+    with mercadopago_stand_in() as (state, base_url):
+        http_client = client_mod.PooledHttpClient(base_url=base_url)
+        monkeypatch.setattr(payment_mod, "sdk", mercadopago.SDK("fake_access_token", http_client=http_client))
+
+        data = {
+            "id": "order_local",
+            "title": "Produto Local",
+            "unit_price": 10.0,
+            "quantity": 1,
+            "email": "local@example.com",
+        }
+        for _ in range(3):
+            result = create_preference(data)
+
+        http_client.close()
+
+    assert result["initPoint"].startswith(base_url)
+    assert state.requests == 3
+    assert state.connections == 1
+
+
+# -------------------------
+# Testes do cliente assíncrono
+# -------------------------
+async_client_mod = importlib.import_module("src.services.payment.async_client")
+
+
+@pytest.mark.asyncio
+async def test_create_preference_async_against_local_stand_in(monkeypatch):
+    from benchmarks.mercadopago_stand_in import mercadopago_stand_in
+
+    with mercadopago_stand_in() as (state, base_url):
+        client = async_client_mod.AsyncMercadoPagoClient(access_token="fake", base_url=base_url)
+        monkeypatch.setattr(payment_mod, "mp_client", client)
+
+        data = {
+            "id": "order_async",
+            "title": "Produto Async",
+            "unit_price": 80.0,
+            "quantity": 1,
+            "email": "async@example.com",
+        }
+        result = await payment_mod.create_preference_async(data)
+        await payment_mod.create_preference_async(data)
+        await client.aclose()
+
+    assert result["initPoint"].startswith(base_url)
+    assert result["preferenceId"] in state.preferences
+    assert state.preferences[result["preferenceId"]]["external_reference"] == "order_async"
+    assert state.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_get_payment_async_against_local_stand_in(monkeypatch):
+    from benchmarks.mercadopago_stand_in import mercadopago_stand_in
+
+    with mercadopago_stand_in() as (state, base_url):
+        state.payments["42"] = {"id": 42, "status": "approved", "external_reference": "ref42"}
+        client = async_client_mod.AsyncMercadoPagoClient(access_token="fake", base_url=base_url)
+        monkeypatch.setattr(payment_mod, "mp_client", client)
+
+        payment = await payment_mod.get_payment_async("42")
+        with pytest.raises(Exception) as excinfo:
+            await payment_mod.get_payment_async("inexistente")
+        await client.aclose()
+
+    assert payment["status"] == "approved"
+    assert payment["external_reference"] == "ref42"
+    assert "404" in str(excinfo.value)
+
+
+def test_async_client_closes_pool_left_on_previous_loop(monkeypatch):
+    created = []
+
+    class FakeAsyncClient:
+        def __init__(self, **kwargs):
+            self.closed = False
+            created.append(self)
+
+        async def aclose(self):
+            self.closed = True
+
+    monkeypatch.setattr(async_client_mod.httpx, "AsyncClient", FakeAsyncClient)
+    client = async_client_mod.AsyncMercadoPagoClient(access_token="fake", base_url="http://mp.local")
+
+    async def use_client():
+        http = client._http()
+        await asyncio.sleep(0)
+        return http
+
+    first = asyncio.run(use_client())
+    second = asyncio.run(use_client())
+
+    assert first is not second
+    assert first.closed is True
+    assert second.closed is False
+    asyncio.run(client.aclose())
+    assert second.closed is True
+
+
+@pytest.mark.asyncio
+async def test_create_preference_async_error_status(monkeypatch):
+    class ErrorClient:
+        async def create_preference(self, preference_data):
+            return {"status": 400, "response": {"message": "invalid unit_price"}}
+
+    monkeypatch.setattr(payment_mod, "mp_client", ErrorClient())
+
+    data = {"id": "x", "title": "t", "unit_price": -1, "quantity": 1, "email": "e@x.com"}
+    with pytest.raises(Exception) as excinfo:
+        await payment_mod.create_preference_async(data)
+
+    assert "Erro ao criar preferência de pagamento" in str(excinfo.value)
+    assert "invalid unit_price" in str(excinfo.value)
+
+
+# -------------------------
+# Testes do cache de preferências por orçamento
+# -------------------------
+cache_mod = importlib.import_module("src.services.payment.preference_cache")
+
+
+class FakePreferenceCollection:
+    def __init__(self):
+        self.docs = {}
+
+    def find_one(self, filter_query):
+        doc = self.docs.get(filter_query["_id"])
+        if not doc or doc["value"] != filter_query["value"]:
+            return None
+        if doc["expires_at"] <= filter_query["expires_at"]["$gt"]:
+            return None
+        return dict(doc)
+
+    def update_one(self, filter_query, update_query, upsert=False):
+        self.docs.setdefault(filter_query["_id"], {"_id": filter_query["_id"]}).update(update_query["$set"])
+
+
+@pytest.fixture
+def preference_cache(monkeypatch):
+    collection = FakePreferenceCollection()
+    created = []
+
+    async def fake_create_preference_async(data):
+        created.append(data)
+        return {"initPoint": f"https://fake.init/{len(created)}", "preferenceId": f"pref{len(created)}"}
+
+    monkeypatch.setattr(cache_mod, "connect", lambda name: (collection, None))
+    monkeypatch.setattr(cache_mod, "create_preference_async", fake_create_preference_async)
+    return collection, created
+
+
+def _preference_data(value=150.0):
+    return {"id": "budget1", "title": "Orçamento", "unit_price": value, "quantity": 1, "email": "a@b.com"}
+
+
+@pytest.mark.asyncio
+async def test_preference_is_reused_while_value_is_unchanged(preference_cache):
+    collection, created = preference_cache
+
+    first = await cache_mod.get_or_create_preference_async(_preference_data())
+    second = await cache_mod.get_or_create_preference_async(_preference_data())
+
+    assert first == second == {"initPoint": "https://fake.init/1", "preferenceId": "pref1"}
+    assert len(created) == 1
+
+
+@pytest.mark.asyncio
+async def test_preference_is_regenerated_when_value_changes(preference_cache):
+    collection, created = preference_cache
+
+    await cache_mod.get_or_create_preference_async(_preference_data(150.0))
+    changed = await cache_mod.get_or_create_preference_async(_preference_data(200.0))
+
+    assert changed["preferenceId"] == "pref2"
+    assert collection.docs["budget1"]["value"] == 200.0
+    assert len(created) == 2
+
+
+@pytest.mark.asyncio
+async def test_preference_is_regenerated_after_expiry(preference_cache):
+    from datetime import datetime, timedelta, timezone
+
+    collection, created = preference_cache
+
+    await cache_mod.get_or_create_preference_async(_preference_data())
+    collection.docs["budget1"]["expires_at"] = datetime.now(timezone.utc) - timedelta(seconds=1)
+    renewed = await cache_mod.get_or_create_preference_async(_preference_data())
+
+    assert renewed["preferenceId"] == "pref2"
+    assert len(created) == 2
+
+
+@pytest.mark.asyncio
+async def test_preference_cache_failure_falls_back_to_api(monkeypatch, preference_cache):
+    collection, created = preference_cache
+
+    def broken_connect(name):
+        raise Exception("Mongo fora do ar")
+
+    monkeypatch.setattr(cache_mod, "connect", broken_connect)
+
+    result = await cache_mod.get_or_create_preference_async(_preference_data())
+
+    assert result["preferenceId"] == "pref1"
+
+
+# -------------------------
+# Testes da conciliação de pagamentos
+# -------------------------
+reconcile_mod = importlib.import_module("src.services.payment.reconcile")
+
+
+class FakeBudgetsCollection:
+    def __init__(self, docs):
+        self.docs = {doc["_id"]: dict(doc) for doc in docs}
+        self.bulk_calls = []
+
+    def find(self, filter_query, projection=None):
+        statuses = filter_query["status"]["$in"]
+        found = [
+            {"_id": doc["_id"], "status": doc["status"]}
+            for doc in self.docs.values()
+            if doc["status"] in statuses and doc.get("value") is not None
+        ]
+
+        class Cursor(list):
+            def sort(self, key, direction):
+                return Cursor(sorted(self, key=lambda doc: doc[key]))
+
+        return Cursor(found)
+
+    def bulk_write(self, operations, ordered=True):
+        self.bulk_calls.append(operations)
+        modified = 0
+        for operation in operations:
+            doc = self.docs.get(operation._filter["_id"])
+            if doc and doc["status"] == operation._filter["status"]:
+                doc.update(operation._doc["$set"])
+                modified += 1
+
+        class Result:
+            modified_count = modified
+
+        return Result()
+
+
+def test_resolve_status():
+    assert reconcile_mod.resolve_status([{"status": "rejected"}, {"status": "approved"}]) == "paid"
+    assert reconcile_mod.resolve_status([{"status": "rejected"}, {"status": "cancelled"}]) == "failed"
+    assert reconcile_mod.resolve_status([{"status": "pending"}]) is None
+    assert reconcile_mod.resolve_status([]) is None
+
+
+@pytest.mark.asyncio
+async def test_reconcile_payments_batches_and_bulk_writes(monkeypatch):
+    collection = FakeBudgetsCollection([
+        {"_id": "b1", "status": "Pendente", "value": 100.0},
+        {"_id": "b2", "status": "Pendente", "value": 200.0},
+        {"_id": "b3", "status": "failed", "value": 300.0},
+        {"_id": "b4", "status": "Pendente", "value": 400.0},
+        {"_id": "b5", "status": "Pendente", "value": None},
+        {"_id": "b6", "status": "paid", "value": 500.0},
+    ])
+    payments = {
+        "b1": [{"status": "approved"}],
+        "b2": [{"status": "rejected"}],
+        "b3": [{"status": "approved"}],
+        "b4": [{"status": "pending"}],
+    }
+    searched = []
+
+    async def fake_search(filters):
+        searched.append(filters["external_reference"])
+        return payments[filters["external_reference"]]
+
+    booked = []
+    monkeypatch.setattr(reconcile_mod, "connect", lambda name: (collection, None))
+    monkeypatch.setattr(reconcile_mod, "search_payments_async", fake_search)
+    monkeypatch.setattr(reconcile_mod, "sync_booking", lambda budgets, budget_id: booked.append(budget_id))
+
+    summary = await reconcile_mod.reconcile_payments(batch_size=2, rate=0, concurrency=2)
+
+    assert sorted(searched) == ["b1", "b2", "b3", "b4"]
+    assert summary == {"checked": 4, "updated": 3, "errors": 0}
+    assert len(collection.bulk_calls) == 2
+    assert [collection.docs[key]["status"] for key in ("b1", "b2", "b3", "b4")] == ["paid", "failed", "paid", "Pendente"]
+    assert booked == ["b1", "b3"]
+
+
+@pytest.mark.asyncio
+async def test_reconcile_payments_counts_search_errors(monkeypatch):
+    collection = FakeBudgetsCollection([{"_id": "b1", "status": "Pendente", "value": 100.0}])
+
+    async def failing_search(filters):
+        raise Exception("Mercado Pago respondeu 429")
+
+    monkeypatch.setattr(reconcile_mod, "connect", lambda name: (collection, None))
+    monkeypatch.setattr(reconcile_mod, "search_payments_async", failing_search)
+
+    summary = await reconcile_mod.reconcile_payments(batch_size=10, rate=0, concurrency=1)
+
+    assert summary == {"checked": 1, "updated": 0, "errors": 1}
+    assert collection.bulk_calls == []
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_calls():
+    import time
+
+    limiter = reconcile_mod.RateLimiter(rate=50)
+    start = time.perf_counter()
+    for _ in range(5):
+        await limiter.wait()
+
+    # 5 chamadas a 50/s: a primeira é imediata, as outras esperam 20ms cada
+    assert time.perf_counter() - start >= 0.075
+
+
+# -------------------------
+# Testes da assinatura do webhook
+# -------------------------
+signature_mod = importlib.import_module("src.services.payment.signature")
+
+
+def _keyed(secret="segredo"):
+    import hashlib
+    import hmac
+
+    return hmac.new(secret.encode(), digestmod=hashlib.sha256)
+
+
+def test_build_manifest_omits_missing_fields():
+    assert signature_mod.build_manifest("ABC123", "req-1", "10") == "id:abc123;request-id:req-1;ts:10;"
+    assert signature_mod.build_manifest(None, None, "10") == "ts:10;"
+
+
+def test_verify_signature_round_trip():
+    keyed = _keyed()
+    v1 = signature_mod.sign("id:pay1;request-id:req-1;ts:10;", keyed)
+
+    assert signature_mod.verify_signature(f"ts=10,v1={v1}", "req-1", "pay1", keyed, now=10) is True
+    # Qualquer campo alterado invalida a assinatura
+    assert signature_mod.verify_signature(f"ts=11,v1={v1}", "req-1", "pay1", keyed, now=10) is False
+    assert signature_mod.verify_signature(f"ts=10,v1={v1}", "req-2", "pay1", keyed, now=10) is False
+    assert signature_mod.verify_signature(f"ts=10,v1={v1}", "req-1", "pay2", keyed, now=10) is False
+    assert signature_mod.verify_signature(f"ts=10,v1={v1}", "req-1", "pay1", _keyed("outro"), now=10) is False
+
+
+def test_verify_signature_rejects_stale_or_future_ts():
+    keyed = _keyed()
+    ts = 1_700_000_000
+    v1 = signature_mod.sign(f"id:pay1;request-id:req-1;ts:{ts};", keyed)
+    header = f"ts={ts},v1={v1}"
+
+    assert signature_mod.verify_signature(header, "req-1", "pay1", keyed, now=ts + 299) is True
+    assert signature_mod.verify_signature(header, "req-1", "pay1", keyed, now=ts + 301) is False
+    assert signature_mod.verify_signature(header, "req-1", "pay1", keyed, now=ts - 301) is False
+
+    # ts em milissegundos também é aceito dentro da janela
+    v1_ms = signature_mod.sign(f"id:pay1;request-id:req-1;ts:{ts * 1000};", keyed)
+    assert signature_mod.verify_signature(f"ts={ts * 1000},v1={v1_ms}", "req-1", "pay1", keyed, now=ts) is True
+
+
+def test_verify_signature_requires_data_id():
+    keyed = _keyed()
+    v1 = signature_mod.sign("request-id:req-1;ts:10;", keyed)
+
+    # Assinatura válida sem id não autoriza nenhum id do corpo
+    assert signature_mod.verify_signature(f"ts=10,v1={v1}", "req-1", None, keyed, now=10) is False
+
+
+def test_verify_signature_rejects_malformed_headers():
+    keyed = _keyed()
+
+    assert signature_mod.verify_signature(None, "req-1", "pay1", keyed) is False
+    assert signature_mod.verify_signature("lixo", "req-1", "pay1", keyed) is False
+    assert signature_mod.verify_signature("ts=10", "req-1", "pay1", keyed) is False
@@ -0,0 +1,316 @@
+import numpy as np
+import pytest
+
+from src.models.BudgetModels import BudgetDetails
+from src.services.pricing import catalog as catalog_mod
+from src.services.pricing import PricingError, build_catalog, compute_quote, get_catalog, quote_budget, validate_selection
+
+CATALOG = {
+    "currency": "BRL",
+    "packages": {
+        "Básico": {"base": 500.0, "per_guest": 20.0, "per_barman_hour": 50.0, "min_hours": 3},
+    },
+    "extras": {
+        "DJ": {"price": 800.0, "unit": "event"},
+        "Drinks sem álcool": {"price": 5.0, "unit": "guest"},
+        "Barman extra": {"price": 60.0, "unit": "hour"},
+    },
+}
+
+
+def _details(**overrides):
+    data = {
+        "description": "Festa",
+        "type": "Aniversário",
+        "date": "2025-10-10",
+        "num_barmans": 2,
+        "num_guests": 50,
+        "time": 4.0,
+        "package": "Básico",
+    }
+    data.update(overrides)
+    return BudgetDetails(**data)
+
+
+# -------------------------
+# Testes do motor de preços
+# -------------------------
+def test_compute_quote_applies_rate_table():
+    catalog = build_catalog(CATALOG)
+
+    quote = compute_quote("Básico", 50, 2, 4.0, ["DJ", "Drinks sem álcool", "Barman extra"], catalog=catalog)
+
+    # 500 + 50*20 + 2*4*50 + 800 + 50*5 + 4*60
+    assert quote["breakdown"] == {
+        "base": 500.0,
+        "guests": 1000.0,
+        "barmans": 400.0,
+        "extras": {"DJ": 800.0, "Drinks sem álcool": 250.0, "Barman extra": 240.0},
+    }
+    assert quote["total"] == 3190.0
+    assert quote["catalog_version"] == catalog.version
+
+
+def test_compute_quote_bills_minimum_hours_and_normalizes_names():
+    catalog = build_catalog(CATALOG)
+
+    quote = compute_quote("  básico ", 10, 1, 1.5, ["dj"], catalog=catalog)
+
+    assert quote["package"] == "Básico"
+    assert quote["billed_hours"] == 3
+    assert quote["breakdown"]["barmans"] == 150.0
+    assert quote["breakdown"]["extras"] == {"DJ": 800.0}
+
+
+def test_compute_quote_rejects_unknown_package_and_extra():
+    catalog = build_catalog(CATALOG)
+
+    with pytest.raises(PricingError):
+        compute_quote("Inexistente", 10, 1, 3.0, catalog=catalog)
+    with pytest.raises(PricingError):
+        compute_quote("Básico", 10, 1, 3.0, ["Fogos"], catalog=catalog)
+
+
+def test_build_catalog_rejects_invalid_unit():
+    data = {"packages": {}, "extras": {"DJ": {"price": 1.0, "unit": "semana"}}}
+
+    with pytest.raises(ValueError):
+        build_catalog(data)
+
+
+def test_catalog_is_immutable_and_versioned():
+    catalog = build_catalog(CATALOG)
+
+    with pytest.raises(TypeError):
+        catalog.packages["novo"] = None
+    changed = {**CATALOG, "currency": "USD"}
+    assert build_catalog(changed).version != catalog.version
+
+
+def test_default_catalog_is_loaded_once(monkeypatch):
+    loads = []
+    original = catalog_mod.load_catalog
+
+    def counting_load(*args, **kwargs):
+        loads.append(1)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(catalog_mod, "_catalog", None)
+    monkeypatch.setattr(catalog_mod, "load_catalog", counting_load)
+
+    first = get_catalog()
+    second = get_catalog()
+
+    assert first is second
+    assert len(loads) == 1
+    assert first.package("Premium") is not None
+
+
+# -------------------------
+# Testes da matriz vetorizada
+# -------------------------
+def test_quote_matrix_matches_per_item_quotes():
+    from src.services.pricing import quote_matrix
+
+    catalog = get_catalog()
+    packages = ["Básico", "Simples", "Premium"]
+    guests = [10, 35, 80, 200]
+    hours = [1.5, 3.0, 4.5, 8.0]
+    extras = ["DJ", "Drinks sem álcool", "Barman extra"]
+
+    prices = quote_matrix(packages, guests, hours, num_barmans=2, extras=extras, catalog=catalog)
+
+    assert prices.shape == (3, 4, 4)
+    for i, package in enumerate(packages):
+        for j, num_guests in enumerate(guests):
+            for k, time_ in enumerate(hours):
+                try:
+                    validate_selection(package, num_guests, time_, extras, catalog=catalog)
+                except PricingError:
+                    assert np.isnan(prices[i, j, k])
+                    continue
+                expected = compute_quote(package, num_guests, 2, time_, extras, catalog=catalog)["total"]
+                assert prices[i, j, k] == pytest.approx(expected, abs=0.005)
+
+
+def test_quote_matrix_charges_repeated_extra_once():
+    from src.services.pricing import quote_matrix
+
+    prices = quote_matrix(["Básico"], [30], [3.0], 1, ["DJ", "DJ", " dj "])
+    expected = compute_quote("Básico", 30, 1, 3.0, ["DJ"])
+
+    assert compute_quote("Básico", 30, 1, 3.0, ["DJ", "DJ"])["total"] == expected["total"] == 2075.0
+    assert prices[0, 0, 0] == pytest.approx(expected["total"])
+
+
+def test_quote_matrix_masks_cells_outside_package_limits():
+    from src.services.pricing import matrix_to_list, quote_matrix
+
+    prices = quote_matrix(["Básico"], [1000, -5, 30], [20.0, -1.0, 3.0])
+
+    # Só 30 convidados por 3 horas cabe no pacote Básico
+    assert np.isnan(prices).sum() == 8
+    assert prices[0, 2, 2] == 1275.0
+    assert matrix_to_list(prices)[0][0] == [None, None, None]
+
+
+def test_quote_matrix_rejects_unknown_package_and_oversized_grid(monkeypatch):
+    from src.services.pricing import matrix as matrix_mod
+
+    with pytest.raises(PricingError):
+        matrix_mod.quote_matrix(["Inexistente"], [10], [3.0])
+
+    monkeypatch.setattr(matrix_mod, "QUOTE_MATRIX_MAX_CELLS", 10)
+    with pytest.raises(PricingError):
+        matrix_mod.quote_matrix(["Básico"], list(range(1, 5)), [1.0, 2.0, 3.0])
+
+
+# -------------------------
+# Testes da prévia memoizada
+# -------------------------
+def test_quote_key_ignores_order_case_and_fields_outside_price():
+    from src.services.pricing.preview import quote_key
+
+    first = _details(extras=["DJ", "Drinks sem álcool"])
+    second = _details(
+        package=" BÁSICO ",
+        description="Outra festa",
+        date="2026-01-01",
+        extras=["drinks  sem álcool", "dj", "DJ"],
+    )
+
+    assert quote_key(first) == quote_key(second)
+    assert quote_key(first) != quote_key(_details(num_guests=51, extras=["DJ", "Drinks sem álcool"]))
+
+
+def test_preview_quote_is_cached_and_cleared_when_catalog_changes(monkeypatch):
+    from src.services.pricing import preview_quote, quote_cache_stats, set_catalog
+
+    monkeypatch.setattr(catalog_mod, "_catalog", build_catalog(CATALOG))
+    set_catalog(build_catalog(CATALOG))
+    details = _details(extras=["DJ"])
+
+    first = preview_quote(details)
+    assert preview_quote(details) is first
+    assert quote_cache_stats()["hits"] == 1
+
+    cheaper = {**CATALOG, "packages": {"Básico": {**CATALOG["packages"]["Básico"], "base": 100.0}}}
+    set_catalog(build_catalog(cheaper))
+
+    assert quote_cache_stats()["size"] == 0
+    updated = preview_quote(details)
+    assert updated["breakdown"]["base"] == 100.0
+    assert updated["catalog_version"] != first["catalog_version"]
+    set_catalog(catalog_mod.load_catalog())
+
+
+# -------------------------
+# Testes de validação e recarga do catálogo
+# -------------------------
+LIMITED_CATALOG = {
+    **CATALOG,
+    "packages": {
+        "Básico": {**CATALOG["packages"]["Básico"], "min_guests": 10, "max_guests": 100, "max_hours": 8},
+    },
+}
+
+
+def test_validate_selection_checks_catalog_limits():
+    from src.services.pricing import validate_selection
+
+    catalog = build_catalog(LIMITED_CATALOG)
+
+    validate_selection("básico", 10, 2.0, ["dj"], catalog=catalog)
+    for args in [
+        ("Inexistente", 50, 4.0, None),
+        ("Básico", 5, 4.0, None),
+        ("Básico", 101, 4.0, None),
+        ("Básico", 50, 9.0, None),
+        ("Básico", 50, 4.0, ["Fogos"]),
+    ]:
+        with pytest.raises(PricingError):
+            validate_selection(*args, catalog=catalog)
+
+
+class FakeCatalogCollection:
+    def __init__(self, document=None):
+        self.document = document
+        self.full_reads = 0
+
+    def find_one(self, filter_query, projection=None):
+        if self.document is None:
+            return None
+        if projection is None:
+            self.full_reads += 1
+            return dict(self.document)
+        return {"version": self.document["version"]}
+
+    def replace_one(self, filter_query, document, upsert=False):
+        self.document = {"_id": filter_query["_id"], **document}
+
+
+@pytest.fixture
+def fake_catalog_store(monkeypatch):
+    from src.services.pricing import store as store_mod
+
+    collection = FakeCatalogCollection()
+    monkeypatch.setattr(store_mod, "connect", lambda name: (collection, None))
+    monkeypatch.setattr(catalog_mod, "_catalog", build_catalog(CATALOG))
+    yield collection
+    # Devolve o catálogo padrão e limpa os caches que dependem dele
+    catalog_mod.set_catalog(catalog_mod.load_catalog())
+
+
+def test_refresh_catalog_keeps_snapshot_without_stored_catalog(fake_catalog_store):
+    from src.services.pricing import refresh_catalog
+
+    before = get_catalog()
+
+    assert refresh_catalog() is False
+    assert get_catalog() is before
+
+
+def test_refresh_catalog_swaps_snapshot_only_when_version_changes(fake_catalog_store):
+    from src.services.pricing import publish_catalog, refresh_catalog
+
+    publish_catalog(LIMITED_CATALOG)
+    published = get_catalog()
+    assert published.package("Básico").max_guests == 100
+
+    # Mesma versão: só a versão é lida, o snapshot é mantido
+    assert refresh_catalog() is False
+    assert fake_catalog_store.full_reads == 0
+    assert get_catalog() is published
+
+    # Outra instância publicou uma versão nova
+    changed = {**LIMITED_CATALOG, "currency": "USD"}
+    fake_catalog_store.document.update(changed, version=build_catalog(changed).version)
+
+    assert refresh_catalog() is True
+    assert get_catalog().currency == "USD"
+    assert get_catalog().version == fake_catalog_store.document["version"]
+
+
+def test_publish_catalog_rejects_invalid_data(fake_catalog_store):
+    from src.services.pricing import publish_catalog
+
+    with pytest.raises(ValueError):
+        publish_catalog({"packages": {}, "extras": {"DJ": {"price": 1.0, "unit": "semana"}}})
+    assert fake_catalog_store.document is None
+
+
+def test_preview_quote_is_keyed_by_catalog_version(monkeypatch):
+    from src.services.pricing import preview_quote
+    from src.services.pricing import preview as preview_mod
+
+    # Troca de catálogo sem notificar os ouvintes, como na corrida com a recarga
+    old = build_catalog(CATALOG)
+    cheaper = build_catalog({**CATALOG, "packages": {"Básico": {**CATALOG["packages"]["Básico"], "base": 100.0}}})
+    preview_mod.clear_quote_cache()
+    monkeypatch.setattr(catalog_mod, "_catalog", old)
+    details = _details()
+
+    assert preview_quote(details)["breakdown"]["base"] == 500.0
+    monkeypatch.setattr(catalog_mod, "_catalog", cheaper)
+    assert preview_quote(details)["breakdown"]["base"] == 100.0
+    preview_mod.clear_quote_cache()
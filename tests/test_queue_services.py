@@ -0,0 +1,427 @@
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from src.services.queue import queue as queue_mod
+from src.services.queue import KeyedLock, QueueWorkerPool
+from src.services.email import outbox as outbox_mod
+from src.services.payment import dedupe as dedupe_mod
+from src.services.payment import webhook as webhook_mod
+
+BUDGET_REF = "665f1c2e8f1b2a0012345678"
+
+
+# -------------------------
+# Fake collection com o subconjunto usado pela fila
+# -------------------------
+class FakeInsertResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+
+
+class FakeQueueCollection:
+    def __init__(self):
+        self.docs = {}
+        self.claim_filters = []
+
+    def insert_one(self, data):
+        data["_id"] = ObjectId()
+        self.docs[data["_id"]] = data
+        return FakeInsertResult(data["_id"])
+
+    def find_one_and_update(self, filter_query, update_query, sort=None, return_document=None):
+        self.claim_filters.append(filter_query)
+        for doc in self.docs.values():
+            if doc["status"] == queue_mod.PENDING:
+                doc.update(update_query["$set"])
+                for key, value in update_query.get("$inc", {}).items():
+                    doc[key] = doc.get(key, 0) + value
+                return dict(doc)
+        return None
+
+    def update_one(self, filter_query, update_query):
+        doc = self.docs[filter_query["_id"]]
+        for key, value in update_query["$set"].items():
+            if key.startswith("payload."):
+                doc["payload"][key.split(".", 1)[1]] = value
+            else:
+                doc[key] = value
+
+
+@pytest.fixture
+def fake_queue(monkeypatch):
+    collection = FakeQueueCollection()
+    monkeypatch.setattr(queue_mod, "connect", lambda name: (collection, None))
+    # Sem chaves de idempotência: todo envio é tratado como novo
+    monkeypatch.setattr(outbox_mod.idempotency, "reserve", lambda key, budget_id: None)
+    monkeypatch.setattr(outbox_mod.idempotency, "record_result", lambda key, result: None)
+    return collection
+
+
+# -------------------------
+# Testes da fila
+# -------------------------
+def test_enqueue_and_claim(fake_queue):
+    job_id = queue_mod.enqueue("fila", {"x": 1}, budget_id="b1")
+
+    job = queue_mod.claim("fila", lease_seconds=30)
+    assert str(job["_id"]) == job_id
+    assert job["status"] == queue_mod.PROCESSING
+    assert job["attempts"] == 1
+    assert job["locked_until"] is not None
+
+    # Nada mais pendente
+    assert queue_mod.claim("fila", lease_seconds=30) is None
+
+
+def test_retry_delay_is_exponential_and_capped():
+    assert queue_mod.retry_delay(1, 2.0, 60.0) == 2.0
+    assert queue_mod.retry_delay(2, 2.0, 60.0) == 4.0
+    assert queue_mod.retry_delay(4, 2.0, 60.0) == 16.0
+    assert queue_mod.retry_delay(10, 2.0, 60.0) == 60.0
+
+
+def test_fail_reschedules_until_max_attempts(fake_queue):
+    queue_mod.enqueue("fila", {})
+    job = queue_mod.claim("fila", lease_seconds=30)
+
+    status = queue_mod.fail("fila", job, "erro temporário", max_attempts=2, base_delay=1, max_delay=10)
+    assert status == queue_mod.PENDING
+    stored = fake_queue.docs[job["_id"]]
+    assert stored["last_error"] == "erro temporário"
+    assert stored["next_attempt_at"] > job["next_attempt_at"]
+
+    job = queue_mod.claim("fila", lease_seconds=30)
+    status = queue_mod.fail("fila", job, "erro final", max_attempts=2, base_delay=1, max_delay=10)
+    assert status == queue_mod.FAILED
+    assert fake_queue.docs[job["_id"]]["status"] == queue_mod.FAILED
+
+
+# -------------------------
+# Testes do pool de workers
+# -------------------------
+@pytest.mark.asyncio
+async def test_worker_marks_job_done(fake_queue):
+    handled = []
+
+    async def handler(job):
+        handled.append(job["payload"])
+
+    queue_mod.enqueue("fila", {"n": 1})
+    pool = QueueWorkerPool("fila", handler)
+
+    assert await pool.process_next() is True
+    assert handled == [{"n": 1}]
+    assert list(fake_queue.docs.values())[0]["status"] == queue_mod.DONE
+    assert await pool.process_next() is False
+
+
+@pytest.mark.asyncio
+async def test_worker_retries_failed_job(fake_queue):
+    async def handler(job):
+        raise Exception("SMTP indisponível")
+
+    queue_mod.enqueue("fila", {})
+    pool = QueueWorkerPool("fila", handler, max_attempts=3)
+
+    await pool.process_next()
+    doc = list(fake_queue.docs.values())[0]
+    assert doc["status"] == queue_mod.PENDING
+    assert doc["last_error"] == "SMTP indisponível"
+
+
+@pytest.mark.asyncio
+async def test_worker_calls_on_failed_after_last_attempt(fake_queue):
+    failed = []
+
+    async def handler(job):
+        raise Exception("SMTP indisponível")
+
+    async def on_failed(job):
+        failed.append(job["payload"])
+
+    queue_mod.enqueue("fila", {"n": 1})
+    pool = QueueWorkerPool("fila", handler, max_attempts=1, on_failed=on_failed)
+
+    await pool.process_next()
+    assert list(fake_queue.docs.values())[0]["status"] == queue_mod.FAILED
+    assert failed == [{"n": 1}]
+
+
+def test_enqueue_completed_job_is_not_claimed(fake_queue):
+    queue_mod.enqueue("fila", {"n": 1}, completed=True)
+
+    doc = list(fake_queue.docs.values())[0]
+    assert doc["status"] == queue_mod.DONE
+    assert doc["completed_at"] is not None
+    assert queue_mod.claim("fila", 60) is None
+
+
+# -------------------------
+# Testes do outbox de e-mails
+# -------------------------
+def _budget():
+    return {
+        "_id": "665f1c2e8f1b2a0012345678",
+        "name": "Cliente Outbox",
+        "email": "outbox@mail.com",
+        "budget": {"type": "Casamento", "date": "2025-11-20"},
+        "value": 900.0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_enqueue_email_stores_rendered_job(fake_queue):
+    result = await outbox_mod.enqueue_email(_budget())
+
+    doc = fake_queue.docs[ObjectId(result["id"])]
+    assert doc["budget_id"] == _budget()["_id"]
+    assert doc["payload"]["email"]["value"] == "900.0"
+    assert doc["payload"]["preference"]["id"] == _budget()["_id"]
+    assert doc["payload"]["payment_link"] is None
+
+
+@pytest.mark.asyncio
+async def test_deliver_email_creates_preference_once(monkeypatch, fake_queue):
+    preferences = []
+    sent = []
+
+    async def fake_create_preference(data):
+        preferences.append(data)
+        return {"initPoint": "https://fake.init/1", "preferenceId": "pref1"}
+
+    async def fake_send_email_async(details):
+        sent.append(details)
+        if len(sent) == 1:
+            raise Exception("Falha SMTP")
+
+    monkeypatch.setattr(outbox_mod, "get_or_create_preference_async", fake_create_preference)
+    monkeypatch.setattr(outbox_mod, "send_email_async", fake_send_email_async)
+
+    await outbox_mod.enqueue_email(_budget())
+    pool = QueueWorkerPool(outbox_mod.OUTBOX_COLLECTION, outbox_mod.deliver_email)
+
+    # Primeira tentativa falha no SMTP, a segunda reaproveita o link salvo
+    await pool.process_next()
+    await pool.process_next()
+
+    assert len(preferences) == 1
+    assert len(sent) == 2
+    assert sent[1].payment_link == "https://fake.init/1"
+    assert list(fake_queue.docs.values())[0]["status"] == queue_mod.DONE
+
+
+# -------------------------
+# Testes do processamento de notificações do webhook
+# -------------------------
+class FakeDedupeCollection:
+    def __init__(self):
+        self.docs = {}
+        self.inserts = 0
+
+    def insert_one(self, data):
+        self.inserts += 1
+        if data["_id"] in self.docs:
+            raise DuplicateKeyError("E11000 duplicate key")
+        self.docs[data["_id"]] = dict(data)
+
+    def find_one_and_update(self, filter_query, update_query):
+        doc = self.docs.get(filter_query["_id"])
+        if doc and doc["created_at"] < filter_query["created_at"]["$lt"]:
+            doc.update(update_query["$set"])
+            return doc
+        return None
+
+    def delete_one(self, filter_query):
+        self.docs.pop(filter_query["_id"], None)
+
+
+@pytest.fixture
+def fake_dedupe(monkeypatch):
+    collection = FakeDedupeCollection()
+    monkeypatch.setattr(dedupe_mod, "connect", lambda name: (collection, None))
+    monkeypatch.setattr(webhook_mod, "dedupe_store", dedupe_mod.DedupeStore(window=60, cache_size=2))
+    return collection
+
+
+def test_dedupe_store_claims_once_and_caches(fake_dedupe):
+    store = webhook_mod.dedupe_store
+
+    assert store.claim("k1") is True
+    assert store.claim("k1") is False
+    # A repetição foi respondida pelo cache, sem nova escrita
+    assert fake_dedupe.inserts == 1
+
+    # Fora do cache (LRU de 2 entradas) a coleção ainda garante a unicidade
+    store.claim("k2")
+    store.claim("k3")
+    assert store.seen("k1") is False
+    assert store.claim("k1") is False
+
+
+def test_dedupe_store_release_allows_new_claim(fake_dedupe):
+    store = webhook_mod.dedupe_store
+
+    store.claim("k1")
+    store.release("k1")
+
+    assert store.claim("k1") is True
+
+
+@pytest.mark.asyncio
+async def test_enqueue_notification_drops_redelivered_event(fake_queue, fake_dedupe):
+    notification = {"id": 991, "type": "payment", "data": {"id": "pay123"}}
+
+    first = await webhook_mod.enqueue_notification("pay123", notification)
+    second = await webhook_mod.enqueue_notification("pay123", notification)
+
+    assert first["duplicate"] is False
+    assert second == {"id": None, "duplicate": True}
+    assert len(fake_queue.docs) == 1
+
+
+@pytest.mark.asyncio
+async def test_process_notification_skips_repeated_status(monkeypatch, fake_queue, fake_dedupe):
+    calls = {"get": 0}
+    updates = []
+
+    async def fake_get_payment(payment_id):
+        calls["get"] += 1
+        return {"status": "approved", "external_reference": BUDGET_REF}
+
+    async def fake_update_budget(update_data, monotonic=False):
+        updates.append(update_data)
+
+    monkeypatch.setattr(webhook_mod, "get_payment_async", fake_get_payment)
+    monkeypatch.setattr(webhook_mod, "update_budget_status_and_value", fake_update_budget)
+
+    # Notificações sem id de evento chegam à fila, mas o mesmo status não é reaplicado
+    await webhook_mod.enqueue_notification("pay123", {"type": "payment", "data": {"id": "pay123"}})
+    await webhook_mod.enqueue_notification("pay123", {"type": "payment", "data": {"id": "pay123"}})
+    pool = QueueWorkerPool(webhook_mod.WEBHOOK_COLLECTION, webhook_mod.process_notification)
+    await pool.process_next()
+    await pool.process_next()
+
+    assert calls["get"] == 2
+    assert len(updates) == 1
+
+
+@pytest.mark.asyncio
+async def test_process_notification_updates_budget(monkeypatch, fake_queue, fake_dedupe):
+    updates = []
+
+    async def fake_get_payment(payment_id):
+        assert payment_id == "pay123"
+        return {"status": "approved", "external_reference": BUDGET_REF}
+
+    async def fake_update_budget(update_data, monotonic=False):
+        updates.append(update_data)
+
+    monkeypatch.setattr(webhook_mod, "get_payment_async", fake_get_payment)
+    monkeypatch.setattr(webhook_mod, "update_budget_status_and_value", fake_update_budget)
+
+    await webhook_mod.enqueue_notification("pay123", {"type": "payment", "data": {"id": "pay123"}})
+    pool = QueueWorkerPool(webhook_mod.WEBHOOK_COLLECTION, webhook_mod.process_notification)
+    await pool.process_next()
+
+    assert [(u.id, u.new_status) for u in updates] == [(BUDGET_REF, "paid")]
+    doc = list(fake_queue.docs.values())[0]
+    assert doc["payload"]["notification"] == {"type": "payment", "data": {"id": "pay123"}}
+    assert doc["status"] == queue_mod.DONE
+
+
+@pytest.mark.asyncio
+async def test_process_notification_retries_when_mercadopago_fails(monkeypatch, fake_queue, fake_dedupe):
+    async def fake_get_payment(payment_id):
+        raise Exception("Erro Mercado Pago")
+
+    monkeypatch.setattr(webhook_mod, "get_payment_async", fake_get_payment)
+
+    await webhook_mod.enqueue_notification("pay123", {"type": "payment", "data": {"id": "pay123"}})
+    pool = QueueWorkerPool(webhook_mod.WEBHOOK_COLLECTION, webhook_mod.process_notification, max_attempts=3)
+    await pool.process_next()
+
+    doc = list(fake_queue.docs.values())[0]
+    assert doc["status"] == queue_mod.PENDING
+    assert "Erro Mercado Pago" in doc["last_error"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("reference", [None, "", "ext123", 42])
+async def test_process_notification_drops_payment_without_budget_reference(
+    monkeypatch, fake_queue, fake_dedupe, reference
+):
+    calls = {"get": 0}
+
+    async def fake_get_payment(payment_id):
+        calls["get"] += 1
+        payment = {"status": "approved"}
+        if reference is not None:
+            payment["external_reference"] = reference
+        return payment
+
+    async def fail_update(update_data, monotonic=False):
+        raise AssertionError("Pagamento sem orçamento não deve atualizar nada")
+
+    monkeypatch.setattr(webhook_mod, "get_payment_async", fake_get_payment)
+    monkeypatch.setattr(webhook_mod, "update_budget_status_and_value", fail_update)
+
+    await webhook_mod.enqueue_notification("pay123", {"type": "payment", "data": {"id": "pay123"}})
+    pool = QueueWorkerPool(webhook_mod.WEBHOOK_COLLECTION, webhook_mod.process_notification, max_attempts=3)
+    await pool.process_next()
+
+    # Erro permanente: o job termina sem novas consultas ao Mercado Pago
+    doc = list(fake_queue.docs.values())[0]
+    assert doc["status"] == queue_mod.DONE
+    assert calls["get"] == 1
+
+
+# -------------------------
+# Testes do processamento ordenado por orçamento
+# -------------------------
+@pytest.mark.asyncio
+async def test_keyed_lock_serializes_same_key_and_frees_memory():
+    import asyncio
+
+    locks = KeyedLock()
+    events = []
+
+    async def work(key, name):
+        async with locks.hold(key):
+            events.append(f"{name}:in")
+            await asyncio.sleep(0.01)
+            events.append(f"{name}:out")
+
+    await asyncio.gather(work("b1", "a"), work("b1", "b"), work("b2", "c"))
+
+    # Mesmo orçamento em sequência; outro orçamento em paralelo
+    assert events.index("a:out") < events.index("b:in")
+    assert events.index("c:in") < events.index("a:out")
+    assert len(locks) == 0
+
+
+@pytest.mark.asyncio
+async def test_process_notification_serializes_updates_per_budget(monkeypatch, fake_queue, fake_dedupe):
+    import asyncio
+
+    statuses = {"pay1": "approved", "pay2": "rejected"}
+    active = {BUDGET_REF: 0}
+    overlaps = []
+
+    async def fake_get_payment(payment_id):
+        return {"status": statuses[payment_id], "external_reference": BUDGET_REF}
+
+    async def fake_update_budget(update_data, monotonic=False):
+        active[update_data.id] += 1
+        overlaps.append(active[update_data.id])
+        await asyncio.sleep(0.01)
+        active[update_data.id] -= 1
+
+    monkeypatch.setattr(webhook_mod, "get_payment_async", fake_get_payment)
+    monkeypatch.setattr(webhook_mod, "update_budget_status_and_value", fake_update_budget)
+
+    jobs = [{"_id": ObjectId(), "payload": {"payment_id": pid}} for pid in statuses]
+    await asyncio.gather(*(webhook_mod.process_notification(job) for job in jobs))
+
+    assert overlaps == [1, 1]
+    assert len(webhook_mod.budget_locks) == 0
@@ -0,0 +1,159 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from src.services.schedule import allocate_staff, build_event, schedule_staff
+from src.services.schedule import service as service_mod
+from src.services.schedule.scheduler import SCHEDULE_TURNAROUND_HOURS
+
+
+def _budget(budget_id, day, hours=4.0, num_barmans=2):
+    return {"_id": budget_id, "budget": {"date": day, "time": hours, "num_barmans": num_barmans}}
+
+
+def _events(*budgets):
+    return [build_event(budget) for budget in budgets]
+
+
+# -------------------------
+# Testes do algoritmo de escala
+# -------------------------
+def test_build_event_uses_default_start():
+    event = build_event(_budget("b1", "2025-12-20", hours=5.0))
+
+    assert event.start.isoformat() == "2025-12-20T18:00:00"
+    assert event.end.isoformat() == "2025-12-20T23:00:00"
+    assert build_event(_budget("b2", "2025-12-20T12:30", hours=2.0)).start.hour == 12
+    assert build_event(_budget("b3", "20/12/2025")) is None
+
+
+def test_build_event_converts_offsets_to_the_same_local_time():
+    local = build_event(_budget("b1", "2025-12-20T19:00-03:00", hours=3.0))
+    utc = build_event(_budget("b2", "2025-12-20T22:00Z", hours=3.0))
+
+    assert local.start == utc.start
+    assert local.start.isoformat() == "2025-12-20T19:00:00"
+
+    # O mesmo instante com offsets diferentes é um conflito de escala
+    schedule = allocate_staff([local, utc], ["Ana", "Bruno"])
+    first, second = schedule["assignments"]
+    assert first["staff"] != second["staff"]
+
+
+def test_overlapping_events_get_distinct_staff():
+    schedule = allocate_staff(
+        _events(_budget("b1", "2025-12-20", num_barmans=2), _budget("b2", "2025-12-20", num_barmans=2)),
+        ["Ana", "Bruno", "Carla", "Davi"],
+    )
+
+    first, second = schedule["assignments"]
+    assert len(set(first["staff"]) | set(second["staff"])) == 4
+    assert schedule["unfilled"] == 0
+
+
+def test_staff_is_reused_after_turnaround_and_load_is_balanced():
+    schedule = allocate_staff(
+        _events(
+            _budget("b1", "2025-12-20T10:00", hours=2.0, num_barmans=1),
+            _budget("b2", "2025-12-20T14:00", hours=2.0, num_barmans=1),
+            _budget("b3", "2025-12-20T15:00", hours=2.0, num_barmans=1),
+        ),
+        ["Ana", "Bruno"],
+    )
+
+    assigned = [a["staff"] for a in schedule["assignments"]]
+    # Ana termina 12h + 2h de folga e volta livre às 14h; Bruno, com menos horas, vai antes
+    assert assigned == [["Ana"], ["Bruno"], ["Ana"]]
+    # Horas e fim informados são os do evento, sem a folga
+    assert schedule["assignments"][0]["end"] == "2025-12-20T12:00:00"
+    assert schedule["staff"] == {"Ana": {"events": 2, "hours": 4.0}, "Bruno": {"events": 1, "hours": 2.0}}
+
+
+def test_shortage_is_reported_per_event():
+    schedule = allocate_staff(_events(_budget("b1", "2025-12-20", num_barmans=3)), ["Ana", "Ana", "Bruno"])
+
+    assignment = schedule["assignments"][0]
+    assert assignment["staff"] == ["Ana", "Bruno"]
+    assert assignment["missing"] == 1
+    assert schedule["unfilled"] == 1
+
+
+def test_full_season_schedule_respects_turnaround():
+    rng = random.Random(7)
+    first_day = date(2025, 10, 1)
+    budgets = [
+        _budget(
+            f"b{index}",
+            f"{first_day + timedelta(days=rng.randrange(180))}T{rng.randrange(10, 22):02d}:00",
+            hours=rng.choice([3.0, 4.0, 5.0, 6.0]),
+            num_barmans=rng.randint(1, 6),
+        )
+        for index in range(3000)
+    ]
+    staff = [f"Barman {index}" for index in range(120)]
+
+    schedule = allocate_staff([build_event(budget) for budget in budgets], staff)
+
+    assert len(schedule["assignments"]) == 3000
+    # Nenhum barman fica em dois eventos ao mesmo tempo, e a folga é respeitada
+    from datetime import datetime
+
+    turnaround = timedelta(hours=SCHEDULE_TURNAROUND_HOURS)
+    shifts = {}
+    for assignment in schedule["assignments"]:
+        for name in assignment["staff"]:
+            shifts.setdefault(name, []).append(
+                (datetime.fromisoformat(assignment["start"]), datetime.fromisoformat(assignment["end"]))
+            )
+    for intervals in shifts.values():
+        intervals.sort()
+        assert all(prev_end + turnaround <= next_start for (_, prev_end), (next_start, _) in zip(intervals, intervals[1:]))
+
+
+# -------------------------
+# Testes do serviço de escala
+# -------------------------
+@pytest.mark.asyncio
+async def test_schedule_staff_reads_confirmed_budgets_of_period(monkeypatch):
+    queries = []
+
+    class FakeBudgetsCollection:
+        def find(self, filter_query, projection=None):
+            queries.append(filter_query)
+            return [_budget("b1", "2025-12-20"), _budget("b2", "data inválida")]
+
+    monkeypatch.setattr(service_mod, "connect", lambda name: (FakeBudgetsCollection(), None))
+
+    schedule = await schedule_staff("2025-12-01", "2025-12-31", ["Ana", "Bruno"])
+
+    assert queries[0]["status"] == {"$in": ["paid"]}
+    assert queries[0]["budget.date"]["$gte"] == "2025-12-01"
+    assert [a["budget_id"] for a in schedule["assignments"]] == ["b1"]
+
+
+@pytest.mark.asyncio
+async def test_schedule_staff_rejects_invalid_period():
+    with pytest.raises(HTTPException) as excinfo:
+        await schedule_staff("2025-12-31", "2025-12-01", ["Ana"])
+    assert excinfo.value.status_code == 400
+
+
+def test_schedule_route(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.routes import schedule as schedule_routes
+
+    async def fake_schedule_staff(from_date, to_date, staff):
+        return {"assignments": [], "staff": {name: {"events": 0, "hours": 0.0} for name in staff}, "unfilled": 0}
+
+    monkeypatch.setattr(schedule_routes, "schedule_staff", fake_schedule_staff)
+    app = FastAPI()
+    app.include_router(schedule_routes.router)
+    client = TestClient(app)
+
+    response = client.post("/schedule", json={"from": "2025-12-01", "to": "2025-12-31", "staff": ["Ana"]})
+    assert response.status_code == 200
+    assert response.json()["schedule"]["staff"] == {"Ana": {"events": 0, "hours": 0.0}}
+    assert client.post("/schedule", json={"from": "2025-12-01", "to": "2025-12-31", "staff": []}).status_code == 422